@@ -23,7 +23,7 @@ from fs42.reception import (
     short_change_effect,
     none_change_effect,
 )
-from fs42.live_schedule_agent import LiveScheduleAgent
+from fs42.live_schedule_agent import LiveScheduleAgent, ScheduleLocks
 from fs42.command_executor import execute_command
 
 logging.basicConfig(
@@ -92,7 +92,7 @@ def input_check():
 
 
 
-def main_loop(transition_fn, shutdown_queue=None, api_proc=None, schedule_lock=None):
+def main_loop(transition_fn, shutdown_queue=None, api_proc=None, schedule_locks=None):
     manager = StationManager()
     reception = ReceptionStatus()
     logger = logging.getLogger("MainLoop")
@@ -101,8 +101,8 @@ def main_loop(transition_fn, shutdown_queue=None, api_proc=None, schedule_lock=N
     # set up the live schedule agent if configured
     schedule_agent = None
     agent_conf = manager.server_conf.get("schedule_agent")
-    if agent_conf and schedule_lock:
-        schedule_agent = LiveScheduleAgent(agent_conf, schedule_lock)
+    if agent_conf and schedule_locks:
+        schedule_agent = LiveScheduleAgent(agent_conf, schedule_locks)
         logger.info("Live schedule agent is active")
     else:
         logger.info("Live schedule agent is not configured")
@@ -145,8 +145,10 @@ def main_loop(transition_fn, shutdown_queue=None, api_proc=None, schedule_lock=N
         channel_index = 0
 
     player = StationPlayer(manager.stations[channel_index], input_check)
-    if schedule_lock:
-        player.schedule_lock = schedule_lock
+    if schedule_locks:
+        player.schedule_locks = schedule_locks
+    if schedule_agent:
+        player.build_throttle = schedule_agent.throttle
     stand_by = StationManager().server_conf.get("standby_image", "runtime/standby.png")
     reception.degrade()
     player.update_filters()
@@ -392,10 +394,9 @@ if __name__ == "__main__":
         api_commands_queue = None
         api_proc = None
 
-    schedule_lock = multiprocessing.Lock()
-
     try:
-        main_loop(trans_fn, shutdown_queue=shutdown_queue, api_proc=api_proc, schedule_lock=schedule_lock)
+        schedule_locks = ScheduleLocks(station["network_name"] for station in StationManager().stations)
+        main_loop(trans_fn, shutdown_queue=shutdown_queue, api_proc=api_proc, schedule_locks=schedule_locks)
     except StationConfigError as e:
         logging.getLogger("FieldPlayer").error(str(e))
         raise SystemExit(-1)
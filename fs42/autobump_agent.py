@@ -14,12 +14,12 @@ class AutoBumpAgent:
     tag_str = ":autobump:"
 
     @staticmethod
-    def do_fill(station_config):
+    def do_fill(station_config, rng=random):
         if "autobump" not in station_config:
             return False
         if "fill_break" not in station_config["autobump"]:
             return False
-        if random.random() < station_config["autobump"]["fill_break"]:
+        if rng.random() < station_config["autobump"]["fill_break"]:
             return True
         return False
 
@@ -1,8 +1,11 @@
+import copy
 import datetime
 import logging
 import os.path
 import sys
 import random
+from collections import OrderedDict
+from collections.abc import MutableMapping
 from pathlib import Path
 
 from fs42.catalog_entry import CatalogEntry, MatchingContentNotFound, NoFillerContentFound
@@ -10,6 +13,7 @@ from fs42.catalog_api import CatalogAPI
 from fs42.hint_agent import HintAgent
 from fs42.timings import MIN_5, DAYS
 from fs42.liquid_blocks import ReelBlock
+from fs42.reel_packer import ReelPacker
 from fs42.media_processor import MediaProcessor
 from fs42.sequence_api import SequenceAPI
 from fs42.autobump_agent import AutoBumpAgent
@@ -41,6 +45,68 @@ class bcolors:
     UNDERLINE = "\033[4m"
 
 
+class LazyClipIndex(MutableMapping):
+    """A clip_index that loads each tag from the catalog db on first use and keeps at most max_tags in memory.
+
+    Every tag in the catalog is known up front so membership checks never touch the db. Play counts
+    bumped in memory are carried across an eviction, since a schedule build only writes them back at the end.
+    """
+
+    def __init__(self, loader, tags, max_tags):
+        self._loader = loader
+        self._tags = dict.fromkeys(tags)
+        self._max_tags = max(1, max_tags)
+        self._resident = OrderedDict()
+        self._evicted_counts = {}
+
+    def __contains__(self, tag):
+        return tag in self._tags
+
+    def __getitem__(self, tag):
+        if tag in self._resident:
+            self._resident.move_to_end(tag)
+            return self._resident[tag]
+        if tag not in self._tags:
+            raise KeyError(tag)
+
+        entries = self._loader(tag)
+        counts = self._evicted_counts.pop(tag, None)
+        if counts:
+            for entry in entries:
+                entry.count = counts.get(entry.path, entry.count)
+        self._store(tag, entries)
+        return entries
+
+    def __setitem__(self, tag, entries):
+        self._tags[tag] = None
+        self._evicted_counts.pop(tag, None)
+        self._store(tag, entries)
+
+    def __delitem__(self, tag):
+        del self._tags[tag]
+        self._resident.pop(tag, None)
+        self._evicted_counts.pop(tag, None)
+
+    def __iter__(self):
+        return iter(list(self._tags))
+
+    def __len__(self):
+        return len(self._tags)
+
+    def resident_tags(self):
+        return list(self._resident)
+
+    def _store(self, tag, entries):
+        self._resident[tag] = entries
+        self._resident.move_to_end(tag)
+        while len(self._resident) > self._max_tags:
+            old_tag, old_entries = self._resident.popitem(last=False)
+            if isinstance(old_entries, list):
+                self._evicted_counts[old_tag] = {
+                    entry.path: entry.count for entry in old_entries if isinstance(entry, CatalogEntry)
+                }
+
+
 class ShowCatalog:
     prebump = "prebump"
     postbump = "postbump"
@@ -50,9 +116,14 @@ class ShowCatalog:
     # content_dir (e.g. Comedy 1-4 all under catalog/movies).
     _fluid_cache_scanned: set = set()
 
+    # Scanned tag folders keyed on (real tag_dir, media_filter, content_type, is_bumps, skip_chapter_scan), so
+    # sibling stations on the same content_dir reuse one walk and probe of the library instead of repeating it.
+    # Each value keeps the tag_dir it was scanned under so copies can be rebased onto another spelling.
+    _shared_scans: dict = {}
+
     @classmethod
     def clear_fluid_cache(cls):
-        """Clear the in-process fluid file cache deduplication set.
+        """Clear the in-process fluid file cache deduplication set and the shared folder scans.
 
         Must be called before starting a fresh catalog rebuild in a long-running
         process (e.g. the web server API) so that scan_file_cache runs again for
@@ -60,8 +131,13 @@ class ShowCatalog:
         is a no-op since the set is always empty at process start.
         """  
         cls._fluid_cache_scanned.clear()
+        cls._shared_scans.clear()
 
-    def __init__(self, config, rebuild_catalog=False, load=True, debug=False, force=False, skip_chapter_scan=False):
+    # resident tag cap for lazy catalogs when the station does not set catalog_max_tags
+    LAZY_MAX_TAGS = 32
+
+    def __init__(self, config, rebuild_catalog=False, load=True, debug=False, force=False, skip_chapter_scan=False,
+                 lazy=None):
         self.config = config
         self._l = logging.getLogger(f"{self.config['network_name']} - CAT")
 
@@ -74,6 +150,14 @@ class ShowCatalog:
         self.tags = []
 
         self.__fluid_builder = None
+        # realpaths that failed the media health check - never scheduled
+        self.quarantined = set()
+        # start/end bump lookups by file and parent folder name, see _bump_index
+        self._bump_indexes = {}
+        # a PodLibrary set by liquid_schedule for the length of a build
+        self.pod_library = None
+        # random source for picks - liquid_schedule swaps in a seeded random.Random when schedule_seed is set
+        self.rng = random
         self.min_gap = 3
         self.skip_chapter_scan = skip_chapter_scan
         if rebuild_catalog:
@@ -82,7 +166,9 @@ class ShowCatalog:
                 CatalogAPI.delete_catalog(self.config)
             self.build_catalog()
         elif load:
-            self.load_catalog()
+            if lazy is None:
+                lazy = bool(self.config.get("catalog_max_tags"))
+            self.load_catalog(lazy=lazy)
 
     def _write_catalog(self):
         # first, make them into a flat list
@@ -101,10 +187,19 @@ class ShowCatalog:
 
         CatalogAPI.set_entries(self.config, flat_list)
 
-    def load_catalog(self):
+    def load_catalog(self, lazy=False):
+        """Load the station catalog - with lazy set, tags are read from the db as they are first used."""
         if self.config["network_type"] == "streaming":
             return
 
+        if lazy:
+            max_tags = self.config.get("catalog_max_tags") or ShowCatalog.LAZY_MAX_TAGS
+            self.clip_index = LazyClipIndex(
+                lambda tag: CatalogAPI.get_by_tag(self.config, tag), CatalogAPI.get_tags(self.config), max_tags
+            )
+            self._load_quarantine()
+            return
+
         catalog_entries = CatalogAPI.get_entries(self.config)
         
         self.clip_index = {}
@@ -115,6 +210,21 @@ class ShowCatalog:
                 self.clip_index[entry.tag] = []
             self.clip_index[entry.tag].append(entry)
 
+        self._load_quarantine()
+
+    def _load_quarantine(self):
+        if self.config["network_type"] != "standard" or not FF_USE_FLUID_FILE_CACHE:
+            return
+        from fs42.fluid_builder import FluidBuilder
+
+        try:
+            self.quarantined = FluidBuilder().get_quarantined()
+        except Exception as e:
+            self._l.warning(f"Could not load the media health quarantine list: {e}")
+            self.quarantined = set()
+        if self.quarantined:
+            self._l.info(f"{len(self.quarantined)} files are quarantined and will not be scheduled")
+
     def build_catalog(self):
         self._l.info(f"Starting catalog build for {self.config['network_name']}")
 
@@ -128,7 +238,9 @@ class ShowCatalog:
                     cache_key = (os.path.realpath(self.config["content_dir"]), media_filter)
                     if cache_key not in ShowCatalog._fluid_cache_scanned:
                         self._l.info("Initializing fluid file cache...")
-                        self.__fluid_builder.scan_file_cache(self.config["content_dir"], media_filter)
+                        self.__fluid_builder.scan_file_cache(
+                            self.config["content_dir"], media_filter, self.config.get("scan_workers", 1)
+                        )
                         ShowCatalog._fluid_cache_scanned.add(cache_key)
                         self._l.info("Fluid file cache updated - continuing build")
                     else:
@@ -253,7 +365,10 @@ class ShowCatalog:
 
         
 
-        SequenceAPI.scan_sequences(self.config)
+        # seeded stations pick the same random sequence starts every time the catalog is built
+        seed = self.config.get("schedule_seed")
+        sequence_rng = random.Random(f"{seed}:{self.config['network_name']}:sequences") if seed is not None else self.rng
+        SequenceAPI.scan_sequences(self.config, sequence_rng)
 
         self.clip_index["start_bumps"] = []
         self.clip_index["end_bumps"] = []
@@ -307,7 +422,7 @@ class ShowCatalog:
                     subdir_clips = MediaProcessor._process_subs(
                         subfolder_path, tag_key, bumpdir=True,
                         fluid=self.__fluid_builder, content_type="bump",
-                        media_filter=media_filter
+                        media_filter=media_filter, scan_workers=self.config.get("scan_workers", 1)
                     )
                     self.clip_index[tag_key] = clips + subdir_clips
                     total_count += len(self.clip_index[tag_key])
@@ -357,24 +472,46 @@ class ShowCatalog:
             else:
                 tag_dir = f"{self.config['content_dir']}/{tag}"
 
-            file_list = MediaProcessor._find_media(tag_dir, media_filter)
+            # resolve the folder so different spellings of the same content_dir share a scan, and only
+            # share with stations that made the same chapter scan
+            scan_key = (os.path.realpath(tag_dir), media_filter, content_type, is_bumps, self.skip_chapter_scan)
+            if scan_key in ShowCatalog._shared_scans:
+                # a sibling station on the same content_dir already walked and probed this folder
+                self._l.info(f"--Reusing the scan of {tag_dir} from a station sharing this content_dir")
+                scanned_dir, *scans = ShowCatalog._shared_scans[scan_key]
+                folder_clips, subdir_clips = (
+                    ShowCatalog._copy_entries(clips, tag, scanned_dir, tag_dir) for clips in scans
+                )
+                self.clip_index[tag] = folder_clips
+            else:
+                file_list = MediaProcessor._find_media(tag_dir, media_filter)
+
+                self.clip_index[tag] = MediaProcessor._process_media(file_list, tag, fluid=self.__fluid_builder, content_type=content_type)
+                self._l.info(f"--Found {len(self.clip_index[tag])} videos in {tag} folder")
+                self._l.debug(f"---- {tag} media listing: {self.clip_index[tag]}")
 
-            self.clip_index[tag] = MediaProcessor._process_media(file_list, tag, fluid=self.__fluid_builder, content_type=content_type)
-            self._l.info(f"--Found {len(self.clip_index[tag])} videos in {tag} folder")
-            self._l.debug(f"---- {tag} media listing: {self.clip_index[tag]}")
+                # Scan for chapters
+                if self.__fluid_builder and not self.skip_chapter_scan:
+                    self.__fluid_builder.scan_chapters_for_entries(self.clip_index[tag])
 
-            # Scan for chapters
-            if self.__fluid_builder and not self.skip_chapter_scan:
-                self.__fluid_builder.scan_chapters_for_entries(self.clip_index[tag])
+                subdir_clips = MediaProcessor._process_subs(
+                    tag_dir, tag, bumpdir=is_bumps, fluid=self.__fluid_builder, content_type=content_type,
+                    media_filter=media_filter, scan_workers=self.config.get("scan_workers", 1)
+                )
 
-            subdir_clips = MediaProcessor._process_subs(tag_dir, tag, bumpdir=is_bumps, fluid=self.__fluid_builder, content_type=content_type, media_filter=media_filter)
+                self._l.info(f"--Found {len(subdir_clips)} videos in {tag} subfolders")
+                self._l.debug(f"---- {tag} sub folder media listing: {subdir_clips}")
 
-            self._l.info(f"--Found {len(subdir_clips)} videos in {tag} subfolders")
-            self._l.debug(f"---- {tag} sub folder media listing: {subdir_clips}")
+                # Scan for chapters in subdirectory clips
+                if self.__fluid_builder and not self.skip_chapter_scan:
+                    self.__fluid_builder.scan_chapters_for_entries(subdir_clips)
 
-            # Scan for chapters in subdirectory clips
-            if self.__fluid_builder and not self.skip_chapter_scan:
-                self.__fluid_builder.scan_chapters_for_entries(subdir_clips)
+                # keep an untouched copy - this station goes on to retag bumps and bump play counts
+                ShowCatalog._shared_scans[scan_key] = (
+                    tag_dir,
+                    ShowCatalog._copy_entries(self.clip_index[tag], tag),
+                    ShowCatalog._copy_entries(subdir_clips, tag),
+                )
 
             if is_bumps:
                 pre_key = f"{tag}-{ShowCatalog.prebump}"
@@ -399,6 +536,23 @@ class ShowCatalog:
 
 
 
+    @staticmethod
+    def _copy_entries(entries, tag, from_dir=None, to_dir=None):
+        """Fresh copies of shared scan entries, with paths moved from from_dir onto to_dir.
+
+        Stations reach the same folder through symlinks and bind mounts, and clip_shows,
+        tag_overrides and entry_by_fpath all match on this station's own spelling of the path.
+        """
+        copies = []
+        for entry in entries:
+            entry = copy.copy(entry)
+            entry.tag = tag
+            entry.count = 0
+            if from_dir != to_dir and entry.path.startswith(from_dir):
+                entry.path = to_dir + entry.path[len(from_dir):]
+            copies.append(entry)
+        return copies
+
     def get_text_listing(self):
         content = "TITLE                | TAG        | Duration  | Hints\n"
         for tag in self.clip_index:
@@ -460,26 +614,36 @@ class ShowCatalog:
         return self.__bump_finder("end_bumps", fp)
 
 
+    def _bump_index(self, bump_tag):
+        """Index a start/end bump tag by file name and by parent folder name.
+
+        Built on first use and rebuilt when the tag's list is replaced or grows (lazy reloads, bump collection).
+        """
+        entries = self.clip_index.get(bump_tag) or []
+        cached = self._bump_indexes.get(bump_tag)
+        if cached and cached[0] is entries and cached[1] == len(entries):
+            return cached[2], cached[3]
+
+        by_name = {}
+        by_parent = {}
+        for bump in entries:
+            path_obj = Path(bump.path)
+            by_name.setdefault(path_obj.name, []).append(bump)
+            by_parent.setdefault(path_obj.parent.name, []).append(bump)
+        self._bump_indexes[bump_tag] = (entries, len(entries), by_name, by_parent)
+        return by_name, by_parent
+
     def __bump_finder(self, bump_tag, fp):
-        candidates = []
+        by_name, by_parent = self._bump_index(bump_tag)
 
         # first, was it directly referenced?
-        for bump in self.clip_index[bump_tag]:
-            if bump.path.endswith(fp):
-                candidates.append(bump)
-                break
+        candidates = [bump for bump in by_name.get(Path(fp).name, []) if bump.path.endswith(fp)][:1]
 
         if not len(candidates):
-            clean_match = fp.removesuffix("/")
-            for bump in self.clip_index[bump_tag]:
-                path_obj = Path(bump.path)
-                parent_path = path_obj.parent.name
-
-                if parent_path == clean_match:
-                    candidates.append(bump)
+            candidates = by_parent.get(fp.removesuffix("/"), [])
 
         if len(candidates):
-            winner = random.choice(candidates)
+            winner = self.rng.choice(candidates)
             return {"path": winner.path, "duration": winner.duration}
         else:
             return None
@@ -498,7 +662,7 @@ class ShowCatalog:
             elif candidate.count == min_count:
                 lowest_matches.append(candidate)
 
-        return random.choice(lowest_matches)
+        return self.rng.choice(lowest_matches)
 
     def get_all_by_tag(self, tag):
         if tag in self.clip_index and len(self.clip_index[tag]):
@@ -506,6 +670,24 @@ class ShowCatalog:
         else:
             return None
 
+    def _fit_candidates(self, tag, seconds, when):
+        """Entries under tag that fit in seconds and may play at when."""
+        candidates = self.clip_index[tag]
+
+        # filter candidates based on configuration hints in config file
+        meta_hints = self.config.get("meta_hints")
+        if meta_hints:
+            candidates = HintAgent.filter_candidate_entries(when, candidates, meta_hints)
+
+        # restrict content to fit and be valid (zero duration is likely not valid),
+        # files that failed the health check would fail at playback
+        return [
+            candidate for candidate in candidates
+            if seconds > candidate.duration >= 1
+                and MediaProcessor._test_candidate_hints(candidate.hints, when)
+                and candidate.realpath not in self.quarantined
+        ]
+
     def find_candidate(self, tag, seconds, when, exclusion_index=None, proposed_start=None, meta_hints=None):
         """Find the best candidate for a given tag and duration.
 
@@ -516,35 +698,24 @@ class ShowCatalog:
             exclusion_index is provided).
         """
         if tag in self.clip_index and len(self.clip_index[tag]):
-            candidates = self.clip_index[tag]
             matches = []
 
-            # filter candidates based on configuration hints in config file
-            meta_hints = self.config.get("meta_hints")
-            if meta_hints:
-                candidates = HintAgent.filter_candidate_entries(when, candidates, meta_hints)
-
-            for candidate in candidates:
-                # restrict content to fit and be valid (zero duration is likely not valid)
+            for candidate in self._fit_candidates(tag, seconds, when):
+                # skip if a sibling channel is already playing this file in an
+                # overlapping time window (handles same-start AND mid-play overlap)
                 if (
-                    seconds > candidate.duration >= 1
-                        and MediaProcessor._test_candidate_hints(candidate.hints, when)
+                    exclusion_index is not None
+                    and proposed_start is not None
+                    and candidate.realpath
+                    and candidate.realpath in exclusion_index
                 ):
-                    # skip if a sibling channel is already playing this file in an
-                    # overlapping time window (handles same-start AND mid-play overlap)
-                    if (
-                        exclusion_index is not None
-                        and proposed_start is not None
-                        and candidate.realpath
-                        and candidate.realpath in exclusion_index
+                    proposed_end = proposed_start + datetime.timedelta(seconds=candidate.duration)
+                    if any(
+                        proposed_start < w_end and w_start < proposed_end
+                        for w_start, w_end in exclusion_index[candidate.realpath]
                     ):
-                        proposed_end = proposed_start + datetime.timedelta(seconds=candidate.duration)
-                        if any(
-                            proposed_start < w_end and w_start < proposed_end
-                            for w_start, w_end in exclusion_index[candidate.realpath]
-                        ):
-                            continue
-                    matches.append(candidate)
+                        continue
+                matches.append(candidate)
             #random.shuffle(matches)
             if not len(matches):
                 err = f"Could not find candidate video for tag={tag} under {seconds} in len - maybe add some shorter content?"
@@ -642,7 +813,7 @@ class ShowCatalog:
         end_candidate = None
 
         # first, is it a filler reel?
-        if AutoBumpAgent.do_fill(self.config):
+        if AutoBumpAgent.do_fill(self.config, self.rng):
             fill = AutoBumpAgent.fill_block(self.config, target_duration)
             return ReelBlock(fill, [], None)
 
@@ -676,6 +847,19 @@ class ShowCatalog:
             remaining -= start_candidate.duration
             remaining -= end_candidate.duration
 
+        # pack this break as tightly as the library allows, the greedy fill below is the fallback - bump
+        # filled breaks skip it so coming-up-next bumpers from the lookahead stay in the pool
+        if remaining > (target_duration * 0.1) and not self.config["commercial_free"]:
+            if self.pod_library:
+                com_tag = commercial_dir if commercial_dir else self.config["commercial_dir"]
+                pod = self.pod_library.take(com_tag, target_duration, remaining, when)
+                if pod is not None:
+                    return ReelBlock(start_candidate, pod, end_candidate)
+
+            packed = self._pack_fill(remaining, when, commercial_dir)
+            if packed:
+                return ReelBlock(start_candidate, packed, end_candidate)
+
         # aim for lower and should average close over time since the returned can be larger
         while remaining > (target_duration * 0.1):
             if not self.config["commercial_free"]:
@@ -745,11 +929,22 @@ class ShowCatalog:
         # discard that block and fill using the tightest technique possible
         additional_reels = []
 
-        if AutoBumpAgent.do_fill(self.config):
+        if AutoBumpAgent.do_fill(self.config, self.rng):
             fill = AutoBumpAgent.fill_block(self.config, remaining)
             blocks.append(ReelBlock(fill, [], None))
         else:
             keep_going = True
+            packed = self._pack_fill(remaining, when, commercial_dir, bump_dir)
+            if packed is not None:
+                # the packer already used up what fits - only the BRB check below is left
+                additional_reels.extend(packed)
+                remaining -= sum(entry.duration for entry in packed)
+                if remaining > self.min_gap and "be_right_back_media" in self.config:
+                    brb = CatalogEntry(self.config["be_right_back_media"], duration=remaining, tag="brb")
+                    additional_reels.append(brb)
+                keep_going = False
+                remaining = 0
+
             while remaining and keep_going:
                 candidate = None
                 try:
@@ -778,6 +973,23 @@ class ShowCatalog:
 
         return blocks
 
+    def _pack_fill(self, seconds, when, commercial_dir=None, bump_dir=None):
+        """Fill seconds of break time with the packer - returns None to fall back to the one-at-a-time fill."""
+        if not self.config["commercial_free"]:
+            fill_tag = commercial_dir if commercial_dir else self.config["commercial_dir"]
+        else:
+            fill_tag = bump_dir if bump_dir else self.config["bump_dir"]
+        if fill_tag not in self.clip_index or not len(self.clip_index[fill_tag]):
+            return None
+
+        packed = ReelPacker.pack(self._fit_candidates(fill_tag, seconds, when), seconds, rng=self.rng)
+        if packed is None:
+            self._l.debug(f"Reel packer hit its step limit on a {seconds} second fill - using the greedy fill")
+            return None
+        for entry in packed:
+            entry.count += 1
+        return packed
+
     def gather_clip_content(self, tag, duration, when, start_clip, end_clip, break_duration=None, break_strategy=None):
         current_duration = 0
         keep_going = True
@@ -874,10 +1086,7 @@ class ShowCatalog:
         return text
 
     def summary_data(self):
-        count = 0
-        for tag in self.tags:
-            if type(self.clip_index[tag]) is list:
-                count += len(self.clip_index[tag])
-            else:
-                count += 1
-        return (len(self.tags), count)
+        # straight from the db so a summary never has to load the catalog
+        tags = CatalogAPI.get_tags(self.config)
+        count = CatalogAPI.get_summary(self.config)["entry_count"]
+        return (len(tags), count)
@@ -4,11 +4,10 @@ from fs42.catalog_entry import CatalogEntry
 class CatalogAPI:
     @staticmethod
     def get_summary(station_config):
-        entries = CatalogIO().get_catalog_entries(station_config["network_name"])
-        duration = sum(entry.duration for entry in entries if entry.duration)
+        (count, duration) = CatalogIO().get_entry_stats(station_config["network_name"])
         return {
             "network_name": station_config["network_name"],
-            "entry_count": len(entries),
+            "entry_count": count,
             "total_duration": duration
         }
     
@@ -33,6 +32,10 @@ class CatalogAPI:
     def get_by_tag(station_config, tag):
         return CatalogIO().get_by_tag(station_config["network_name"], tag)
 
+    @staticmethod
+    def get_tags(station_config):
+        return CatalogIO().get_tags(station_config["network_name"])
+
     @staticmethod
     def get_by_path(station_config, path):
         return CatalogIO().get_entry_by_path(station_config["network_name"], path)
@@ -72,7 +72,12 @@ class CatalogEntry:
         return CatalogEntry.from_db_row(tup)
 
     @staticmethod
-    def from_db_row(row):
+    def from_db_row(row, hint_cache=None):
+        """Build an entry from a catalog_entries row.
+
+        hint_cache maps a stored hint string to its decoded hints - entries that share a hint set
+        share the same (read only) hint list instead of decoding their own copy.
+        """
 
         if len(row) == 13:  # New schema with realpath, content_type, and media_type
             (dbid, station, path, title, duration, tag, count, hints_str, created, updated, realpath, content_type, media_type) = row
@@ -98,6 +103,16 @@ class CatalogEntry:
         entry.created_at = created
         entry.updated_at = updated
 
+        if hint_cache is None:
+            entry.hints = CatalogEntry.decode_hints(hints_str)
+        else:
+            if hints_str not in hint_cache:
+                hint_cache[hints_str] = CatalogEntry.decode_hints(hints_str)
+            entry.hints = hint_cache[hints_str]
+        return entry
+
+    @staticmethod
+    def decode_hints(hints_str):
         hints = []
         # Load hints from JSON
         if hints_str:
@@ -133,5 +148,4 @@ class CatalogEntry:
                 print(f"Error: {e}")
                 hints = []
 
-        entry.hints = hints
-        return entry
+        return hints
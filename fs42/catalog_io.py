@@ -2,21 +2,34 @@ import sqlite3
 import json
 import os
 import logging
+import re
+from collections import Counter
 from contextlib import contextmanager
 
 from fs42.station_manager import StationManager
 from fs42.catalog_entry import CatalogEntry
 
+# catalog_entries columns in CatalogEntry.from_db_row order, with hints resolved through hint_sets
+ENTRY_SELECT = """SELECT catalog_entries.id, catalog_entries.station, catalog_entries.path, catalog_entries.title,
+                         catalog_entries.duration, catalog_entries.tag, catalog_entries.count,
+                         COALESCE(hint_sets.hints, catalog_entries.hints), catalog_entries.created_at,
+                         catalog_entries.updated_at, catalog_entries.realpath, catalog_entries.content_type,
+                         catalog_entries.media_type
+                  FROM catalog_entries LEFT JOIN hint_sets ON hint_sets.id = catalog_entries.hint_set_id"""
+
 
 class CatalogIO:
     def __init__(self):
         self.db_path = StationManager().server_conf["db_path"]
         self._l = logging.getLogger("CATIO")
+        self.fts_enabled = False
         self._init_catalog_table()
 
     @contextmanager
     def _get_connection(self):
         connection = sqlite3.connect(self.db_path)
+        # INSERT OR REPLACE only fires the delete trigger that keeps catalog_fts in sync with this on
+        connection.execute("PRAGMA recursive_triggers = ON")
         try:
             yield connection
             connection.commit()
@@ -94,15 +107,136 @@ class CatalogIO:
                     ON catalog_entries(path)""")
             cursor.execute("""CREATE INDEX IF NOT EXISTS idx_catalog_tag_duration_count
                     ON catalog_entries(station, tag, duration, count)""")
+            # count updates match on station and path - without this they only
+            # get the station prefix of the unique index and scan the whole station
+            cursor.execute("""CREATE INDEX IF NOT EXISTS idx_catalog_station_path
+                    ON catalog_entries(station, path)""")
+
+            self._init_hint_sets(cursor, columns)
+            self._init_search_index(cursor)
 
             cursor.close()
 
+    def _init_hint_sets(self, cursor, columns):
+        """
+        Hints are stored once per distinct set in hint_sets - every file in a folder shares the same set.
+        Catalogs written before the table existed are moved over the first time it is created.
+        """
+        cursor.execute("""CREATE TABLE IF NOT EXISTS hint_sets (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            hints TEXT NOT NULL UNIQUE
+                            )
+                        """)
+
+        if "hint_set_id" not in columns:
+            self._l.info("Adding hint_set_id column to catalog_entries table")
+            cursor.execute("ALTER TABLE catalog_entries ADD COLUMN hint_set_id INTEGER REFERENCES hint_sets(id)")
+            cursor.execute(
+                "INSERT OR IGNORE INTO hint_sets (hints) SELECT DISTINCT hints FROM catalog_entries WHERE hints IS NOT NULL"
+            )
+            cursor.execute("""UPDATE catalog_entries
+                              SET hint_set_id = (SELECT id FROM hint_sets WHERE hint_sets.hints = catalog_entries.hints),
+                                  hints = NULL
+                              WHERE hints IS NOT NULL""")
+            self._l.info(f"Moved hints for {cursor.rowcount} existing entries to hint_sets")
+
+        # lets the orphan checks find references without scanning catalog_entries
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_catalog_hint_set ON catalog_entries(hint_set_id)")
+
+    # stay under SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds
+    HINT_CHUNK = 500
+
+    @staticmethod
+    def _hint_set_ids(cursor, hint_strings) -> dict:
+        """Get the hint_sets id for each hint string, adding any that are new"""
+        if not hint_strings:
+            return {}
+        hint_strings = list(hint_strings)
+        cursor.executemany("INSERT OR IGNORE INTO hint_sets (hints) VALUES (?)", [(h,) for h in hint_strings])
+        result = {}
+        for start in range(0, len(hint_strings), CatalogIO.HINT_CHUNK):
+            chunk = hint_strings[start:start + CatalogIO.HINT_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT hints, id FROM hint_sets WHERE hints IN ({placeholders})", chunk)
+            result.update(cursor.fetchall())
+        return result
+
+    @staticmethod
+    def _replaced_hint_set_ids(cursor, station_name: str, paths) -> set:
+        """The hint_sets ids currently used by these paths - INSERT OR REPLACE may leave them unreferenced"""
+        paths = list(paths)
+        result = set()
+        for start in range(0, len(paths), CatalogIO.HINT_CHUNK):
+            chunk = paths[start:start + CatalogIO.HINT_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(
+                f"""SELECT DISTINCT hint_set_id FROM catalog_entries
+                    WHERE station = ? AND path IN ({placeholders}) AND hint_set_id IS NOT NULL""",
+                [station_name] + chunk,
+            )
+            result.update(row[0] for row in cursor.fetchall())
+        return result
+
+    @staticmethod
+    def _drop_orphaned_hint_sets(cursor, hint_set_ids):
+        """Delete any of these hint sets that no entry refers to any more"""
+        cursor.executemany(
+            """DELETE FROM hint_sets WHERE id = ?
+               AND NOT EXISTS (SELECT 1 FROM catalog_entries WHERE hint_set_id = hint_sets.id)""",
+            [(hint_id,) for hint_id in hint_set_ids],
+        )
+
+    def _init_search_index(self, cursor):
+        """
+        Full text index over title, tag and path, kept in sync with catalog_entries by triggers.
+        Falls back to LIKE searches when sqlite was built without FTS5.
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'catalog_fts'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts
+                                USING fts5(title, tag, path, content='catalog_entries', content_rowid='id')""")
+        except sqlite3.OperationalError as e:
+            self._l.debug(f"FTS5 not available, catalog search will use LIKE: {e}")
+            self.fts_enabled = False
+            return
+
+        cursor.execute("""CREATE TRIGGER IF NOT EXISTS catalog_fts_insert AFTER INSERT ON catalog_entries BEGIN
+                            INSERT INTO catalog_fts(rowid, title, tag, path) VALUES (new.id, new.title, new.tag, new.path);
+                          END""")
+        cursor.execute("""CREATE TRIGGER IF NOT EXISTS catalog_fts_delete AFTER DELETE ON catalog_entries BEGIN
+                            INSERT INTO catalog_fts(catalog_fts, rowid, title, tag, path)
+                                VALUES ('delete', old.id, old.title, old.tag, old.path);
+                          END""")
+        cursor.execute("""CREATE TRIGGER IF NOT EXISTS catalog_fts_update AFTER UPDATE OF title, tag, path ON catalog_entries BEGIN
+                            INSERT INTO catalog_fts(catalog_fts, rowid, title, tag, path)
+                                VALUES ('delete', old.id, old.title, old.tag, old.path);
+                            INSERT INTO catalog_fts(rowid, title, tag, path) VALUES (new.id, new.title, new.tag, new.path);
+                          END""")
+
+        if not exists:
+            self._l.info("Building full text search index for catalog_entries")
+            cursor.execute("INSERT INTO catalog_fts(catalog_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+
+    @staticmethod
+    def _fts_query(query: str):
+        """
+        Turn free text into an FTS5 prefix query - every word has to match the start of a token.
+        Returns None when there is nothing indexable in the query.
+        """
+        # same split as the unicode61 tokenizer so "a.mp4" or "star_trek" still match
+        words = re.findall(r"[^\W_]+", query)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
     def entry_by_id(self, entry_id: int):
         with self._get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                """SELECT * FROM catalog_entries
-                              WHERE id = ?""",
+                f"""{ENTRY_SELECT}
+                              WHERE catalog_entries.id = ?""",
                 (entry_id,),
             )
             row = cursor.fetchone()
@@ -126,8 +260,8 @@ class CatalogIO:
             # Create placeholders for IN clause
             placeholders = ','.join('?' * len(entry_ids))
             cursor.execute(
-                f"""SELECT * FROM catalog_entries
-                   WHERE id IN ({placeholders})""",
+                f"""{ENTRY_SELECT}
+                   WHERE catalog_entries.id IN ({placeholders})""",
                 entry_ids,
             )
             rows = cursor.fetchall()
@@ -135,49 +269,51 @@ class CatalogIO:
 
             # Build result dictionary
             result = {}
+            hint_cache = {}
             for row in rows:
-                entry = CatalogEntry.from_db_row(row)
+                entry = CatalogEntry.from_db_row(row, hint_cache)
                 result[entry.dbid] = entry
 
             return result
 
     def put_catalog_entries(self, station_name: str, catalog_entries: list[CatalogEntry]):
-        with self._get_connection() as connection:
-            cursor = connection.cursor()
-
-            for entry in catalog_entries:
-                if isinstance(entry, CatalogEntry):
-                    # Convert hints list to JSON string for storage
-                    hints = []
-                    for hint in entry.hints:
-                        hint_json = json.dumps(hint.toJSON()) if entry.hints else None
-                        hints.append(hint_json)
-                    hints_json = json.dumps(hints) if hints else None
-
-                    # Use INSERT OR REPLACE to overwrite existing entries
-
-                    cursor.execute(
-                        """INSERT OR REPLACE INTO catalog_entries
-                                    (station, path, realpath, title, duration, tag, count, hints, content_type, media_type, updated_at)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)""",
-                        (
-                            station_name,
-                            entry.path,
-                            entry.realpath,
-                            entry.title,
-                            entry.duration,
-                            entry.tag,
-                            entry.count,
-                            hints_json,
-                            entry.content_type,
-                            entry.media_type,
-                        ),
+        rows = []
+        for entry in catalog_entries:
+            if isinstance(entry, CatalogEntry):
+                # Convert hints list to JSON string for storage
+                hints = [json.dumps(hint.toJSON()) for hint in entry.hints]
+                hints_json = json.dumps(hints) if hints else None
+                rows.append(
+                    (
+                        station_name,
+                        entry.path,
+                        entry.realpath,
+                        entry.title,
+                        entry.duration,
+                        entry.tag,
+                        entry.count,
+                        hints_json,
+                        entry.content_type,
+                        entry.media_type,
                     )
+                )
+            else:
+                print(f"Warning: Entry {entry} is not a CatalogEntry instance. Skipping.")
 
-                else:
-                    print(f"Warning: Entry {entry} is not a CatalogEntry instance. Skipping.")
-
-            connection.commit()
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            replaced_ids = self._replaced_hint_set_ids(cursor, station_name, {row[1] for row in rows})
+            hint_set_ids = self._hint_set_ids(cursor, {row[7] for row in rows if row[7]})
+            rows = [row[:7] + (hint_set_ids.get(row[7]),) + row[8:] for row in rows]
+
+            # Use INSERT OR REPLACE to overwrite existing entries
+            cursor.executemany(
+                """INSERT OR REPLACE INTO catalog_entries
+                            (station, path, realpath, title, duration, tag, count, hint_set_id, content_type, media_type, updated_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)""",
+                rows,
+            )
+            self._drop_orphaned_hint_sets(cursor, replaced_ids - set(hint_set_ids.values()))
             cursor.close()
 
     def get_catalog_entries(self, station_name: str):
@@ -185,8 +321,7 @@ class CatalogIO:
             cursor = connection.cursor()
 
             cursor.execute(
-                """SELECT * 
-                    FROM catalog_entries 
+                f"""{ENTRY_SELECT}
                     WHERE station = ?
                     ORDER BY tag, title""",
                 (station_name,),
@@ -195,29 +330,44 @@ class CatalogIO:
             rows = cursor.fetchall()
             cursor.close()
 
+            # one decoded hint list per distinct hint set, shared by the entries that use it
+            hint_cache = {}
             catalog_entries = []
             for row in rows:
                 # Create CatalogEntry object
-                entry = CatalogEntry.from_db_row(row)
+                entry = CatalogEntry.from_db_row(row, hint_cache)
                 catalog_entries.append(entry)
 
             return catalog_entries
 
     def search_catalog_entries(self, station_name: str, query: str):
+        fts_query = self._fts_query(query) if self.fts_enabled else None
+
         with self._get_connection() as connection:
             cursor = connection.cursor()
-            cursor.execute(
-                """SELECT * FROM catalog_entries 
-                              WHERE station = ? AND (title LIKE ? OR tag LIKE ? OR path LIKE ?)
-                              ORDER BY tag, title""",
-                (station_name, f"%{query}%", f"%{query}%", f"%{query}%"),
-            )
+            if fts_query:
+                # title hits outrank tag hits, which outrank matches on the path
+                cursor.execute(
+                    f"""{ENTRY_SELECT}
+                                  JOIN catalog_fts ON catalog_fts.rowid = catalog_entries.id
+                                  WHERE catalog_fts MATCH ? AND catalog_entries.station = ?
+                                  ORDER BY bm25(catalog_fts, 10.0, 5.0, 1.0), catalog_entries.tag, catalog_entries.title""",
+                    (fts_query, station_name),
+                )
+            else:
+                cursor.execute(
+                    f"""{ENTRY_SELECT}
+                                  WHERE station = ? AND (title LIKE ? OR tag LIKE ? OR path LIKE ?)
+                                  ORDER BY tag, title""",
+                    (station_name, f"%{query}%", f"%{query}%", f"%{query}%"),
+                )
             rows = cursor.fetchall()
             cursor.close()
 
+            hint_cache = {}
             catalog_entries = []
             for row in rows:
-                catalog_entries.append(CatalogEntry.from_db_row(row))
+                catalog_entries.append(CatalogEntry.from_db_row(row, hint_cache))
 
             return catalog_entries
 
@@ -225,6 +375,9 @@ class CatalogIO:
         with self._get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""DELETE FROM catalog_entries WHERE station = ?""", (station_name,))
+            # drop hint sets no station refers to any more
+            cursor.execute("""DELETE FROM hint_sets WHERE id NOT IN
+                                (SELECT hint_set_id FROM catalog_entries WHERE hint_set_id IS NOT NULL)""")
             connection.commit()
             cursor.close()
 
@@ -232,7 +385,7 @@ class CatalogIO:
         with self._get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                """SELECT * FROM catalog_entries 
+                f"""{ENTRY_SELECT}
                               WHERE station = ? AND path = ?""",
                 (station_name, path),
             )
@@ -249,19 +402,44 @@ class CatalogIO:
         with self._get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                """SELECT * FROM catalog_entries 
-                              WHERE station = ? AND tag = ?""",
+                f"""{ENTRY_SELECT}
+                              WHERE station = ? AND tag = ?
+                              ORDER BY title""",
                 (station_name, tag),
             )
             rows = cursor.fetchall()
             cursor.close()
 
+            hint_cache = {}
             catalog_entries = []
             for row in rows:
-                catalog_entries.append(CatalogEntry.from_db_row(row))
+                catalog_entries.append(CatalogEntry.from_db_row(row, hint_cache))
 
             return catalog_entries
 
+    def get_tags(self, station_name: str) -> list[str]:
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """SELECT DISTINCT tag FROM catalog_entries WHERE station = ? ORDER BY tag""",
+                (station_name,),
+            )
+            tags = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            return tags
+
+    def get_entry_stats(self, station_name: str) -> tuple[int, float]:
+        """(entry count, total duration) for a station without loading its entries"""
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT COUNT(*), COALESCE(SUM(duration), 0) FROM catalog_entries WHERE station = ?",
+                (station_name,),
+            )
+            (count, duration) = cursor.fetchone()
+            cursor.close()
+            return (count, duration)
+
     def update_entry_count(self, station_name: str, path: str, new_count: int):
         with self._get_connection() as connection:
             cursor = connection.cursor()
@@ -276,26 +454,32 @@ class CatalogIO:
 
     # make a function to batch increment counts for multiple entries
     def batch_increment_counts(self, station_name: str, entries: list[CatalogEntry]):
+        # a clip can appear more than once in a block, so fold repeats into one update per path
+        increments = Counter()
+        for entry in entries:
+            if isinstance(entry, CatalogEntry):
+                increments[entry.path] += 1
+            else:
+                print(f"Warning: Entry {entry} is not a CatalogEntry instance. Skipping.")
+
+        if not increments:
+            return
+
         with self._get_connection() as connection:
             cursor = connection.cursor()
-            for entry in entries:
-                if isinstance(entry, CatalogEntry):
-                    cursor.execute(
-                        """UPDATE catalog_entries 
-                                      SET count = count + 1, updated_at = CURRENT_TIMESTAMP 
-                                      WHERE station = ? AND path = ?""",
-                        (station_name, entry.path),
-                    )
-                else:
-                    print(f"Warning: Entry {entry} is not a CatalogEntry instance. Skipping.")
-            connection.commit()
+            cursor.executemany(
+                """UPDATE catalog_entries
+                              SET count = count + ?, updated_at = CURRENT_TIMESTAMP
+                              WHERE station = ? AND path = ?""",
+                [(amount, station_name, path) for path, amount in increments.items()],
+            )
             cursor.close()
 
     def find_best_candidates(self, station_name: str, tag: str, max_duration: float):
         with self._get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute(
-                """SELECT * FROM catalog_entries 
+                f"""{ENTRY_SELECT}
                    WHERE station = ? AND tag = ? AND duration <= ? AND duration >= 1
                    ORDER BY count ASC, title ASC""",
                 (station_name, tag, max_duration),
@@ -303,8 +487,9 @@ class CatalogIO:
             rows = cursor.fetchall()
             cursor.close()
 
+            hint_cache = {}
             catalog_entries = []
             for row in rows:
-                catalog_entries.append(CatalogEntry.from_db_row(row))
+                catalog_entries.append(CatalogEntry.from_db_row(row, hint_cache))
 
             return catalog_entries
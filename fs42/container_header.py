@@ -0,0 +1,204 @@
+import logging
+import math
+import os
+import struct
+
+
+class ContainerHeader:
+    """Reads the duration of common containers straight from their headers.
+
+    MP4/MOV files carry it in the moov/mvhd box and Matroska/WebM files in the
+    Segment/Info/Duration element, so it can be found by hopping over element
+    headers without spawning ffprobe. Every reader returns None whenever the
+    file looks unusual so callers can fall back to a full probe.
+    """
+
+    MP4_EXTENSIONS = {".mp4", ".m4v", ".mov", ".m4a"}
+    MKV_EXTENSIONS = {".mkv", ".webm"}
+
+    # give up instead of walking pathological files box by box
+    MAX_ELEMENTS = 4096
+
+    # Matroska element ids (marker bits included)
+    EBML_HEADER = 0x1A45DFA3
+    MKV_SEGMENT = 0x18538067
+    MKV_INFO = 0x1549A966
+    MKV_CLUSTER = 0x1F43B675
+    MKV_TIMECODE_SCALE = 0x2AD7B1
+    MKV_DURATION = 0x4489
+
+    @staticmethod
+    def read_duration(file_path) -> float:
+        """Returns the duration in seconds, or None if it can't be trusted."""
+        ext = os.path.splitext(file_path)[1].lower()
+        try:
+            with open(file_path, "rb") as f:
+                if ext in ContainerHeader.MP4_EXTENSIONS:
+                    duration = ContainerHeader._mp4_duration(f)
+                elif ext in ContainerHeader.MKV_EXTENSIONS:
+                    duration = ContainerHeader._mkv_duration(f)
+                else:
+                    return None
+        except (OSError, struct.error, ValueError) as e:
+            logging.getLogger("MEDIA").debug(f"Header duration read failed for {file_path}: {e}")
+            return None
+
+        if duration is None or not math.isfinite(duration) or duration <= 0:
+            return None
+        return duration
+
+    @staticmethod
+    def _mp4_box_header(f, limit):
+        """Read a box header at the current position - returns (type, payload_size) or None."""
+        start = f.tell()
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", header)
+        header_len = 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                return None
+            size = struct.unpack(">Q", large)[0]
+            header_len = 16
+        elif size == 0:
+            # box runs to the end of its parent
+            size = limit - start
+        if size < header_len or start + size > limit:
+            return None
+        return box_type, size - header_len
+
+    @staticmethod
+    def _mp4_find_box(f, wanted, end):
+        """Scan sibling boxes until `wanted` is found - returns its payload size with f positioned at the payload."""
+        for _ in range(ContainerHeader.MAX_ELEMENTS):
+            if f.tell() >= end:
+                return None
+            box = ContainerHeader._mp4_box_header(f, end)
+            if box is None:
+                return None
+            box_type, payload = box
+            if box_type == wanted:
+                return payload
+            f.seek(payload, os.SEEK_CUR)
+        return None
+
+    @staticmethod
+    def _mp4_duration(f):
+        f.seek(0, os.SEEK_END)
+        file_size = f.tell()
+        f.seek(0)
+
+        moov_size = ContainerHeader._mp4_find_box(f, b"moov", file_size)
+        if moov_size is None:
+            return None
+        moov_end = f.tell() + moov_size
+
+        mvhd_size = ContainerHeader._mp4_find_box(f, b"mvhd", moov_end)
+        if mvhd_size is None:
+            return None
+
+        version_flags = f.read(4)
+        if len(version_flags) < 4:
+            return None
+        version = version_flags[0]
+        if version == 0:
+            _created, _modified, timescale, duration = struct.unpack(">IIII", f.read(16))
+            unknown = 0xFFFFFFFF
+        elif version == 1:
+            _created, _modified, timescale, duration = struct.unpack(">QQIQ", f.read(28))
+            unknown = 0xFFFFFFFFFFFFFFFF
+        else:
+            return None
+
+        if not timescale or duration == unknown:
+            return None
+        return duration / timescale
+
+    @staticmethod
+    def _ebml_vint(f, keep_marker):
+        """Read an EBML variable length integer - returns (value, all_ones) or None."""
+        first = f.read(1)
+        if not first:
+            return None
+        first = first[0]
+        length = 1
+        mask = 0x80
+        while length <= 8 and not (first & mask):
+            mask >>= 1
+            length += 1
+        if length > 8:
+            return None
+
+        value = first if keep_marker else first & (mask - 1)
+        rest = f.read(length - 1)
+        if len(rest) < length - 1:
+            return None
+        for b in rest:
+            value = (value << 8) | b
+
+        all_ones = not keep_marker and value == (1 << (7 * length)) - 1
+        return value, all_ones
+
+    @staticmethod
+    def _ebml_element(f):
+        """Read an element header - returns (id, size) where size is None for unknown-sized elements."""
+        el_id = ContainerHeader._ebml_vint(f, keep_marker=True)
+        if el_id is None:
+            return None
+        size = ContainerHeader._ebml_vint(f, keep_marker=False)
+        if size is None:
+            return None
+        value, unknown = size
+        return el_id[0], (None if unknown else value)
+
+    @staticmethod
+    def _mkv_duration(f):
+        header = ContainerHeader._ebml_element(f)
+        if header is None or header[0] != ContainerHeader.EBML_HEADER or header[1] is None:
+            return None
+        f.seek(header[1], os.SEEK_CUR)
+
+        segment = ContainerHeader._ebml_element(f)
+        if segment is None or segment[0] != ContainerHeader.MKV_SEGMENT:
+            return None
+
+        # walk segment children until Info - the media data means we've gone too far
+        for _ in range(ContainerHeader.MAX_ELEMENTS):
+            element = ContainerHeader._ebml_element(f)
+            if element is None:
+                return None
+            el_id, size = element
+            if el_id == ContainerHeader.MKV_INFO and size is not None:
+                return ContainerHeader._mkv_info_duration(f, f.tell() + size)
+            if el_id == ContainerHeader.MKV_CLUSTER or size is None:
+                return None
+            f.seek(size, os.SEEK_CUR)
+        return None
+
+    @staticmethod
+    def _mkv_info_duration(f, end):
+        timecode_scale = 1000000
+        duration = None
+        while f.tell() < end:
+            element = ContainerHeader._ebml_element(f)
+            if element is None or element[1] is None:
+                return None
+            el_id, size = element
+            payload = f.read(size)
+            if len(payload) < size:
+                return None
+            if el_id == ContainerHeader.MKV_TIMECODE_SCALE:
+                timecode_scale = int.from_bytes(payload, "big")
+            elif el_id == ContainerHeader.MKV_DURATION:
+                if size == 4:
+                    duration = struct.unpack(">f", payload)[0]
+                elif size == 8:
+                    duration = struct.unpack(">d", payload)[0]
+                else:
+                    return None
+
+        if duration is None or not timecode_scale:
+            return None
+        return duration * timecode_scale / 1e9
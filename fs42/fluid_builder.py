@@ -2,6 +2,7 @@ import logging
 import sqlite3
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.append(os.getcwd())
 
@@ -15,6 +16,9 @@ class FluidBuilder:
             self.db_path = StationManager().server_conf["db_path"]
 
         self._l = logging.getLogger("FLUID")
+        # chapter/break points read ahead by prefetch_points, keyed on realpath
+        self._chapter_cache = {}
+        self._break_cache = {}
         connection = sqlite3.connect(self.db_path)
         try:
             FluidStatements.init_db(connection)
@@ -22,12 +26,12 @@ class FluidBuilder:
         finally:
             connection.close()
 
-    def scan_file_cache(self, content_dir, media_filter="video"):
+    def scan_file_cache(self, content_dir, media_filter="video", scan_workers=1):
         connection = sqlite3.connect(self.db_path)
         try:
             # read all the files in the content dir
             self._l.info(f"Fluid file cache scan - reading {content_dir} with media_filter={media_filter}")
-            file_list = MediaProcessor.rich_find_media(content_dir, media_filter)
+            file_list = MediaProcessor.rich_find_media(content_dir, media_filter, scan_workers)
             self._l.info(f"Comparing cache against {len(file_list)} files")
             # add any that aren't there yet
             FluidStatements.iterate_file_entries(connection, file_list)
@@ -51,7 +55,7 @@ class FluidBuilder:
         finally:
             connection.close()
 
-    def scan_breaks(self, dir_path):
+    def scan_breaks(self, dir_path, fast=False):
         connection = sqlite3.connect(self.db_path)
         try:
             self._l.info(f"Scanning directory {dir_path} for breaks")
@@ -75,7 +79,7 @@ class FluidBuilder:
                     if FluidStatements.get_break_points(connection, rfp):
                         self._l.info(f"Breaks already exists for {rfp}")
                     else:
-                        breaks = MediaProcessor.black_detect(rfp, cached.duration)
+                        breaks = MediaProcessor.black_detect(rfp, cached.duration, fast=fast)
                         FluidStatements.add_break_points(connection, rfp, breaks)
                 else:
                     self._l.warning(f"{rfp} is not in catalog cache - not adding break points.")
@@ -83,7 +87,25 @@ class FluidBuilder:
         finally:
             connection.close()
 
+    def prefetch_points(self, full_paths):
+        """Read the chapter and break points for a build's content files in a few queries.
+
+        get_chapters and get_breaks answer prefetched paths from memory afterwards, until the next prefetch replaces them.
+        """
+        full_paths = set(full_paths)
+        connection = sqlite3.connect(self.db_path)
+        try:
+            chapters = FluidStatements.get_chapter_points_for(connection, full_paths)
+            breaks = FluidStatements.get_break_points_for(connection, full_paths)
+        finally:
+            connection.close()
+        self._chapter_cache = {path: chapters.get(path, {}) for path in full_paths}
+        self._break_cache = {path: breaks.get(path, {}) for path in full_paths}
+        self._l.debug(f"Prefetched points for {len(full_paths)} files - {len(chapters)} with chapters, {len(breaks)} with breaks")
+
     def get_breaks(self, full_path):
+        if full_path in self._break_cache:
+            return self._break_cache[full_path]
         #fname = os.path.realpath(fname)
         connection = sqlite3.connect(self.db_path)
         try:
@@ -127,7 +149,55 @@ class FluidBuilder:
         finally:
             connection.close()
 
+    def scan_health(self, dir_path, workers=4, media_filter="mixed"):
+        """Decode samples from every media file under dir_path in parallel and quarantine the ones that fail.
+
+        Files that have not changed since their last check are skipped. Returns (checked, failed) paths.
+        """
+        connection = sqlite3.connect(self.db_path)
+        try:
+            self._l.info(f"Checking media health in {dir_path} with {workers} workers")
+            if not os.path.isdir(dir_path):
+                raise FileNotFoundError(f"Directory does not exist {dir_path}")
+
+            to_check = []
+            for entry in MediaProcessor.rich_find_media(os.path.realpath(dir_path), media_filter):
+                previous = FluidStatements.get_health(connection, entry.path)
+                if previous and previous[0] == entry.last_mod:
+                    continue
+                # the cached duration lets us sample the middle and tail - without it only the head is checked
+                cached = FluidStatements.check_file_cache(connection, entry.path)
+                to_check.append((entry, cached.duration if cached else None))
+
+            self._l.info(f"{len(to_check)} files need a health check")
+            failed = []
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures = {
+                    pool.submit(MediaProcessor.check_health, entry.path, duration): entry
+                    for entry, duration in to_check
+                }
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    error = future.result()
+                    FluidStatements.set_health(connection, entry.path, entry.last_mod, error)
+                    if error:
+                        self._l.warning(f"Quarantined {entry.path} - {error}")
+                        failed.append(entry.path)
+            return [entry.path for entry, _ in to_check], failed
+        finally:
+            connection.close()
+
+    def get_quarantined(self):
+        connection = sqlite3.connect(self.db_path)
+        try:
+            results = FluidStatements.get_quarantined(connection)
+        finally:
+            connection.close()
+        return results
+
     def get_chapters(self, full_path):
+        if full_path in self._chapter_cache:
+            return self._chapter_cache[full_path]
         connection = sqlite3.connect(self.db_path)
         try:
             results = FluidStatements.get_chapter_points(connection, full_path)
@@ -13,6 +13,7 @@ class FileRepoEntry:
             self.last_updates: datetime.datetime = None
             self.meta = ""
             self.media_type = "video"
+            self.fingerprint = None
         else:
             self.from_db_row(db_row)
 
@@ -23,8 +24,22 @@ class FileRepoEntry:
         return self.to_stat_check() == value.to_stat_check()
 
     def from_db_row(self, row):
-        # Handle both old (8 columns) and new (9 columns with media_type) schemas
-        if len(row) == 9:
+        # Handle old (8 columns), media_type (9 columns) and fingerprint (10 columns) schemas
+        self.fingerprint = None
+        if len(row) == 10:
+            (
+                self.path,
+                self.duration,
+                self.size,
+                self.first_added,
+                self.last_mod,
+                self.last_checked,
+                self.last_updates,
+                self.meta,
+                self.media_type,
+                self.fingerprint,
+            ) = row
+        elif len(row) == 9:
             (
                 self.path,
                 self.duration,
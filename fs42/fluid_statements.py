@@ -24,11 +24,96 @@ class FluidStatements:
         cursor.close()
         return result
 
+    @staticmethod
+    def relink_file_entry(connection: sqlite3.Connection, entry: FileRepoEntry) -> FileRepoEntry:
+        """Reuse cached metadata for a file whose content is already known under another path.
+
+        Files are matched on their content fingerprint. If the old path is gone the rows (including
+        break and chapter points) move to the new path, otherwise they are copied. Returns the
+        cached entry for the new path, or None if the content has never been seen. Only called
+        from the scan - it hashes the file and writes to the cache, any other stale rows for the
+        same content are dropped by prune_relinked once the scan is done.
+        """
+        try:
+            entry.fingerprint = MediaProcessor.content_fingerprint(entry.path, entry.size)
+        except OSError:
+            return None
+
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT * FROM file_meta WHERE fingerprint = ? AND path != ?;", (entry.fingerprint, entry.path)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            cursor.close()
+            return None
+
+        # prefer a row whose file is gone - that is a move rather than a copy
+        known = [FileRepoEntry(row) for row in rows]
+        moved = [k for k in known if not os.path.exists(k.path)]
+        source = moved[0] if moved else known[0]
+        now = datetime.datetime.now()
+
+        if moved:
+            logging.getLogger("FLUID").info(f"Relinking moved file: {source.path} -> {entry.path}")
+            cursor.execute(
+                "UPDATE file_meta SET path=?, size=?, last_mod=?, last_checked=?, last_updated=? WHERE path=?",
+                (entry.path, entry.size, entry.last_mod, now, now, source.path),
+            )
+            cursor.execute("UPDATE OR REPLACE break_points SET path=? WHERE path=?", (entry.path, source.path))
+            cursor.execute("UPDATE OR REPLACE chapter_points SET path=? WHERE path=?", (entry.path, source.path))
+        else:
+            logging.getLogger("FLUID").info(f"Reusing cached metadata from copy: {source.path} -> {entry.path}")
+            cursor.execute(
+                """INSERT INTO file_meta
+                   (path, duration, size, first_added, last_mod, last_checked, last_updated, meta, media_type, fingerprint)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (entry.path, source.duration, entry.size, now, entry.last_mod, now, now, source.meta,
+                 source.media_type, entry.fingerprint),
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO break_points SELECT ?, points, last_updated FROM break_points WHERE path=?",
+                (entry.path, source.path),
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO chapter_points SELECT ?, points, last_updated FROM chapter_points WHERE path=?",
+                (entry.path, source.path),
+            )
+
+        cursor.execute("SELECT * FROM file_meta WHERE path = ?;", (entry.path,))
+        row = cursor.fetchone()
+        cursor.close()
+        connection.commit()
+        return FileRepoEntry(row) if row else None
+
+    @staticmethod
+    def prune_relinked(connection: sqlite3.Connection, fingerprints) -> None:
+        """Drop rows whose file is gone when the same content has a live path.
+
+        A relink only moves one row, so a renamed directory or remounted share would otherwise
+        leave the rest of the old paths (and their break and chapter points) behind forever.
+        """
+        cursor = connection.cursor()
+        for fingerprint in fingerprints:
+            cursor.execute("SELECT path FROM file_meta WHERE fingerprint = ?;", (fingerprint,))
+            paths = [row[0] for row in cursor.fetchall()]
+            gone = [path for path in paths if not os.path.exists(path)]
+            if len(gone) == len(paths):
+                continue
+            for path in gone:
+                logging.getLogger("FLUID").info(f"Dropping stale path for relinked file: {path}")
+                cursor.execute("DELETE FROM file_meta WHERE path=?", (path,))
+                cursor.execute("DELETE FROM break_points WHERE path=?", (path,))
+                cursor.execute("DELETE FROM chapter_points WHERE path=?", (path,))
+        cursor.close()
+        connection.commit()
+
     @staticmethod
     def iterate_file_entries(connection: sqlite3.Connection, entries: list[FileRepoEntry]) -> None:
         """Takes a list of file entries, determines if they are cached and adds them if not."""
 
         cursor = connection.cursor()
+        relinked = set()
         for entry in entries:
             # see if there is an entry already
             cursor.execute("SELECT * FROM file_meta WHERE path = ?;", (entry.path,))
@@ -52,13 +137,30 @@ class FluidStatements:
 
                 if needs_update:
                     FluidStatements.update_file_entry(connection, entry)
-                elif repo_entry.media_type != 'audio':
-                    FluidStatements.refresh_video_meta(connection, repo_entry)
-
+                else:
+                    if not repo_entry.fingerprint:
+                        # cached before fingerprints existed
+                        FluidStatements.set_fingerprint(connection, repo_entry)
+                    if repo_entry.media_type != 'audio':
+                        FluidStatements.refresh_video_meta(connection, repo_entry)
+
+            elif FluidStatements.relink_file_entry(connection, entry):
+                relinked.add(entry.fingerprint)
             else:
-
                 FluidStatements.add_file_entry(connection, entry)
         cursor.close()
+        FluidStatements.prune_relinked(connection, relinked)
+
+    @staticmethod
+    def set_fingerprint(connection: sqlite3.Connection, repo_entry: FileRepoEntry):
+        try:
+            repo_entry.fingerprint = MediaProcessor.content_fingerprint(repo_entry.path, repo_entry.size)
+        except OSError:
+            return
+        cursor = connection.cursor()
+        cursor.execute("UPDATE file_meta SET fingerprint=? WHERE path=?", (repo_entry.fingerprint, repo_entry.path))
+        cursor.close()
+        connection.commit()
 
     @staticmethod
     def refresh_video_meta(connection: sqlite3.Connection, repo_entry: FileRepoEntry):
@@ -116,12 +218,15 @@ class FluidStatements:
         metadata = MediaProcessor.extract_metadata(entry.path, media_type)
         entry.meta = json.dumps(metadata) if metadata else ""
 
+        entry.fingerprint = MediaProcessor.content_fingerprint(entry.path, entry.size)
+
         logging.getLogger("FLUID").info(f"Updating existing file entry: {entry.path}")
 
-        update = """UPDATE file_meta SET duration=?, size=?, last_mod=?, last_updated=?, last_checked=?, meta=?, media_type=?
-        WHERE path=?;
+        update = """UPDATE file_meta SET duration=?, size=?, last_mod=?, last_updated=?, last_checked=?, meta=?, media_type=?,
+        fingerprint=? WHERE path=?;
         """
-        values = (entry.duration, entry.size, entry.last_mod, now, now, entry.meta, media_type, entry.path)
+        values = (entry.duration, entry.size, entry.last_mod, now, now, entry.meta, media_type, entry.fingerprint,
+                  entry.path)
         cursor.execute(update, values)
         cursor.close()
         connection.commit()
@@ -147,10 +252,15 @@ class FluidStatements:
         metadata = MediaProcessor.extract_metadata(entry.path, media_type)
         entry.meta = json.dumps(metadata) if metadata else ""
 
+        if not entry.fingerprint:
+            entry.fingerprint = MediaProcessor.content_fingerprint(entry.path, entry.size)
+
         logging.getLogger("FLUID").info(f"Caching new file entry: {entry}")
 
-        # Note: to_db_row() should now include media_type column
-        cursor.execute("INSERT INTO file_meta VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);", entry.to_db_row() + (media_type,))
+        cursor.execute(
+            "INSERT INTO file_meta VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+            entry.to_db_row() + (media_type, entry.fingerprint),
+        )
         cursor.close()
         connection.commit()
 
@@ -208,6 +318,35 @@ class FluidStatements:
         cursor.close()
         return result
 
+    @staticmethod
+    def get_break_points_for(connection: sqlite3.Connection, paths) -> dict:
+        """Get the break points for many files at once - returns {path: points} for the files that have them"""
+        return FluidStatements._points_for_paths(connection, "break_points", paths)
+
+    @staticmethod
+    def get_chapter_points_for(connection: sqlite3.Connection, paths) -> dict:
+        """Get the chapter points for many files at once - returns {path: points} for the files that have them"""
+        points = FluidStatements._points_for_paths(connection, "chapter_points", paths)
+        # same as get_chapter_points, a scanned file without chapters reads as {}
+        return {path: loaded if loaded else {} for path, loaded in points.items()}
+
+    # stay under SQLITE_MAX_VARIABLE_NUMBER on older sqlite builds
+    POINTS_CHUNK = 500
+
+    @staticmethod
+    def _points_for_paths(connection: sqlite3.Connection, table: str, paths) -> dict:
+        paths = list(paths)
+        results = {}
+        cursor = connection.cursor()
+        for start in range(0, len(paths), FluidStatements.POINTS_CHUNK):
+            chunk = paths[start:start + FluidStatements.POINTS_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT path, points FROM {table} WHERE path IN ({placeholders})", chunk)
+            for path, points in cursor.fetchall():
+                results[path] = json.loads(points)
+        cursor.close()
+        return results
+
     @staticmethod
     def delete_chapter_points(connection: sqlite3.Connection, path: str):
         """Delete any chapter points for this file"""
@@ -216,6 +355,35 @@ class FluidStatements:
         cursor.close()
         connection.commit()
 
+    @staticmethod
+    def set_health(connection: sqlite3.Connection, path: str, last_mod, error: str = None):
+        """Record the result of a health check - error is None for a file that decoded cleanly"""
+        cursor = connection.cursor()
+        now = datetime.datetime.now()
+        cursor.execute(
+            "REPLACE INTO media_health VALUES(?, ?, ?, ?, ?)", (path, last_mod, error is None, error, now)
+        )
+        cursor.close()
+        connection.commit()
+
+    @staticmethod
+    def get_health(connection: sqlite3.Connection, path: str) -> tuple:
+        """Get (last_mod, healthy, error) for this file or None if it was never checked"""
+        cursor = connection.cursor()
+        cursor.execute("SELECT last_mod, healthy, error FROM media_health WHERE path=?", (path,))
+        row = cursor.fetchone()
+        cursor.close()
+        return row
+
+    @staticmethod
+    def get_quarantined(connection: sqlite3.Connection) -> set:
+        """Paths of every file that failed its last health check"""
+        cursor = connection.cursor()
+        cursor.execute("SELECT path FROM media_health WHERE healthy=0")
+        result = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        return result
+
     @staticmethod
     def init_db(connection: sqlite3.Connection):
         cursor = connection.cursor()
@@ -241,6 +409,13 @@ class FluidStatements:
             connection.commit()
             logging.getLogger("FLUID").info("Added media_type column to file_meta table")
 
+        if "fingerprint" not in columns:
+            logging.getLogger("FLUID").info("Adding fingerprint column to file_meta table")
+            cursor.execute("ALTER TABLE file_meta ADD COLUMN fingerprint TEXT")
+            connection.commit()
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_meta_fingerprint ON file_meta(fingerprint)")
+
         cursor.execute("""CREATE TABLE IF NOT EXISTS break_points (
                             path TEXT REFERENCES file_meta(path) PRIMARY KEY,
                             points TEXT,
@@ -255,4 +430,13 @@ class FluidStatements:
                             )
                        """)
 
+        cursor.execute("""CREATE TABLE IF NOT EXISTS media_health (
+                            path TEXT PRIMARY KEY,
+                            last_mod TIMESTAMP,
+                            healthy INTEGER,
+                            error TEXT,
+                            last_checked TIMESTAMP
+                            )
+                       """)
+
         cursor.close()
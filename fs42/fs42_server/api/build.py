@@ -52,6 +52,9 @@ async def rebuild_catalog(network_name: str, request: Request):
                     with rebuild_tasks_lock:
                         rebuild_tasks[task_id]["log"] += f"Rebuilt catalog for {station['network_name']}\n"
 
+            # the shared folder scans are only needed while this pass runs
+            ShowCatalog.clear_fluid_cache()
+
             with rebuild_tasks_lock:
                 rebuild_tasks[task_id]["status"] = "done"
                 rebuild_tasks[task_id]["log"] += "Catalog rebuild complete.\n"
@@ -63,7 +63,6 @@ async def get_schedule_summary(network_name: str):
 async def get_catalog_summary():
     summaries = []
     for station in StationManager().stations:
-        catalog_entries = CatalogAPI.get_entries(station)
-        summary = {"network_name": station["network_name"], "entry_count": len(catalog_entries)}
+        summary = {"network_name": station["network_name"], "entry_count": CatalogAPI.get_summary(station)["entry_count"]}
         summaries.append(summary)
     return {"catalog_summaries": summaries}
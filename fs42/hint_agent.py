@@ -6,8 +6,54 @@ from pathlib import Path
 from fs42.schedule_hint import DayPartHint, RangeHint
 
 
+class MetaHintTrie(object):
+    """meta_hints compiled into a trie of path components.
+
+    A lookup walks the candidate path once and collects every hint whose tag is an ancestor of it,
+    in the order the hints are listed in the config - the same answer _is_under gives hint by hint.
+    """
+
+    class _Node(object):
+        __slots__ = ("children", "matches")
+
+        def __init__(self):
+            self.children = {}
+            self.matches = []
+
+    def __init__(self, meta_hints):
+        self._root = MetaHintTrie._Node()
+        for hint_index, meta_hint in enumerate(meta_hints):
+            tags = meta_hint["tags"]
+            if isinstance(tags, str):
+                tags = [tags]
+            for tag_index, tag in enumerate(tags):
+                node = self._root
+                for part in Path(tag).parts:
+                    node = node.children.setdefault(part, MetaHintTrie._Node())
+                node.matches.append((hint_index, tag_index, meta_hint))
+
+    def match(self, file_path):
+        path = Path(file_path)
+        # an empty tag is "." - which only relative paths are under
+        found = [] if path.is_absolute() else list(self._root.matches)
+        node = self._root
+        for part in path.parts:
+            node = node.children.get(part)
+            if node is None:
+                break
+            found.extend(node.matches)
+
+        if not found:
+            return None
+        found.sort(key=lambda m: (m[0], m[1]))
+        return [meta_hint for _, _, meta_hint in found]
+
+
 class HintAgent(object):
 
+    # meta_hints list id -> (meta_hints, MetaHintTrie) so each station config is compiled once
+    _compiled = {}
+
     @staticmethod
     def filter_candidate_entries(when:datetime.datetime, candidates:list[CatalogEntry], meta_hints):
 
@@ -25,26 +71,8 @@ class HintAgent(object):
             valid_candidates = []
             exclusive_candidates = []
             for meta in has_meta:
-                candidate_hints = meta["meta"]
                 candidate = meta["candidate"]
-                all_passed = True
-                found_exclusive = False
-
-                for candidate_hint in candidate_hints:
-
-                    if "day_part" in candidate_hint:
-                        hint = DayPartHint(candidate_hint["day_part"])
-                        if not hint.hint(when):
-                            all_passed = False
-                            break
-                    if "date_range" in candidate_hint:
-                        hint = RangeHint(candidate_hint["date_range"])
-                        if not hint.hint(when):
-                            all_passed = False
-                            break
-                    if candidate_hint.get("exclusive", False):
-                        found_exclusive = True
-
+                all_passed, found_exclusive = HintAgent.evaluate_meta(meta["meta"], when)
 
                 if all_passed and not found_exclusive:
                     valid_candidates.append(candidate)
@@ -62,6 +90,29 @@ class HintAgent(object):
         return filtered_candidates
 
 
+    @staticmethod
+    def evaluate_meta(candidate_hints, when:datetime.datetime):
+        """Returns (all_passed, found_exclusive) for the meta hints matched to one candidate."""
+        all_passed = True
+        found_exclusive = False
+
+        for candidate_hint in candidate_hints:
+
+            if "day_part" in candidate_hint:
+                hint = DayPartHint(candidate_hint["day_part"])
+                if not hint.hint(when):
+                    all_passed = False
+                    break
+            if "date_range" in candidate_hint:
+                hint = RangeHint(candidate_hint["date_range"])
+                if not hint.hint(when):
+                    all_passed = False
+                    break
+            if candidate_hint.get("exclusive", False):
+                found_exclusive = True
+
+        return all_passed, found_exclusive
+
     @staticmethod
     def split_meta_hints(candidates:list[CatalogEntry], meta_hints):
         has_meta = []
@@ -86,15 +137,18 @@ class HintAgent(object):
 
     @staticmethod
     def _get_meta_hint(candidate:CatalogEntry, meta_hints):
-        meta = None
-        for meta_hint in meta_hints:
-            for tag in meta_hint["tags"]:
-                if HintAgent._is_under(tag, candidate.path):
-                    if not meta:
-                        meta = []
-                    meta.append(meta_hint)
-
-        return meta
+        return HintAgent.compile_meta_hints(meta_hints).match(candidate.path)
+
+    @staticmethod
+    def compile_meta_hints(meta_hints) -> MetaHintTrie:
+        cached = HintAgent._compiled.get(id(meta_hints))
+        if cached is None or cached[0] is not meta_hints:
+            if len(HintAgent._compiled) > 64:
+                # configs were reloaded many times over - drop the stale ones
+                HintAgent._compiled.clear()
+            cached = (meta_hints, MetaHintTrie(meta_hints))
+            HintAgent._compiled[id(meta_hints)] = cached
+        return cached[1]
 
     @staticmethod
     def _is_under(dir_path, file_path):
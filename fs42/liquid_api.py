@@ -1,3 +1,5 @@
+import datetime
+
 from fs42.liquid_io import LiquidIO
 
 
@@ -7,6 +9,18 @@ class LiquidAPI:
     def add_blocks(station_config, blocks):
         LiquidIO().put_liquid_blocks(station_config["network_name"], blocks)
 
+    @staticmethod
+    def add_block_chunk(station_config, blocks, checkpoint=None):
+        LiquidIO().put_liquid_chunk(station_config["network_name"], blocks, checkpoint)
+
+    @staticmethod
+    def get_checkpoint(station_config):
+        return LiquidIO().get_build_checkpoint(station_config["network_name"])
+
+    @staticmethod
+    def clear_checkpoint(station_config):
+        LiquidIO().delete_build_checkpoint(station_config["network_name"])
+
     @staticmethod
     def get_blocks(station_config, start=None, end=None):
         if not station_config:
@@ -33,3 +47,13 @@ class LiquidAPI:
     @staticmethod
     def search_all_blocks(query: str):
         return LiquidIO().search_all_liquid_blocks(query)
+
+    @staticmethod
+    def prune_blocks(keep_days, archive=False):
+        """Delete blocks that ended more than keep_days ago and compact the database. Returns the number pruned."""
+        liquid_io = LiquidIO()
+        before = datetime.datetime.now() - datetime.timedelta(days=keep_days)
+        pruned = liquid_io.prune_liquid_blocks(before, liquid_io.archive_path() if archive else None)
+        if pruned:
+            liquid_io.compact()
+        return pruned
@@ -1,3 +1,4 @@
+import abc
 import datetime
 import os.path
 import random
@@ -41,6 +42,14 @@ class LiquidBlock:
         # index 0=current, 1=next, 2=next-next, 3=next-next-next
         self.lookahead = []
 
+        # set by liquid_schedule before make_plan() is called
+        # a FluidBuilder with the build's break and chapter points prefetched
+        self.fluid = None
+
+        # set by liquid_schedule before make_plan() is called
+        # plans shared across the build, keyed on everything that shapes them
+        self.plan_cache = None
+
     def __str__(self):
         content = os.path.basename(self.content.path)
         return f"{self.start_time.strftime('%m/%d %H:%M')} - {self.end_time.strftime('%H:%M')} - {self.title} - {content}"
@@ -48,6 +57,13 @@ class LiquidBlock:
     def content_duration(self):
         return self.content.duration
 
+    def _memoized_plan(self, key, make):
+        if self.plan_cache is None:
+            return make()
+        if key not in self.plan_cache:
+            self.plan_cache[key] = make()
+        return list(self.plan_cache[key])
+
     def playback_duration(self):
         return (self.end_time - self.start_time).seconds
 
@@ -108,7 +124,7 @@ class LiquidBlock:
         # first, collect any reels (commercials and bumps) we might need to buffer to the requested duration
         diff = self.playback_duration() - self.content_duration()
 
-        _fluid = FluidBuilder()
+        _fluid = self.fluid if self.fluid else FluidBuilder()
 
         # Prefer chapter markers over black detection
         break_points = _fluid.get_chapters(self.content.realpath)
@@ -274,13 +290,55 @@ class LiquidWebBlock(LiquidBlock):
         self.plan = [BlockPlanEntry(_c.path, 0, _c.duration, content_type=_c.content_type, media_type=_c.media_type)]
 
 
-class LiquidOffAirBlock(LiquidBlock):
+class _ParametricBlock(LiquidBlock, abc.ABC):
+    """A block whose plan follows from its content and times alone.
+
+    With the station's lazy_plans option these are saved without a plan, and the plan is worked out each time
+    it is read instead of being held for every block.
+    """
+
+    lazy_plan = False
+
+    @property
+    def plan(self):
+        if self._plan is None and self.lazy_plan:
+            return self._compute_plan()
+        return self._plan
+
+    @plan.setter
+    def plan(self, value):
+        self._plan = value
+
+    @staticmethod
+    def _wants_lazy(catalog):
+        return catalog is not None and bool(catalog.config.get("lazy_plans", False))
+
+    @abc.abstractmethod
+    def _compute_plan(self):
+        """Work out the plan from content, times and plan_params()."""
+
+    def plan_params(self):
+        """What besides content and times a lazy plan depends on - saved in place of the plan."""
+        return {}
+
+
+class LiquidOffAirBlock(_ParametricBlock):
     def __init__(self, content, start_time, end_time, title=None, break_strategy="standard", break_info=None, sign_off=None):
         super().__init__(content, start_time, end_time, title, break_strategy, break_info)
         self.sign_off = sign_off
 
     def make_plan(self, catalog):
-        self.plan = []
+        if self._wants_lazy(catalog):
+            self.lazy_plan = True
+            self.plan = None
+            return
+        window = (self.end_time - self.start_time).total_seconds()
+        sign_off = (self.sign_off.path, self.sign_off.duration) if self.sign_off else None
+        key = ("offair", self.content.path, self.content.duration, sign_off, window)
+        self.plan = self._memoized_plan(key, self._make_offair_plan)
+
+    def _make_offair_plan(self):
+        plan = []
         current_mark = self.start_time
         first_loop = True
         while current_mark < self.end_time:
@@ -298,10 +356,17 @@ class LiquidOffAirBlock(LiquidBlock):
                 delta = current_mark - self.end_time
                 duration -= delta.total_seconds()
 
-            self.plan.append(BlockPlanEntry(_content.path, 0, duration, content_type=_content.content_type, media_type=_content.media_type))
+            plan.append(BlockPlanEntry(_content.path, 0, duration, content_type=_content.content_type, media_type=_content.media_type))
+        return plan
+
+    def _compute_plan(self):
+        return self._make_offair_plan()
 
+    def plan_params(self):
+        return {"sign_off": self.sign_off.dbid} if self.sign_off else {}
 
-class LiquidLoopBlock(LiquidBlock):
+
+class LiquidLoopBlock(_ParametricBlock):
     def __init__(self, content, start_time, end_time, title=None, break_strategy="standard", break_info=None, shuffle=False):
         super().__init__(content, start_time, end_time, title, break_strategy, break_info)
         self.shuffle = shuffle
@@ -312,21 +377,43 @@ class LiquidLoopBlock(LiquidBlock):
     def make_plan(self, catalog):
         if not self.content:
             raise ValueError("LiquidLoopBlock requires content")
+        if self._wants_lazy(catalog):
+            # keep this block's own starting order - the content list is shared by every block in a build
+            self.content = list(self.content)
+            if self.shuffle:
+                catalog.rng.shuffle(self.content)
+            self.lazy_plan = True
+            self.plan = None
+        elif self.shuffle:
+            self.plan = self._make_loop_plan(self.content, catalog.rng)
+        else:
+            window = (self.end_time - self.start_time).total_seconds()
+            key = ("loop", tuple((clip.path, clip.duration) for clip in self.content), window)
+            self.plan = self._memoized_plan(key, lambda: self._make_loop_plan(self.content, catalog.rng))
+
+    def _compute_plan(self):
+        # reshuffles are seeded from the block start so the plan comes out the same every time
+        return self._make_loop_plan(list(self.content), random.Random(self.start_time.isoformat()))
+
+    def plan_params(self):
+        return {"shuffle": self.shuffle}
+
+    def _make_loop_plan(self, content, rng):
         entries = []
         keep_going = True
         current_mark: datetime.datetime = self.start_time
         next_mark: datetime.datetime = None
         current_index = 0
         while keep_going:
-            clip = self.content[current_index]
+            clip = content[current_index]
             next_mark = current_mark + datetime.timedelta(seconds=clip.duration)
             duration = clip.duration
             if next_mark < self.end_time:
                 current_index += 1
-                if current_index >= len(self.content):
+                if current_index >= len(content):
                     current_index = 0
                     if self.shuffle:
-                        random.shuffle(self.content)
+                        rng.shuffle(content)
 
             else:
                 keep_going = False
@@ -335,7 +422,7 @@ class LiquidLoopBlock(LiquidBlock):
             entries.append(BlockPlanEntry(clip.path, 0, duration, content_type=clip.content_type, media_type=clip.media_type))
 
             current_mark = next_mark
-        self.plan = entries
+        return entries
 
 
 class ReelBlock:
@@ -1,5 +1,7 @@
 import sqlite3
 import json
+import os
+import zlib
 from contextlib import contextmanager
 from datetime import datetime
 from fs42.catalog_entry import CatalogEntry
@@ -17,6 +19,11 @@ class LiquidIO:
     It provides methods to read and write liquid data to a database.
     """
 
+    # rows deleted per transaction when pruning, so the player's reads are never held up for long
+    PRUNE_BATCH = 500
+    # free pages handed back to the filesystem per compaction
+    VACUUM_PAGES = 2000
+
     def __init__(self):
         self.db_path = StationManager().server_conf["db_path"]
         self._init_liquid_table()
@@ -39,6 +46,8 @@ class LiquidIO:
         """
         with self._get_connection() as connection:
             cursor = connection.cursor()
+            # write-ahead logging lets the player read schedules while a background build is writing
+            cursor.execute("PRAGMA journal_mode=WAL")
             cursor.execute("""CREATE TABLE IF NOT EXISTS liquid_blocks (
                                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                                 station TEXT NOT NULL,
@@ -53,6 +62,12 @@ class LiquidIO:
                                 plan_json TEXT NOT NULL
                             )""")
 
+            # plan_params is set instead of a plan for blocks saved with lazy plans (see _ParametricBlock)
+            cursor.execute("PRAGMA table_info(liquid_blocks)")
+            columns = [column[1] for column in cursor.fetchall()]
+            if "plan_params" not in columns:
+                cursor.execute("ALTER TABLE liquid_blocks ADD COLUMN plan_params TEXT")
+
             # Create indexes for performance
             cursor.execute("""CREATE INDEX IF NOT EXISTS idx_liquid_blocks_station
                             ON liquid_blocks(station)""")
@@ -62,9 +77,41 @@ class LiquidIO:
             cursor.execute("""CREATE INDEX IF NOT EXISTS idx_liquid_blocks_time
                             ON liquid_blocks(start_time, end_time)""")
 
+            # one row per station while a chunked schedule build is under way (see put_liquid_chunk)
+            cursor.execute("""CREATE TABLE IF NOT EXISTS liquid_build_checkpoint (
+                                station TEXT PRIMARY KEY,
+                                amount TEXT,
+                                target_end TIMESTAMP NOT NULL,
+                                last_end TIMESTAMP NOT NULL,
+                                sequence_state TEXT,
+                                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                catalog_count INTEGER
+                            )""")
+            # the catalog size when the build started - a rebuilt catalog invalidates the checkpoint
+            cursor.execute("PRAGMA table_info(liquid_build_checkpoint)")
+            columns = [column[1] for column in cursor.fetchall()]
+            if "catalog_count" not in columns:
+                cursor.execute("ALTER TABLE liquid_build_checkpoint ADD COLUMN catalog_count INTEGER")
+
             cursor.close()
             connection.commit()
 
+    @staticmethod
+    def _content_ids(rows) -> set:
+        """Catalog ids referenced by block rows - content plus lazy off-air sign-offs."""
+        content_ids = set()
+        for row in rows:
+            content_json = json.loads(row[9]) if row[9] else None
+            if content_json:
+                if isinstance(content_json, list):
+                    content_ids.update(content_json)
+                else:
+                    content_ids.add(content_json)
+            plan_params = json.loads(row[11]) if len(row) > 11 and row[11] else None
+            if plan_params and plan_params.get("sign_off"):
+                content_ids.add(plan_params["sign_off"])
+        return content_ids
+
     def get_liquid_blocks(self, station_name: str) -> list[LiquidBlock]:
         """
         Retrieve liquid blocks from the database for a given station.
@@ -76,14 +123,7 @@ class LiquidIO:
             cursor.close()
 
             # Collect all content IDs for batch lookup
-            content_ids = set()
-            for row in rows:
-                content_json = json.loads(row[9]) if row[9] else None
-                if content_json:
-                    if isinstance(content_json, list):
-                        content_ids.update(content_json)
-                    else:
-                        content_ids.add(content_json)
+            content_ids = LiquidIO._content_ids(rows)
 
             # Batch fetch all content entries
             content_cache = CatalogAPI.get_entries_by_ids(list(content_ids)) if content_ids else {}
@@ -107,14 +147,7 @@ class LiquidIO:
             cursor.close()
 
             # Collect all content IDs for batch lookup
-            content_ids = set()
-            for row in rows:
-                content_json = json.loads(row[9]) if row[9] else None
-                if content_json:
-                    if isinstance(content_json, list):
-                        content_ids.update(content_json)
-                    else:
-                        content_ids.add(content_json)
+            content_ids = LiquidIO._content_ids(rows)
 
             # Batch fetch all content entries
             content_cache = CatalogAPI.get_entries_by_ids(list(content_ids)) if content_ids else {}
@@ -139,14 +172,7 @@ class LiquidIO:
             cursor.close()
 
             # Collect content IDs across every station for one batch lookup
-            content_ids = set()
-            for row in rows:
-                content_json = json.loads(row[9]) if row[9] else None
-                if content_json:
-                    if isinstance(content_json, list):
-                        content_ids.update(content_json)
-                    else:
-                        content_ids.add(content_json)
+            content_ids = LiquidIO._content_ids(rows)
 
             content_cache = CatalogAPI.get_entries_by_ids(list(content_ids)) if content_ids else {}
 
@@ -163,51 +189,187 @@ class LiquidIO:
         """
         with self._get_connection() as connection:
             cursor = connection.cursor()
+            LiquidIO._insert_blocks(cursor, station_name, liquid_blocks)
+            cursor.close()
+            connection.commit()
 
-            for block in liquid_blocks:
-
-                if block.content and not isinstance(block.content, list):
-                    content_json = json.dumps(block.content.dbid)
-
-                elif block.content:
-                    content_json = json.dumps([c.dbid for c in block.content])
-                else:
-                    content_json = None
-
-
-                # plan_json = json.dumps(block.plan.toJSON()) if block.plan else None
-                plan_json = json.dumps([p.toJSON() for p in block.plan])
-                block_type = type(block).__name__
-                break_info = json.dumps(block.break_info) if block.break_info else None
-                seq_json = json.dumps(block.sequence_key) if block.sequence_key else None
-               
+    def put_liquid_chunk(self, station_name: str, liquid_blocks: list[LiquidBlock], checkpoint: dict = None):
+        """
+        Store one chunk of a schedule build together with its checkpoint in a single transaction.
+        A None checkpoint marks the build as finished and removes the station's checkpoint.
+        """
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            LiquidIO._insert_blocks(cursor, station_name, liquid_blocks)
+            if checkpoint is None:
+                cursor.execute("DELETE FROM liquid_build_checkpoint WHERE station = ?", (station_name,))
+            else:
                 cursor.execute(
-                    """INSERT OR REPLACE INTO liquid_blocks 
-                       (station, liquid_type, start_time, end_time, break_strategy, title, sequence_key, break_info, content_json, plan_json) 
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    """INSERT OR REPLACE INTO liquid_build_checkpoint
+                       (station, amount, target_end, last_end, sequence_state, updated_at, catalog_count)
+                       VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)""",
                     (
                         station_name,
-                        block_type,
-                        block.start_time,
-                        block.end_time,
-                        block.break_strategy,
-                        block.title,
-                        seq_json,
-                        break_info,
-                        content_json,
-                        plan_json,
+                        checkpoint["amount"],
+                        checkpoint["target_end"].isoformat(),
+                        checkpoint["last_end"].isoformat(),
+                        json.dumps(checkpoint["sequence_state"]),
+                        checkpoint.get("catalog_count"),
                     ),
                 )
             cursor.close()
             connection.commit()
 
+    def get_build_checkpoint(self, station_name: str) -> dict:
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """SELECT amount, target_end, last_end, sequence_state, catalog_count
+                   FROM liquid_build_checkpoint WHERE station = ?""",
+                (station_name,),
+            )
+            row = cursor.fetchone()
+            cursor.close()
+
+        if row is None:
+            return None
+        return {
+            "amount": row[0],
+            "target_end": datetime.fromisoformat(row[1]),
+            "last_end": datetime.fromisoformat(row[2]),
+            "sequence_state": json.loads(row[3]) if row[3] else None,
+            "catalog_count": row[4],
+        }
+
+    def delete_build_checkpoint(self, station_name: str):
+        with self._get_connection() as connection:
+            connection.execute("DELETE FROM liquid_build_checkpoint WHERE station = ?", (station_name,))
+
+    @staticmethod
+    def _insert_blocks(cursor, station_name: str, liquid_blocks: list[LiquidBlock]):
+        for block in liquid_blocks:
+
+            if block.content and not isinstance(block.content, list):
+                content_json = json.dumps(block.content.dbid)
+
+            elif block.content:
+                content_json = json.dumps([c.dbid for c in block.content])
+            else:
+                content_json = None
+
+
+            # plan_json = json.dumps(block.plan.toJSON()) if block.plan else None
+            if getattr(block, "lazy_plan", False):
+                plan_json = json.dumps([])
+                plan_params = json.dumps(block.plan_params())
+            else:
+                plan_json = json.dumps([p.toJSON() for p in block.plan])
+                plan_params = None
+            block_type = type(block).__name__
+            break_info = json.dumps(block.break_info) if block.break_info else None
+            seq_json = json.dumps(block.sequence_key) if block.sequence_key else None
+           
+            cursor.execute(
+                """INSERT OR REPLACE INTO liquid_blocks 
+                   (station, liquid_type, start_time, end_time, break_strategy, title, sequence_key, break_info, content_json, plan_json, plan_params) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    station_name,
+                    block_type,
+                    block.start_time,
+                    block.end_time,
+                    block.break_strategy,
+                    block.title,
+                    seq_json,
+                    break_info,
+                    content_json,
+                    plan_json,
+                    plan_params,
+                ),
+            )
+
     def delete_liquid_blocks(self, station_name: str):
         with self._get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("DELETE FROM liquid_blocks WHERE station = ?", (station_name,))
+            cursor.execute("DELETE FROM liquid_build_checkpoint WHERE station = ?", (station_name,))
             cursor.close()
             connection.commit()
 
+    def archive_path(self) -> str:
+        """The sidecar database pruned blocks are archived to, next to the main database."""
+        base, ext = os.path.splitext(self.db_path)
+        return f"{base}_archive{ext or '.db'}"
+
+    def prune_liquid_blocks(self, before: datetime, archive_path: str = None, batch_size: int = None) -> int:
+        """
+        Delete blocks that ended before a cutoff, in batches, and return how many were removed.
+        With archive_path set, each batch is copied to that database first with its JSON compressed.
+        """
+        batch_size = batch_size if batch_size else LiquidIO.PRUNE_BATCH
+        cutoff = before.isoformat(" ")
+        pruned = 0
+        while True:
+            with self._get_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "SELECT * FROM liquid_blocks WHERE end_time < ? ORDER BY id LIMIT ?", (cutoff, batch_size)
+                )
+                rows = cursor.fetchall()
+                columns = [column[0] for column in cursor.description]
+                if rows:
+                    if archive_path:
+                        LiquidIO._archive_rows(archive_path, columns, rows)
+                    cursor.executemany("DELETE FROM liquid_blocks WHERE id = ?", [(row[0],) for row in rows])
+                cursor.close()
+            pruned += len(rows)
+            if len(rows) < batch_size:
+                return pruned
+
+    @staticmethod
+    def _archive_rows(archive_path: str, columns: list, rows: list):
+        connection = sqlite3.connect(archive_path)
+        try:
+            connection.execute("""CREATE TABLE IF NOT EXISTS liquid_blocks_archive (
+                                    id INTEGER PRIMARY KEY,
+                                    station TEXT NOT NULL,
+                                    liquid_type TEXT NOT NULL,
+                                    start_time TIMESTAMP,
+                                    end_time TIMESTAMP,
+                                    title TEXT,
+                                    block BLOB NOT NULL
+                                )""")
+            connection.execute("""CREATE INDEX IF NOT EXISTS idx_liquid_blocks_archive_station_time
+                                ON liquid_blocks_archive(station, start_time)""")
+            # the original id keeps a batch that was archived but not deleted from being archived twice
+            connection.executemany(
+                """INSERT OR IGNORE INTO liquid_blocks_archive
+                   (id, station, liquid_type, start_time, end_time, title, block)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (row[0], row[1], row[2], row[3], row[4], row[6], zlib.compress(json.dumps(dict(zip(columns, row))).encode()))
+                    for row in rows
+                ],
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    def compact(self):
+        """
+        Hand space freed by pruning back to the filesystem and refresh the query planner's statistics.
+        The first run switches the database to incremental auto-vacuum, which takes one full VACUUM.
+        """
+        with self._get_connection() as connection:
+            auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum != 2:
+                connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                connection.commit()
+                connection.execute("VACUUM")
+            else:
+                connection.execute(f"PRAGMA incremental_vacuum({LiquidIO.VACUUM_PAGES})").fetchall()
+            connection.execute("PRAGMA optimize")
+
     @staticmethod
     def _build_block_from_row(row, content_cache: dict = None):
         """
@@ -225,6 +387,7 @@ class LiquidIO:
         _break_info = json.loads(row[8]) if row[8] else None 
         _content_json = json.loads(row[9]) if row[9] else None
         _plan_json = json.loads(row[10]) if row[10] else []
+        _plan_params = json.loads(row[11]) if len(row) > 11 and row[11] else None
     
 
         content_obj = None
@@ -268,6 +431,20 @@ class LiquidIO:
         block = LiquidIO._block_factory(_liquid_type, args)
         block.sequence_key = _sequence_key
 
+        if _plan_params is not None:
+            # saved without a plan - the block works it out when it is read
+            block.lazy_plan = True
+            block.plan = None
+            if _liquid_type == "LiquidLoopBlock":
+                block.shuffle = _plan_params.get("shuffle", False)
+            elif _plan_params.get("sign_off"):
+                sign_off_id = int(_plan_params["sign_off"])
+                if content_cache is not None and sign_off_id in content_cache:
+                    block.sign_off = content_cache[sign_off_id]
+                else:
+                    block.sign_off = CatalogAPI.get_entry_by_id(sign_off_id)
+            return block
+
         plans = []
         for p in _plan_json:
             plans.append(BlockPlanEntry(p["path"], p["skip"], p["duration"], p["is_stream"], p.get("content_type", "feature"), p.get("media_type", "video")))
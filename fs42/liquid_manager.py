@@ -39,13 +39,22 @@ class LiquidManager(object):
             self._initialized = True
             self.reload_schedules()
 
-    def reload_schedules(self):
+    def reload_schedules(self, network_names=None):
+        """Reload schedules from the database - all of them, or only the named stations'."""
         self.station_configs = StationManager().stations
-        self.schedules = {}
+        if network_names is None or not hasattr(self, "schedules"):
+            self.schedules = {}
         for station in self.station_configs:
             if station["network_type"] != "guide" and station["network_type"] != "streaming":
                 _id = station["network_name"]
-                self.schedules[_id] = LiquidAPI.get_blocks(station)
+                if network_names is None or _id in network_names or _id not in self.schedules:
+                    self.schedules[_id] = LiquidAPI.get_blocks(station)
+
+    def add_emergency_blocks(self, network_name, blocks):
+        """Hold unsaved filler blocks in a station's schedule until the next reload replaces them."""
+        _blocks = self.schedules.get(network_name, []) + blocks
+        _blocks.sort(key=lambda b: b.start_time)
+        self.schedules[network_name] = _blocks
 
     def get_schedule_by_name(self, network_name):
         if network_name in self.schedules:
@@ -186,15 +195,16 @@ class LiquidManager(object):
         # get the block and get plan
         _block: LiquidBlock = self.get_programming_block(network_name, when)
 
-        # find index in block plan
+        # find index in block plan - read it once, lazy blocks work it out on every read
+        plan = _block.plan
         found_index = 0
         current_mark = _block.start_time
-        for entry in _block.plan:
+        for entry in plan:
             next_mark = current_mark + datetime.timedelta(seconds=entry.duration)
             if next_mark > when:
                 # then this is the index - calc offset
                 diff = when - current_mark
-                return PlayPoint(found_index, diff.total_seconds(), _block.plan, _block.title)
+                return PlayPoint(found_index, diff.total_seconds(), plan, _block.title)
             current_mark = next_mark
             found_index += 1
 
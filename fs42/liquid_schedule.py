@@ -6,6 +6,7 @@ sys.path.append(os.getcwd())
 import logging
 import datetime
 import math
+import random
 
 from fs42.catalog import ShowCatalog, MatchingContentNotFound
 from fs42.slot_reader import SlotReader
@@ -15,10 +16,12 @@ from fs42.sequence_api import SequenceAPI
 from fs42.catalog_api import CatalogAPI
 from fs42.liquid_api import LiquidAPI
 from fs42.marathon_agent import MarathonAgent
-from fs42.path_query import PathQuery
+from fs42.path_query import PathMatcher, PathQuery
 from fs42.station_manager import StationManager
 from fs42.liquid_io import LiquidIO
 from fs42.autobump_agent import AutoBumpAgent
+from fs42.fluid_builder import FluidBuilder
+from fs42.pod_library import PodLibrary
 
 # logging.basicConfig(format="%(asctime)s %(levelname)s:%(name)s:%(message)s", level=logging.INFO)
 
@@ -28,13 +31,45 @@ class ClipShowKickBack(Exception):
         super().__init__(message)
         self.clip_tag = clip_tag
 
+class BuildPaused(Exception):
+    """Raised between saved chunks when playback needs the machine - the build resumes from its checkpoint."""
+
 class LiquidSchedule:
-    def __init__(self, conf):
+    # the station's sequences, loaded once per _fluid build
+    _sequence_cache = None
+    # random source for the current build - seeded when the station sets schedule_seed
+    _rng = random
+    # plans shared by off-air and loop blocks within one build
+    _plan_cache = None
+    # a BuildThrottle set by background builds so they can step aside for playback
+    throttle = None
+    # PathMatchers over the clip_shows and tag_overrides keys, compiled once per schedule
+    _matchers = None
+
+    # _fluid plans and saves the schedule in chunks of this many days, each with a resume checkpoint
+    FLUSH_DAYS = 1
+    # blocks after a chunk that its plans look ahead to for coming-up-next bumps
+    LOOKAHEAD = 3
+    # hours of filler make_emergency_blocks covers while a proper build runs
+    EMERGENCY_HOURS = 2
+
+    def __init__(self, conf, load_blocks=True, lazy_catalog=None):
         self._l = logging.getLogger("Liquid")
         # self.conf = TagHintReader.smooth_tags(conf)
         self.conf = conf
-        self.catalog = ShowCatalog(conf)
-        self._load_blocks()
+        self.catalog = ShowCatalog(conf, lazy=lazy_catalog)
+        self._blocks = []
+        if load_blocks:
+            self._load_blocks()
+
+    def _conf_matcher(self, section) -> PathMatcher:
+        if self._matchers is None:
+            self._matchers = {}
+        matcher = self._matchers.get(section)
+        if matcher is None:
+            matcher = PathMatcher(self.conf[section].keys())
+            self._matchers[section] = matcher
+        return matcher
 
     def _calc_target_duration(self, duration, increment=None):
         # get the target duration for the show based on the schedule increment
@@ -45,6 +80,23 @@ class LiquidSchedule:
             return duration
         return multiple * math.ceil(duration / multiple)
 
+    def _build_rng(self, start_time):
+        """A random source for a build starting at start_time.
+
+        With schedule_seed set, the same station, seed and start make the same picks on every run.
+        """
+        seed = self.conf.get("schedule_seed")
+        if seed is None:
+            return random
+        start = start_time.isoformat() if start_time else ""
+        return random.Random(f"{seed}:{self.conf['network_name']}:{start}")
+
+    def _pause_for_playback(self):
+        # only called once a chunk and its checkpoint are saved, so the caller can drop the station lock,
+        # wait, and pick the build back up where it stopped
+        if self.throttle and self.throttle.holding():
+            raise BuildPaused(f"Paused the {self.conf['network_name']} build for playback")
+
     def _load_blocks(self):
         self._blocks = LiquidAPI.get_blocks(self.conf)
 
@@ -61,6 +113,8 @@ class LiquidSchedule:
         content = self.catalog.get_all_by_tag("content")
         new_blocks = []
         shuffle = self.conf.get("shuffle_loop", False)
+        self.catalog.rng = self._build_rng(start_time)
+        plan_cache = {}
 
         programming_name = (
             self.conf["network_long_name"] if "network_long_name" in self.conf else self.conf["network_name"]
@@ -74,11 +128,57 @@ class LiquidSchedule:
 
         self._l.info(f"Building plans for {len(new_blocks)} new schedule blocks")
         for block in new_blocks:
+            block.plan_cache = plan_cache
             block.make_plan(self.catalog)
 
+        self.catalog.rng = random
         LiquidAPI.add_blocks(self.conf, new_blocks)
         self._load_blocks()
 
+    def make_emergency_blocks(self, start_time, hours=None):
+        """Filler for a station that has run out of schedule, planned but not saved.
+
+        Plays clips from the station's tags (or a loop station's content) back to back with no breaks, so it
+        needs no break detection and is ready in well under a second. Returns [] when there is nothing to play.
+        Only needs a schedule made with load_blocks=False and lazy_catalog=True, which reads just those tags.
+        """
+        hours = self.EMERGENCY_HOURS if hours is None else hours
+        end_time = start_time + datetime.timedelta(hours=hours)
+        seconds = (end_time - start_time).total_seconds()
+
+        if self.conf["network_type"] == "loop":
+            tags = ["content"]
+        else:
+            tags = sorted(self._get_station_tags(self.conf))
+
+        seen = set()
+        candidates = []
+        for tag in tags:
+            for entry in self.catalog.get_all_by_tag(tag) or []:
+                if entry.path not in seen and entry.duration > 0 and entry.realpath not in self.catalog.quarantined:
+                    seen.add(entry.path)
+                    candidates.append(entry)
+
+        if candidates:
+            self.catalog.rng.shuffle(candidates)
+            clips = []
+            filled = 0
+            for entry in candidates:
+                clips.append(entry)
+                filled += entry.duration
+                if filled >= seconds:
+                    break
+            programming_name = self.conf.get("network_long_name", self.conf["network_name"])
+            block = LiquidLoopBlock(clips, start_time, end_time, programming_name, shuffle=True)
+        else:
+            offair = self.catalog.get_offair()
+            if offair is None:
+                return []
+            block = LiquidOffAirBlock(offair, start_time, end_time, "Offair")
+
+        block.make_plan(self.catalog)
+        return [block]
+
     def _fill(self, slot_config, tag_str, current_mark, tag_index=None, exclusion_index=None, first_in_slot=True) -> LiquidBlock:
         seq_key = None
         candidate = None
@@ -97,7 +197,9 @@ class LiquidSchedule:
                         f"{seq_ids[tag_index]}"
                     )
 
-            next_seq = SequenceAPI.get_next_in_sequence(self.conf, seq_name, tag_str)
+            next_seq = SequenceAPI.get_next_in_sequence(
+                self.conf, seq_name, tag_str, cache=self._sequence_cache, rng=self._rng
+            )
             if next_seq:
                 candidate = self.catalog.entry_by_fpath(next_seq.fpath)
 
@@ -130,7 +232,7 @@ class LiquidSchedule:
 
         if candidate:
 
-            the_match =  PathQuery.match_any_from_base(candidate.path, self.conf["content_dir"], self.conf["clip_shows"].keys())
+            the_match = PathQuery.match_any_from_base(candidate.path, self.conf["content_dir"], self._conf_matcher("clip_shows"))
             
             if the_match:
                 raise ClipShowKickBack(the_match, the_match)
@@ -201,7 +303,7 @@ class LiquidSchedule:
 
         #now determine if we have a tag level override
         if "tag_overrides" in self.conf:
-            match = PathQuery.match_any_from_base(candidate_path, self.conf["content_dir"], self.conf["tag_overrides"].keys())
+            match = PathQuery.match_any_from_base(candidate_path, self.conf["content_dir"], self._conf_matcher("tag_overrides"))
             override = None
             if match:
                 override = self.conf["tag_overrides"][match]
@@ -358,18 +460,31 @@ class LiquidSchedule:
                     exclusion_index[rp] = []
                 exclusion_index[rp].append((block.start_time, block.end_time))
 
-    def _fluid(self, start_time, end_target):
+    def _fluid(self, start_time, end_target, amount=None):
         # this is the core of the scheduler.
+        # blocks are held here until their chunk is planned and saved
         new_blocks = []
         current_mark = start_time
 
         if current_mark is None:
             current_mark = datetime.datetime.now()
 
+        fluid = FluidBuilder()
+        chunk_end = current_mark + datetime.timedelta(days=self.FLUSH_DAYS)
+        # where the current chunk ends in new_blocks, and the sequence positions at that point
+        cut = None
+        cut_state = None
+
         forward_buffer = []
 
         # build exclusion index from sibling channels that share the same content_dir
         exclusion_index = self._build_exclusion_index(start_time, end_target)
+        self._sequence_cache = SequenceAPI.load_sequence_cache(self.conf)
+        self.catalog.pod_library = PodLibrary(self.catalog)
+        self._rng = self._build_rng(current_mark)
+        self.catalog.rng = self._rng
+        self._plan_cache = {}
+        catalog_count = self._catalog_count()
 
         self._l.info(f"Starting to build blocks for {self.conf['network_name']}")
         slot_number = None
@@ -388,7 +503,7 @@ class LiquidSchedule:
                 first_in_slot = True
                 slot_number = this_slot_number
 
-            tag_str,tag_index = SlotReader.get_tag_from_slot(slot_config, current_mark)
+            tag_str,tag_index = SlotReader.get_tag_from_slot(slot_config, current_mark, self._rng)
 
 
             new_block = None
@@ -397,7 +512,7 @@ class LiquidSchedule:
                 onair_flag = True
                 
                 
-                if MarathonAgent.detect_marathon(slot_config, current_mark):
+                if MarathonAgent.detect_marathon(slot_config, current_mark, self._rng):
                     forward_buffer = MarathonAgent.fill_marathon(slot_config)
 
                 if tag_str not in self.conf["clip_shows"]:
@@ -450,17 +565,58 @@ class LiquidSchedule:
             new_blocks.append(new_block)
             self._register_exclusion(exclusion_index, new_block)
             current_mark = next_mark
+
+            if cut is None and current_mark >= chunk_end and current_mark < end_target and not forward_buffer:
+                # the chunk is complete - note the sequence positions before its lookahead blocks move them on
+                cut = len(new_blocks)
+                cut_state = SequenceAPI.get_sequence_state(self.conf)
+
+            if cut is not None and len(new_blocks) >= cut + self.LOOKAHEAD:
+                checkpoint = {
+                    "amount": amount,
+                    "target_end": end_target,
+                    "last_end": new_blocks[cut - 1].end_time,
+                    "sequence_state": cut_state,
+                    "catalog_count": catalog_count,
+                }
+                self._flush(new_blocks, cut, fluid, checkpoint)
+                new_blocks = new_blocks[cut:]
+                chunk_end = checkpoint["last_end"] + datetime.timedelta(days=self.FLUSH_DAYS)
+                cut = None
+                self._pause_for_playback()
+
+        self._sequence_cache = None
         self._l.info("Content and reel schedules are completed")
 
+        # the last chunk clears the checkpoint - the build is complete
+        self._flush(new_blocks, len(new_blocks), fluid, None)
+        self.catalog.pod_library = None
+        self.catalog.rng = random
+        self._rng = random
+        self._plan_cache = None
+        self._load_blocks()
+
+    def _flush(self, blocks, count, fluid, checkpoint):
+        """Plan the first count blocks and save them, their play counts and the checkpoint.
+
+        The blocks after count are only there as lookahead and are saved with a later chunk.
+        """
+        done = blocks[:count]
+        self._l.info(f"Building plans for {len(done)} new schedule blocks")
+
+        # read the break and chapter points for the whole chunk up front instead of per block
+        fluid.prefetch_points(
+            block.content.realpath for block in done
+            if not isinstance(block.content, list) and getattr(block.content, "realpath", None)
+        )
+
         # now, make plans for all the blocks and make list to update play counts
-        self._l.info(f"Building plans for {len(new_blocks)} new schedule blocks")
         play_counts = []
-
-        for i, block in enumerate(new_blocks):
+        for i, block in enumerate(done):
             # set lookahead tags for coming-up-next bump support
-            n   = new_blocks[i + 1] if i + 1 < len(new_blocks) else None
-            nn  = new_blocks[i + 2] if i + 2 < len(new_blocks) else None
-            nnn = new_blocks[i + 3] if i + 3 < len(new_blocks) else None
+            n   = blocks[i + 1] if i + 1 < len(blocks) else None
+            nn  = blocks[i + 2] if i + 2 < len(blocks) else None
+            nnn = blocks[i + 3] if i + 3 < len(blocks) else None
             block.lookahead = [
                 self._get_block_tag(block),
                 self._get_block_tag(n)   if n   else None,
@@ -468,6 +624,8 @@ class LiquidSchedule:
                 self._get_block_tag(nnn) if nnn else None,
             ]
 
+            block.fluid = fluid
+            block.plan_cache = self._plan_cache
             block.make_plan(self.catalog)
             if block.content:
                 # if the block has content, then we need to increment the play count
@@ -476,10 +634,32 @@ class LiquidSchedule:
         self._l.debug("Plans completed - updating play counts")
         CatalogAPI.update_play_counts(self.conf, play_counts)
         self._l.debug("Counts updated")
-        self._blocks = new_blocks
         self._l.info("Saving blocks to disk")
-        LiquidAPI.add_blocks(self.conf, new_blocks)
-        self._load_blocks()
+        LiquidAPI.add_block_chunk(self.conf, done, checkpoint)
+        if done:
+            self._l.info(f"Saved {len(done)} blocks through {done[-1].end_time}")
+
+    def _resume_checkpoint(self, how_much, current_end):
+        """The checkpoint of an interrupted build of the same amount that stopped where the saved schedule ends."""
+        checkpoint = LiquidAPI.get_checkpoint(self.conf)
+        if not checkpoint:
+            return None
+        if checkpoint["amount"] != how_much or checkpoint["last_end"] != current_end:
+            self._l.info("Discarding a build checkpoint that does not match this build")
+            LiquidAPI.clear_checkpoint(self.conf)
+            return None
+        if checkpoint.get("catalog_count") != self._catalog_count():
+            # the catalog was rebuilt since - the saved sequence positions may point at other files
+            self._l.info("Discarding a build checkpoint made against a different catalog")
+            LiquidAPI.clear_checkpoint(self.conf)
+            return None
+
+        self._l.info(f"Resuming the interrupted {how_much} build from {current_end} to {checkpoint['target_end']}")
+        SequenceAPI.restore_sequence_state(self.conf, checkpoint["sequence_state"])
+        return checkpoint
+
+    def _catalog_count(self):
+        return CatalogAPI.get_summary(self.conf)["entry_count"]
 
     def _increment(self, how_much):
         # add time to the existing schedule
@@ -487,7 +667,15 @@ class LiquidSchedule:
         current_end = self._end_time()
         start_building = None
         end_building = None
-        if current_end:
+        checkpoint = None
+        if self.conf["network_type"] == "standard":
+            checkpoint = self._resume_checkpoint(how_much, current_end)
+
+        if checkpoint:
+            # pick an interrupted build back up where its last chunk was saved
+            start_building = current_end
+            end_building = checkpoint["target_end"]
+        elif current_end:
             # then there is an existing schedule
             start_building = current_end
         else:
@@ -495,20 +683,21 @@ class LiquidSchedule:
             now = datetime.datetime.now()
             start_building = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-        if "schedule_offset" in self.conf:
+        if "schedule_offset" in self.conf and not checkpoint:
             # then we have an offset to apply
             start_building += datetime.timedelta(minutes=self.conf["schedule_offset"])
 
-        match how_much:
-            case "day":
-                end_building = start_building + datetime.timedelta(days=1)
-            case "week":
-                end_building = timings.next_week(start_building)
-            case "month":
-                end_building = timings.next_month(start_building)
+        if not checkpoint:
+            match how_much:
+                case "day":
+                    end_building = start_building + datetime.timedelta(days=1)
+                case "week":
+                    end_building = timings.next_week(start_building)
+                case "month":
+                    end_building = timings.next_month(start_building)
         match self.conf["network_type"]:
             case "standard":
-                self._fluid(start_building, end_building)
+                self._fluid(start_building, end_building, how_much)
             case "loop":
                 self._flood(start_building, end_building)
             case "guide":
@@ -1,29 +1,171 @@
 import multiprocessing
 import datetime
 import logging
+import os
+import queue
+import subprocess
+import time
 
 
-def _worker_build_schedules(lock, stations_to_build, amount_to_add):
+class ScheduleLocks:
+    """One lock per station, so building one schedule never holds up reads or builds of another.
+
+    Created before any worker is spawned so every process shares the same locks.
+    """
+
+    def __init__(self, network_names):
+        self._locks = {name: multiprocessing.Lock() for name in network_names}
+        # stations added after startup share this one
+        self._fallback = multiprocessing.Lock()
+
+    def for_station(self, network_name):
+        return self._locks.get(network_name, self._fallback)
+
+
+class BuildThrottle:
+    """Lets the player hold background builds while playback is struggling.
+
+    The player reports from its playback loop. Builds check holding() between saved chunks and, once out of
+    the station lock, call wait() to sleep while paused. A pause ends when the reports stop coming (the player
+    is gone or stuck) and a worker never pauses for more than MAX_PAUSE seconds in total.
+    """
+
+    # seconds between checks from the player
+    CHECK_INTERVAL = 5
+    # seconds a paused build sleeps before looking again
+    PAUSE_POLL = 1
+    # seconds without a report before a pause is treated as stale
+    STALE_AFTER = CHECK_INTERVAL * 2
+    # most seconds one worker spends paused, so a build always finishes
+    MAX_PAUSE = 600
+
+    def __init__(self, pause_load=None, pause_on_dropped_frames=True):
+        self._paused = multiprocessing.Event()
+        # wall clock time of the last report, shared with the workers
+        self._last_report = multiprocessing.Value("d", 0.0)
+        # seconds paused so far in this process
+        self._paused_for = 0
+        # 1-minute load average per core above which builds pause, or None to ignore load
+        self.pause_load = pause_load
+        self.pause_on_dropped_frames = pause_on_dropped_frames
+        self._last_check = None
+        self._last_drops = None
+
+    def due(self):
+        now = time.monotonic()
+        if self._last_check is None or now - self._last_check >= BuildThrottle.CHECK_INTERVAL:
+            self._last_check = now
+            return True
+        return False
+
+    def report(self, dropped_frames=None):
+        self._last_report.value = time.time()
+        busy = False
+        if self.pause_load is not None:
+            try:
+                busy = os.getloadavg()[0] / (os.cpu_count() or 1) > self.pause_load
+            except OSError:
+                pass
+        if self.pause_on_dropped_frames and dropped_frames is not None:
+            if self._last_drops is not None and dropped_frames > self._last_drops:
+                busy = True
+            self._last_drops = dropped_frames
+
+        if busy and not self._paused.is_set():
+            logging.getLogger("ScheduleAgent").info("Playback is busy - pausing background schedule builds")
+            self._paused.set()
+        elif not busy and self._paused.is_set():
+            logging.getLogger("ScheduleAgent").info("Resuming background schedule builds")
+            self._paused.clear()
+
+    def is_paused(self):
+        return self._paused.is_set()
+
+    def holding(self):
+        """True while builds should stay paused."""
+        if not self._paused.is_set():
+            return False
+        if time.time() - self._last_report.value > BuildThrottle.STALE_AFTER:
+            logging.getLogger("ScheduleAgent").info("Playback stopped reporting - resuming background schedule builds")
+            self._paused.clear()
+            return False
+        return self._paused_for < BuildThrottle.MAX_PAUSE
+
+    def wait(self):
+        while self.holding():
+            time.sleep(BuildThrottle.PAUSE_POLL)
+            self._paused_for += BuildThrottle.PAUSE_POLL
+            if self._paused_for >= BuildThrottle.MAX_PAUSE:
+                logging.getLogger("ScheduleAgent").info("Paused for too long - carrying on with background builds")
+
+
+def _lower_priority():
+    """Run this process at the lowest CPU and IO priority so it never competes with playback."""
+    _l = logging.getLogger("ScheduleAgent.Worker")
+    try:
+        os.nice(19)
+    except (AttributeError, OSError) as e:
+        _l.debug(f"Could not lower CPU priority: {e}")
+    try:
+        # idle IO class - disk access only when nothing else wants it
+        subprocess.run(["ionice", "-c", "3", "-p", str(os.getpid())], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        _l.debug(f"Could not lower IO priority: {e}")
+
+
+def _worker_build_schedules(
+    locks, stations_to_build, amount_to_add, done_queue, throttle=None, low_priority=True, retention=None
+):
     _l = logging.getLogger("ScheduleAgent.Worker")
     _l.info(f"Worker started - building {amount_to_add} for {len(stations_to_build)} station(s)")
 
+    if low_priority:
+        _lower_priority()
+
     # import here to avoid issues with multiprocessing and module state
-    from fs42.liquid_schedule import LiquidSchedule
+    from fs42.liquid_schedule import BuildPaused, LiquidSchedule
 
     for station_conf in stations_to_build:
         name = station_conf["network_name"]
         try:
             _l.info(f"Building {amount_to_add} of schedule for {name}")
-            with lock:
-                schedule = LiquidSchedule(station_conf)
-                schedule.add_amount(amount_to_add)
+            while True:
+                # never sleep holding the station lock - the player may need it to extend the schedule
+                if throttle:
+                    throttle.wait()
+                try:
+                    with locks.for_station(name):
+                        schedule = LiquidSchedule(station_conf)
+                        schedule.throttle = throttle
+                        schedule.add_amount(amount_to_add)
+                    break
+                except BuildPaused:
+                    _l.info(f"Paused the build for {name} - it resumes from its last saved day")
             _l.info(f"Finished building schedule for {name}")
+            done_queue.put(name)
         except Exception as e:
             _l.error(f"Failed to build schedule for {name}: {e}")
 
+    if retention:
+        _prune_history(retention, throttle)
+
     _l.info("Worker finished")
 
 
+def _prune_history(retention, throttle=None):
+    _l = logging.getLogger("ScheduleAgent.Worker")
+    from fs42.liquid_api import LiquidAPI
+
+    try:
+        if throttle:
+            throttle.wait()
+        keep_days = retention["keep_days"]
+        pruned = LiquidAPI.prune_blocks(keep_days, retention.get("archive", False))
+        _l.info(f"Pruned {pruned} schedule block(s) that ended more than {keep_days} day(s) ago")
+    except Exception as e:
+        _l.error(f"Failed to prune schedule history: {e}")
+
+
 class LiveScheduleAgent:
     # map config strings to timedeltas for the trigger threshold
     _trigger_deltas = {
@@ -32,13 +174,26 @@ class LiveScheduleAgent:
         "month": datetime.timedelta(days=30),
     }
 
-    def __init__(self, schedule_agent_conf, lock):
+    def __init__(self, schedule_agent_conf, locks):
         self._l = logging.getLogger("ScheduleAgent")
-        self._lock = lock
+        self._locks = locks
         self._amount_to_add = schedule_agent_conf["amount_to_add"]
         self._trigger_at = schedule_agent_conf["trigger_add_at"]
         self._trigger_delta = self._trigger_deltas[self._trigger_at]
+        # optional off-peak hours for builds, like a day part: {"start_hour": 2, "end_hour": 5}
+        self._build_window = schedule_agent_conf.get("build_window")
+        self._low_priority = schedule_agent_conf.get("low_priority", True)
+        # days of past schedule to keep - older blocks are pruned once a day, None keeps everything
+        self._keep_history_days = schedule_agent_conf.get("keep_history_days")
+        self._archive_pruned = schedule_agent_conf.get("archive_pruned", False)
+        self._last_prune = None
+        self.throttle = BuildThrottle(
+            schedule_agent_conf.get("pause_load"),
+            schedule_agent_conf.get("pause_on_dropped_frames", True),
+        )
         self._worker = None
+        # names of the stations the worker has finished, so only those are reloaded
+        self._done_queue = None
         self._last_check = None
         self._check_interval = datetime.timedelta(hours=1)
         self._l.info(
@@ -46,8 +201,50 @@ class LiveScheduleAgent:
             f"trigger_at={self._trigger_at}, amount_to_add={self._amount_to_add}"
         )
 
-    def get_lock(self):
-        return self._lock
+    def get_locks(self):
+        return self._locks
+
+    def _in_build_window(self, when):
+        if not self._build_window:
+            return True
+        start = self._build_window["start_hour"]
+        end = self._build_window["end_hour"]
+        if start <= end:
+            return start <= when.hour < end
+        # the window wraps midnight
+        return when.hour >= start or when.hour < end
+
+    def _next_window_start(self, when):
+        if self._in_build_window(when):
+            return when
+        start = when.replace(hour=self._build_window["start_hour"], minute=0, second=0, microsecond=0)
+        if start <= when:
+            start += datetime.timedelta(days=1)
+        return start
+
+    def _retention_due(self, now):
+        """The retention settings for the worker when pruning is due, otherwise None."""
+        if self._keep_history_days is None or not self._in_build_window(now):
+            return None
+        if self._last_prune is not None and now - self._last_prune < datetime.timedelta(days=1):
+            return None
+        return {"keep_days": self._keep_history_days, "archive": self._archive_pruned}
+
+    def _hold_for_window(self, stations, now):
+        """Stations that can wait for the build window - their schedules outlast its next opening."""
+        if self._in_build_window(now):
+            return []
+        from fs42.liquid_manager import LiquidManager
+
+        liquid = LiquidManager()
+        # the window may open up to one check interval before we notice, then leave an hour to build
+        deadline = self._next_window_start(now) + self._check_interval + datetime.timedelta(hours=1)
+        holding = []
+        for station in stations:
+            (_, end) = liquid.get_extents(station["network_name"])
+            if end is not None and end > deadline:
+                holding.append(station)
+        return holding
 
     def _needs_check(self):
         now = datetime.datetime.now()
@@ -84,6 +281,14 @@ class LiveScheduleAgent:
 
         return needs_build
 
+    def _rebuilt_stations(self):
+        names = []
+        while True:
+            try:
+                names.append(self._done_queue.get_nowait())
+            except queue.Empty:
+                return names
+
     def _worker_finished(self):
         if self._worker is None:
             return False
@@ -104,8 +309,12 @@ class LiveScheduleAgent:
         if self._worker_finished():
             from fs42.liquid_manager import LiquidManager
 
-            self._l.info("Reloading schedules after background build")
-            LiquidManager().reload_schedules()
+            rebuilt = self._rebuilt_stations()
+            self._done_queue = None
+            if not rebuilt:
+                return False
+            self._l.info(f"Reloading schedules after background build: {', '.join(rebuilt)}")
+            LiquidManager().reload_schedules(rebuilt)
             return True
 
         # don't spawn a new worker if one is running
@@ -117,13 +326,33 @@ class LiveScheduleAgent:
             return False
 
         stations = self._find_stations_needing_schedules()
-        if not stations:
+        holding = self._hold_for_window(stations, datetime.datetime.now())
+        if holding:
+            self._l.info(f"Holding {len(holding)} station build(s) for the build window")
+            stations = [station for station in stations if station not in holding]
+        now = datetime.datetime.now()
+        retention = self._retention_due(now)
+        if not stations and not retention:
             return False
+        if retention:
+            self._last_prune = now
 
-        self._l.info(f"Spawning worker to build schedules for {len(stations)} station(s)")
+        if stations:
+            self._l.info(f"Spawning worker to build schedules for {len(stations)} station(s)")
+        else:
+            self._l.info("Spawning worker to prune schedule history")
+        self._done_queue = multiprocessing.Queue()
         self._worker = multiprocessing.Process(
             target=_worker_build_schedules,
-            args=(self._lock, stations, self._amount_to_add),
+            args=(
+                self._locks,
+                stations,
+                self._amount_to_add,
+                self._done_queue,
+                self.throttle,
+                self._low_priority,
+                retention,
+            ),
             daemon=True,
         )
         self._worker.start()
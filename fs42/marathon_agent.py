@@ -3,7 +3,7 @@ from fs42.schedule_hint import hint_klass_matcher
 
 class MarathonAgent:
     @staticmethod
-    def detect_marathon(slot: dict, when):
+    def detect_marathon(slot: dict, when, rng=random):
         if "marathon" in slot and "count" in slot["marathon"]:
             marathon = slot["marathon"]
         else:
@@ -20,7 +20,7 @@ class MarathonAgent:
                         # there was a hint, but the time doesn't fit
                         return False
 
-            if random.random() < marathon["chance"]:
+            if rng.random() < marathon["chance"]:
                 return True
 
 
@@ -1,8 +1,10 @@
 import logging
 import os
 import glob
+import hashlib
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 # Validate ffmpeg-python package
 try:
@@ -34,6 +36,7 @@ except ImportError:
     sys.exit(1)
 
 from fs42.fluid_objects import FileRepoEntry
+from fs42.container_header import ContainerHeader
 from fs42 import timings
 
 try:
@@ -60,6 +63,16 @@ class MediaProcessor:
     # For backward compatibility, default to all formats
     supported_formats = VIDEO_FORMATS + AUDIO_FORMATS
 
+    # keyframe sampled black detection - width of the luma plane and seconds decoded either side of a candidate
+    FAST_BLACK_WIDTH = 160
+    FAST_BLACK_REFINE_WINDOW = 6.0
+
+    # bytes hashed from the head and tail of a file for its content fingerprint
+    FINGERPRINT_SAMPLE = 64 * 1024
+
+    # seconds decoded at the head, middle and tail of a file by the health check
+    HEALTH_SAMPLE = 2.0
+
     @staticmethod
     def get_media_type(file_path: str) -> str:
         ext = os.path.splitext(file_path)[1].lower().lstrip('.')
@@ -151,6 +164,10 @@ class MediaProcessor:
                 if cached:
                     duration = cached.duration
 
+            if not duration:
+                # mp4/mkv headers carry the duration - avoids spawning ffprobe for most files
+                duration = ContainerHeader.read_duration(fname) or 0.0
+
             if not duration:
                 # then do the processing
                 duration, error_hint = MediaProcessor._get_duration(fname)
@@ -248,6 +265,38 @@ class MediaProcessor:
             _l.debug(f"Unexpected error probing {file_name}: {e}")
             return -1, None
 
+    @staticmethod
+    def health_positions(duration) -> list[float]:
+        """Seek points for the health check - head, middle and tail, or just the head if the duration is unknown."""
+        if not duration or duration <= MediaProcessor.HEALTH_SAMPLE * 3:
+            return [0.0]
+        return [0.0, duration / 2, duration - MediaProcessor.HEALTH_SAMPLE * 2]
+
+    @staticmethod
+    def check_health(fname, duration) -> str | None:
+        """Decode a short sample from the head, middle and tail of a file.
+
+        Returns None when every sample decodes cleanly, otherwise a short description of the first failure.
+        """
+        _l = logging.getLogger("MEDIA")
+        for position in MediaProcessor.health_positions(duration):
+            try:
+                (
+                    ffmpeg.input(fname, ss=position, t=MediaProcessor.HEALTH_SAMPLE)
+                    .output("pipe:", format="null")
+                    .global_args("-v", "error", "-xerror")
+                    .run(capture_stdout=True, capture_stderr=True)
+                )
+            except ffmpeg.Error as e:
+                stderr = e.stderr.decode("utf-8", errors="replace").strip() if e.stderr else ""
+                last_line = stderr.splitlines()[-1] if stderr else "ffmpeg exited with an error"
+                _l.debug(f"Health check failed for {fname} at {position:.1f}s: {stderr}")
+                return f"decode failed at {position:.1f}s: {last_line}"
+            except Exception as e:
+                _l.debug(f"Unexpected error checking {fname}: {e}")
+                return f"could not be checked: {e}"
+        return None
+
     @staticmethod
     def _find_media(path, media_filter="video") -> list[str]:
         logging.getLogger("MEDIA").debug(f"_find_media scanning for media in {path} with filter={media_filter}")
@@ -272,24 +321,33 @@ class MediaProcessor:
         return file_list
 
     @staticmethod
-    def rich_find_media(path: str, media_filter="video") -> list[FileRepoEntry]:
-        file_list = MediaProcessor._rfind_media(path, media_filter)
+    def rich_find_media(path: str, media_filter="video", scan_workers=1) -> list[FileRepoEntry]:
         found_list = []
 
-        for fp in file_list:
+        for fp, stat in MediaProcessor.iter_media(path, media_filter, scan_workers, with_stat=True):
             entry = FileRepoEntry()
             entry.path = os.path.realpath(fp)
-            # get the full path:
-            stat = os.stat(fp)
             entry.last_mod = stat.st_mtime
             entry.size = stat.st_size
             found_list.append(entry)
         return found_list
 
     @staticmethod
-    def _rfind_media(path, media_filter="video") -> list[str]:
-        logging.getLogger("MEDIA").debug(f"_rfind_media scanning for media in {path} with filter={media_filter}")
+    def content_fingerprint(file_path, size=None) -> str:
+        """Identify a file by its size and a hash of its head and tail, so it can be recognised after a move."""
+        if size is None:
+            size = os.stat(file_path).st_size
+        sample = MediaProcessor.FINGERPRINT_SAMPLE
+        digest = hashlib.sha1()
+        with open(file_path, "rb") as f:
+            digest.update(f.read(sample))
+            if size > sample:
+                f.seek(max(sample, size - sample))
+                digest.update(f.read(sample))
+        return f"{size}-{digest.hexdigest()}"
 
+    @staticmethod
+    def _media_extensions(media_filter):
         # Determine which formats to scan based on filter
         if media_filter == "audio":
             formats_to_scan = MediaProcessor.AUDIO_FORMATS
@@ -298,14 +356,33 @@ class MediaProcessor:
         else:  # "mixed"
             formats_to_scan = MediaProcessor.supported_formats
 
-        # get all the files
-        file_list = []
-
-        extensions = {
+        return {
             f".{ext.lower()}"
             for ext in formats_to_scan
         }
 
+    @staticmethod
+    def _rfind_media(path, media_filter="video", scan_workers=1) -> list[str]:
+        logging.getLogger("MEDIA").debug(f"_rfind_media scanning for media in {path} with filter={media_filter}")
+
+        file_list = list(MediaProcessor.iter_media(path, media_filter, scan_workers))
+
+        logging.getLogger("MEDIA").debug(f"_rfind_media done scanning {path} {len(file_list)}")
+        return file_list
+
+    @staticmethod
+    def iter_media(path, media_filter="video", scan_workers=1, with_stat=False):
+        """Yield media files under path as they are found - (path, stat) tuples when with_stat is set.
+
+        With scan_workers > 1 directories are listed breadth first on a bounded thread pool, which
+        hides the per-directory round trip on NFS/SMB mounts. Local disks are fine with the default walk.
+        """
+        extensions = MediaProcessor._media_extensions(media_filter)
+
+        if scan_workers and scan_workers > 1:
+            yield from MediaProcessor._iter_media_concurrent(path, extensions, scan_workers, with_stat)
+            return
+
         for root, dirs, files in os.walk(path, followlinks=True):
             # glob skipped dotfiles - keep doing that so hidden dirs and
             # macos appledouble sidecars (._foo.mp4) don't get picked up as media
@@ -317,12 +394,50 @@ class MediaProcessor:
                     continue
 
                 if os.path.splitext(file)[1].lower() in extensions:
-                    file_list.append(
-                        os.path.join(root, file)
-                    )
+                    fp = os.path.join(root, file)
+                    yield (fp, os.stat(fp)) if with_stat else fp
 
-        logging.getLogger("MEDIA").debug(f"_rfind_media done scanning {path} {len(file_list)}")
-        return file_list
+    @staticmethod
+    def _iter_media_concurrent(path, extensions, scan_workers, with_stat):
+        listed = {}
+        with ThreadPoolExecutor(max_workers=scan_workers, thread_name_prefix="media-scan") as pool:
+            pending = {pool.submit(MediaProcessor._list_media_dir, path, extensions, with_stat): path}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs = future.result()
+                    listed[pending.pop(future)] = (files, subdirs)
+                    for subdir in subdirs:
+                        pending[pool.submit(MediaProcessor._list_media_dir, subdir, extensions, with_stat)] = subdir
+
+        # directories finish in whatever order the threads do, so hand the files back
+        # depth first in name order - seeded builds depend on catalog order
+        stack = [path]
+        while stack:
+            files, subdirs = listed[stack.pop()]
+            yield from files
+            stack.extend(reversed(subdirs))
+
+    @staticmethod
+    def _list_media_dir(dir_path, extensions, with_stat):
+        """List one directory - returns (media files, subdirectories), skipping dotfiles like the walk does."""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=True):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in extensions:
+                            files.append((entry.path, entry.stat()) if with_stat else entry.path)
+                    except OSError as e:
+                        logging.getLogger("MEDIA").debug(f"Skipping {entry.path}: {e}")
+        except OSError as e:
+            logging.getLogger("MEDIA").debug(f"Could not list {dir_path}: {e}")
+        return files, subdirs
 
     @staticmethod
     def _process_hints(path, tag, bumpdir=False):
@@ -345,14 +460,15 @@ class MediaProcessor:
         return hints
 
     @staticmethod
-    def _process_subs(dir_path, tag, bumpdir=False, fluid=None, content_type="feature", media_filter="video"):
+    def _process_subs(dir_path, tag, bumpdir=False, fluid=None, content_type="feature", media_filter="video",
+                      scan_workers=1):
         """Process all subdirectories recursively, collecting hints from all levels"""
         from collections import defaultdict
 
         # Get all media files in subdirectories only (root files are handled by _scan_directory)
         root = os.path.abspath(dir_path)
         all_files = [
-            f for f in MediaProcessor._rfind_media(dir_path, media_filter)
+            f for f in MediaProcessor.iter_media(dir_path, media_filter, scan_workers)
             if os.path.dirname(os.path.abspath(f)) != root
         ]
 
@@ -439,7 +555,84 @@ class MediaProcessor:
         return break_points
 
     @staticmethod
-    def black_detect(fname, base_duration, black_min_duration=0.1, black_pixel_tresh=0.1, black_ratio_thresh=0.95):
+    def _parse_black_midpoints(stderr_text, offset=0.0):
+        """Collect the midpoint of every black segment reported by ffmpeg's blackdetect filter."""
+        _l = logging.getLogger("MEDIA")
+        black_midpoints = []
+        for line in stderr_text.split("\n"):
+            if "blackdetect" in line:
+                try:
+                    parts = line.split("]")[1].strip().split(" ")
+                    info = {}
+                    for part in parts:
+                        if ":" in part:
+                            key, value = part.split(":")
+                            info[key] = float(value)
+                    if info:
+                        if "black_start" not in info or "black_end" not in info or "black_duration" not in info:
+                            # then not a good line
+                            continue
+
+                        # Calculate middle of black frame as the break point
+                        midpoint = (info["black_start"] + info["black_end"]) / 2
+                        black_midpoints.append(offset + midpoint)
+
+                except IndexError:
+                    _l.debug(f"Skipping malformed line: {line}")
+                    pass
+                except ValueError:
+                    _l.info(f"Skipping invalid data in line: {line}")
+                    pass
+                except Exception as e:
+                    _l.info(f"An unexpected error occurred while parsing line: {line}. Error: {e}")
+        return black_midpoints
+
+    @staticmethod
+    def _fast_black_midpoints(fname, black_pixel_tresh, black_ratio_thresh, black_min_duration):
+        """Find black segments by decoding keyframes only, then refine each candidate with a short full decode.
+
+        Keyframe-only decoding skips the vast majority of frames and the luma plane is shrunk
+        before blackdetect sees it, so the coarse pass runs in a fraction of the playback time.
+        """
+        _l = logging.getLogger("MEDIA")
+
+        # coarse pass - keyframes only, downscaled grayscale
+        coarse = (
+            ffmpeg.input(fname, skip_frame="nokey")
+            .filter("scale", MediaProcessor.FAST_BLACK_WIDTH, -2)
+            .filter("format", "gray")
+            .filter("blackdetect", d=0, pix_th=black_pixel_tresh, pic_th=black_ratio_thresh)
+            .output("pipe:", format="null")
+        )
+        _, stderr = coarse.run(capture_stdout=True, capture_stderr=True)
+        candidates = MediaProcessor._parse_black_midpoints(stderr.decode("utf-8"))
+        _l.info(f"Keyframe pass found {len(candidates)} candidate black segments in {fname}")
+
+        # refine pass - full decode in a small window around each candidate
+        refined = []
+        pad = MediaProcessor.FAST_BLACK_REFINE_WINDOW
+        for candidate in candidates:
+            window_start = max(0.0, candidate - pad)
+            refine = (
+                ffmpeg.input(fname, ss=window_start, t=pad * 2)
+                .filter("blackdetect", d=black_min_duration, pix_th=black_pixel_tresh, pic_th=black_ratio_thresh)
+                .output("pipe:", format="null")
+            )
+            try:
+                _, stderr = refine.run(capture_stdout=True, capture_stderr=True)
+            except ffmpeg.Error as e:
+                _l.debug(f"Could not refine black candidate at {candidate:.2f} in {fname}: {e}")
+                continue
+            points = MediaProcessor._parse_black_midpoints(stderr.decode("utf-8"), offset=window_start)
+            if points:
+                # the window can overlap a neighbour - keep the point closest to the candidate
+                refined.append(min(points, key=lambda p: abs(p - candidate)))
+
+        return sorted(set(refined))
+
+    @staticmethod
+    def black_detect(fname, base_duration, black_min_duration=0.1, black_pixel_tresh=0.1, black_ratio_thresh=0.95,
+                     fast=False):
         def min_segment(break_points):
             spx = sorted(break_points, key=lambda x: x["segment_duration"])
             return spx[0]["segment_duration"]
@@ -450,47 +643,26 @@ class MediaProcessor:
             return spx
 
         _l = logging.getLogger("MEDIA")
-        _l.info(f"Detecting black frames in {fname}")
+        _l.info(f"Detecting black frames in {fname}{' (keyframe sampling)' if fast else ''}")
 
         try:
-            # Build the ffmpeg command with blackdetect filter
-            filter_complex = (
-                ffmpeg.input(fname)
-                .filter("blackdetect", d=black_min_duration, pix_th=black_pixel_tresh, pic_th=black_ratio_thresh)
-                .output("pipe:", format="null")
-            )
+            if fast:
+                black_midpoints = MediaProcessor._fast_black_midpoints(
+                    fname, black_pixel_tresh, black_ratio_thresh, black_min_duration
+                )
+            else:
+                # Build the ffmpeg command with blackdetect filter
+                filter_complex = (
+                    ffmpeg.input(fname)
+                    .filter("blackdetect", d=black_min_duration, pix_th=black_pixel_tresh, pic_th=black_ratio_thresh)
+                    .output("pipe:", format="null")
+                )
 
-            # Actually run the command and capture its output
-            stdout, stderr = filter_complex.run(capture_stdout=True, capture_stderr=True)
+                # Actually run the command and capture its output
+                stdout, stderr = filter_complex.run(capture_stdout=True, capture_stderr=True)
 
-            # Decode and parse - collect all black frame midpoints
-            black_midpoints = []
-            for line in stderr.decode("utf-8").split("\n"):
-                if "blackdetect" in line:
-                    try:
-                        parts = line.split("]")[1].strip().split(" ")
-                        info = {}
-                        for part in parts:
-                            if ":" in part:
-                                key, value = part.split(":")
-                                info[key] = float(value)
-                        if info:
-                            if "black_start" not in info or "black_end" not in info or "black_duration" not in info:
-                                # then not a good line
-                                continue
-
-                            # Calculate middle of black frame as the break point
-                            midpoint = (info["black_start"] + info["black_end"]) / 2
-                            black_midpoints.append(midpoint)
-
-                    except IndexError:
-                        _l.debug(f"Skipping malformed line: {line}")
-                        pass
-                    except ValueError:
-                        _l.info(f"Skipping invalid data in line: {line}")
-                        pass
-                    except Exception as e:
-                        _l.info(f"An unexpected error occurred while parsing line: {line}. Error: {e}")
+                # Decode and parse - collect all black frame midpoints
+                black_midpoints = MediaProcessor._parse_black_midpoints(stderr.decode("utf-8"))
             _l.info(f"Found {len(black_midpoints)} black segments in {fname}")
 
             # Trim any near start and end times
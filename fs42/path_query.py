@@ -1,9 +1,81 @@
 from pathlib import Path
 
 
+class PathMatcher:
+    """A list of path patterns compiled once into component tries, so each lookup walks the path instead of the patterns.
+
+    Answers match the PathQuery functions they back - the first pattern in list order that matches wins.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        # nodes are dicts of path component -> child node, the pattern index sits under the None key
+        self._prefix = {}
+        self._suffix = {}
+        self._suffix_empty = None
+        for index, pattern in enumerate(self.patterns):
+            parts = Path(pattern).parts
+            PathMatcher._insert(self._prefix, parts, index)
+            if parts:
+                PathMatcher._insert(self._suffix, reversed(parts), index)
+            elif self._suffix_empty is None:
+                # an empty pattern only matches paths without any directory
+                self._suffix_empty = index
+
+    @staticmethod
+    def _insert(node, parts, index):
+        for part in parts:
+            node = node.setdefault(part, {})
+        node.setdefault(None, index)
+
+    @staticmethod
+    def _first(node, parts, best=None):
+        for part in parts:
+            node = node.get(part)
+            if node is None:
+                break
+            index = node.get(None)
+            if index is not None and (best is None or index < best):
+                best = index
+        return best
+
+    def _pattern(self, index):
+        return None if index is None else self.patterns[index]
+
+    def match_from_base(self, full_path, base_dir):
+        """Same as PathQuery.match_any_from_base"""
+        path_from_base = PathQuery.get_dir_from_base(full_path, base_dir)
+        if path_from_base is None:
+            return None
+        return self._pattern(PathMatcher._first(self._prefix, path_from_base.parts, self._prefix.get(None)))
+
+    def match_relative_end(self, full_path):
+        """Same as PathQuery.path_matches_any_relative"""
+        dir_parts = Path(full_path).parent.parts
+        best = self._suffix_empty if not dir_parts else None
+        return self._pattern(PathMatcher._first(self._suffix, reversed(dir_parts), best))
+
+
 class PathQuery:
     """Utility class for path comparison and querying operations."""
 
+    # compiled matchers keyed on their pattern tuple - catalogs reuse the same few pattern lists for every file
+    _matchers = {}
+
+    @staticmethod
+    def compile(patterns) -> PathMatcher:
+        # callers that match many paths against the same list can hold on to the matcher and pass it back in
+        if isinstance(patterns, PathMatcher):
+            return patterns
+        key = tuple(patterns)
+        matcher = PathQuery._matchers.get(key)
+        if matcher is None:
+            if len(PathQuery._matchers) > 64:
+                PathQuery._matchers.clear()
+            matcher = PathMatcher(key)
+            PathQuery._matchers[key] = matcher
+        return matcher
+
     @staticmethod
     def path_ends_with_relative(full_path, relative_path):
 
@@ -23,11 +95,7 @@ class PathQuery:
 
     @staticmethod
     def path_matches_any_relative(full_path, relative_paths):
-
-        for relative_path in relative_paths:
-            if PathQuery.path_ends_with_relative(full_path, relative_path):
-                return relative_path
-        return None
+        return PathQuery.compile(relative_paths).match_relative_end(full_path)
 
     @staticmethod
     def get_dir_from_base(full_path, base_dir):
@@ -53,10 +121,4 @@ class PathQuery:
 
     @staticmethod
     def match_any_from_base(full_path, base_dir, patterns):
-        path_from_base = PathQuery.get_dir_from_base(full_path, base_dir)
-
-        for pattern in patterns:
-            if PathQuery.path_starts_with(path_from_base, pattern):
-                return pattern
-
-        return None
+        return PathQuery.compile(patterns).match_from_base(full_path, base_dir)
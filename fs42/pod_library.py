@@ -0,0 +1,129 @@
+import json
+import math
+from collections import deque
+
+from fs42.hint_agent import HintAgent
+from fs42.media_processor import MediaProcessor
+from fs42.reel_packer import ReelPacker
+
+
+class _TagGroups:
+    """A commercial tag split into groups of entries that are always eligible together.
+
+    Entries share a group when they carry the same hints and matched the same meta hints, so what may air at
+    a given time is fixed by a mask with one flag per group instead of a test per entry.
+    """
+
+    def __init__(self, entries, meta_hints):
+        if meta_hints:
+            has_meta, no_meta = HintAgent.split_meta_hints(entries, meta_hints)
+            matched = [(meta["candidate"], meta["meta"]) for meta in has_meta] + [(entry, None) for entry in no_meta]
+        else:
+            matched = [(entry, None) for entry in entries]
+
+        groups = {}
+        for entry, meta in matched:
+            key = (
+                json.dumps([hint.toJSON() for hint in entry.hints], sort_keys=True),
+                tuple(id(m) for m in meta) if meta else None,
+            )
+            if key not in groups:
+                groups[key] = (entry.hints, meta, [])
+            groups[key][2].append(entry)
+        self.groups = list(groups.values())
+
+    def mask(self, when):
+        return tuple(
+            (MediaProcessor._test_candidate_hints(hints, when), HintAgent.evaluate_meta(meta, when) if meta else None)
+            for hints, meta, _ in self.groups
+        )
+
+    def eligible(self, mask, seconds, quarantined):
+        """The entries find_candidate would accept for this mask - mirrors HintAgent.filter_candidate_entries."""
+        exclusive = any(meta_state and meta_state[1] for _, meta_state in mask)
+        pool = []
+        for (hints_passed, meta_state), (_, _, entries) in zip(mask, self.groups):
+            if exclusive:
+                meta_passed = bool(meta_state and meta_state[1])
+            else:
+                meta_passed = meta_state is None or meta_state[0]
+            if hints_passed and meta_passed:
+                pool.extend(e for e in entries if seconds > e.duration >= 1 and e.realpath not in quarantined)
+        return pool
+
+
+class PodLibrary:
+    """Commercial pods for one schedule build.
+
+    Reel blocks with the same length, the same time left after bumps and the same eligible commercials draw
+    from a shared rotation of prebuilt pods instead of searching the commercial tag clip by clip. Each pod is
+    packed by ReelPacker, so it never runs past the time it was built for.
+    """
+
+    PODS_PER_BUCKET = 8
+    # times each pod airs before its bucket is rebuilt against the latest play counts
+    POD_REUSE = 2
+    # time left for commercials is rounded down to this many seconds when choosing a bucket
+    STEP = 5
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._tags = {}
+        self._buckets = {}
+
+    def take(self, tag, target_duration, remaining, when):
+        """Commercials for one reel block, or None when nothing under tag can air and the caller should search."""
+        groups = self._tag_groups(tag)
+        if groups is None:
+            return None
+
+        # round down so a pod packed for the bucket always fits the time actually left
+        remaining = math.floor(remaining / PodLibrary.STEP) * PodLibrary.STEP
+        key = (tag, target_duration, remaining, groups.mask(when))
+        bucket = self._buckets.get(key)
+        if not bucket:
+            bucket = self._build_bucket(groups, key[3], target_duration, remaining)
+            if bucket is None:
+                return None
+            self._buckets[key] = bucket
+
+        used = bucket.popleft()
+        used[0] += 1
+        if used[0] < PodLibrary.POD_REUSE:
+            bucket.append(used)
+
+        pod = used[1]
+        for entry in pod:
+            entry.count += 1
+        return list(pod)
+
+    def _tag_groups(self, tag):
+        entries = self.catalog.clip_index.get(tag)
+        if not entries:
+            return None
+        cached = self._tags.get(tag)
+        if cached and cached[0] is entries and cached[1] == len(entries):
+            return cached[2]
+        groups = _TagGroups(entries, self.catalog.config.get("meta_hints"))
+        self._tags[tag] = (entries, len(entries), groups)
+        return groups
+
+    def _build_bucket(self, groups, mask, target_duration, remaining):
+        pool = groups.eligible(mask, target_duration, self.catalog.quarantined)
+        if not pool:
+            return None
+
+        # later pods in the bucket see the airings planned by earlier ones, so the rotation stays fair
+        planned = {}
+        bucket = deque()
+        for _ in range(PodLibrary.PODS_PER_BUCKET):
+            pod = ReelPacker.pack(
+                pool, remaining, rng=self.catalog.rng, play_count=lambda e: e.count + planned.get(id(e), 0)
+            )
+            if not pod:
+                # out of steps or nothing fits - make_reel_block packs or searches on its own
+                break
+            for entry in pod:
+                planned[id(entry)] = planned.get(id(entry), 0) + 1
+            bucket.append([0, pod])
+        return bucket or None
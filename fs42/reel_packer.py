@@ -0,0 +1,59 @@
+import math
+import random
+
+
+class ReelPacker:
+    """Packs filler clips into a fixed amount of break time as a 0/1 knapsack over quantized durations.
+
+    Among the fullest packings it picks the one with the lowest total play count, so rotation stays fair.
+    """
+
+    # durations are rounded up to this many seconds, so a packing never runs past the target
+    QUANTUM = 0.5
+    # lowest played clips considered for one break - bounds the table to MAX_CANDIDATES x target/QUANTUM
+    MAX_CANDIDATES = 48
+    # table updates one pack may make before the caller falls back to the greedy fill - a work bound
+    # rather than a clock, so a seeded build packs the same way however busy the machine is
+    MAX_STEPS = 200000
+
+    @staticmethod
+    def pack(candidates, seconds, max_steps=None, max_candidates=None, rng=random, play_count=None):
+        """Choose clips whose durations fill seconds as closely as possible without going over.
+
+        play_count gives a clip's play count when it should not be read from entry.count.
+        Returns the chosen entries in random order ([] when nothing fits), or None if max_steps ran out.
+        """
+        play_count = play_count or (lambda c: c.count)
+        max_steps = ReelPacker.MAX_STEPS if max_steps is None else max_steps
+        max_candidates = ReelPacker.MAX_CANDIDATES if max_candidates is None else max_candidates
+        steps = 0
+
+        capacity = math.floor(seconds / ReelPacker.QUANTUM)
+        items = [c for c in candidates if 0 < c.duration <= seconds]
+        # shuffle first so equal play counts are sampled evenly
+        rng.shuffle(items)
+        items.sort(key=play_count)
+        items = items[:max_candidates]
+
+        # filled quanta -> (total play count, chain of (item index, previous chain))
+        best = {0: (0, None)}
+        for index, item in enumerate(items):
+            steps += len(best)
+            if steps > max_steps:
+                return None
+            weight = math.ceil(item.duration / ReelPacker.QUANTUM)
+            for filled, (cost, chain) in list(best.items()):
+                total = filled + weight
+                if total > capacity:
+                    continue
+                new_cost = cost + play_count(item)
+                if total not in best or new_cost < best[total][0]:
+                    best[total] = (new_cost, (index, chain))
+
+        chain = best[max(best)][1]
+        chosen = []
+        while chain:
+            index, chain = chain
+            chosen.append(items[index])
+        rng.shuffle(chosen)
+        return chosen
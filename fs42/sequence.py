@@ -20,7 +20,8 @@ class NamedSequence:
         end_perc: float,
         current_index: int,
         file_list: list[str],
-        initialized: bool = False
+        initialized: bool = False,
+        rng=random
     ):
         self.station_name = station_name
         self.sequence_name = sequence_name
@@ -32,14 +33,14 @@ class NamedSequence:
         self.episodes = []  # Initialize episodes as an empty list
         self.start_index = 0
         self.end_index = 0
-        self.populate(file_list)  # Populate episodes with the provided file list
+        self.populate(file_list, rng)  # Populate episodes with the provided file list
 
 
 
     def __str__(self):
         return f"NamedSequence(station={self.station_name}, sequence={self.sequence_name}, tag={self.tag_path}, start={self.start_perc}, end={self.end_perc}, index={self.current_index})"
 
-    def populate(self, file_list):
+    def populate(self, file_list, rng=random):
         self.episodes = []  # Reset the episodes list
         for file in file_list:
             entry = SequenceEntry(file)
@@ -52,7 +53,7 @@ class NamedSequence:
 
         if self.start_perc < 0 and not self.initialized:
             self.start_index = 0
-            self.current_index = random.randrange(self.start_index,self.end_index)
+            self.current_index = rng.randrange(self.start_index,self.end_index)
             self.initialized = True
         elif self.start_perc >= 0 and not self.initialized:
             self.start_index = math.floor(self.start_perc * (len(self.episodes)))
@@ -13,6 +13,33 @@ SEASON_RE = re.compile(
     re.IGNORECASE
 )
 
+class SequenceCache:
+    """A station's named sequences held in memory for the length of a schedule build.
+
+    Loaded with a single query so each sequenced slot stops re-reading its sequence and child list -
+    index changes are still written through to the database as they happen.
+    """
+
+    def __init__(self, sequences):
+        self._sequences = {}
+        self._children = {}
+        for seq in sequences:
+            self.add(seq)
+
+    def add(self, seq):
+        self._sequences[(seq.sequence_name, seq.tag_path)] = seq
+        # register under every parent folder, like the LIKE 'parent/%' lookup in SequenceIO
+        parts = seq.tag_path.split("/")
+        for depth in range(1, len(parts)):
+            self._children.setdefault((seq.sequence_name, "/".join(parts[:depth])), []).append(seq.tag_path)
+
+    def get(self, sequence_name, tag_path) -> NamedSequence:
+        return self._sequences.get((sequence_name, tag_path))
+
+    def children(self, sequence_name, parent_tag) -> list[str]:
+        return list(self._children.get((sequence_name, parent_tag), []))
+
+
 class SequenceAPI:
     @staticmethod
     def make_sequence_key(station_config, sequence_name, tag_path) -> dict:
@@ -25,6 +52,34 @@ class SequenceAPI:
         slist = sio.get_all_sequences_for_station(station_config['network_name'])
         return slist
 
+    @staticmethod
+    def get_sequence_state(station_config) -> dict:
+        return SequenceIO().get_sequence_state(station_config["network_name"])
+
+    @staticmethod
+    def restore_sequence_state(station_config, state):
+        if state:
+            SequenceIO().restore_sequence_state(station_config["network_name"], state)
+
+    @staticmethod
+    def load_sequence_cache(station_config) -> SequenceCache:
+        return SequenceCache(SequenceAPI.get_sequences_for_station(station_config))
+
+    @staticmethod
+    def _load_sequence(sio, station_config, sequence_name, tag_path, cache=None) -> NamedSequence:
+        seq = cache.get(sequence_name, tag_path) if cache else None
+        if seq is None:
+            seq = sio.get_sequence(station_config["network_name"], sequence_name, tag_path)
+            if seq and cache:
+                cache.add(seq)
+        return seq
+
+    @staticmethod
+    def _child_sequences(sio, station_config, sequence_name, parent_tag, cache=None):
+        if cache:
+            return cache.children(sequence_name, parent_tag)
+        return sio.get_child_sequences(station_config["network_name"], sequence_name, parent_tag)
+
     @staticmethod
     def get_sequence(station_config, sequence_name, tag_path) -> NamedSequence:
         _l = logging.getLogger("SEQUENCE")
@@ -45,15 +100,18 @@ class SequenceAPI:
         return seq
 
     @staticmethod
-    def get_next_in_sequence(station_config, sequence_name, tag_path) -> SequenceEntry:
+    def get_next_in_sequence(station_config, sequence_name, tag_path, cache=None, rng=random) -> SequenceEntry:
+        """Advance a sequence and return its next entry - pass a SequenceCache to reuse loaded sequences across a build."""
         _l = logging.getLogger("SEQUENCE")
         sio = SequenceIO()
         tag_path = SequenceAPI._get_active_child_sequence(
             station_config,
             sequence_name,
-            tag_path
+            tag_path,
+            cache,
+            rng
         )
-        seq = sio.get_sequence(station_config["network_name"], sequence_name, tag_path)
+        seq = SequenceAPI._load_sequence(sio, station_config, sequence_name, tag_path, cache)
         
         next_entry = None
         if not seq:
@@ -75,11 +133,7 @@ class SequenceAPI:
             )
             parent_tag = seq.tag_path.rsplit("/",1)[0]
 
-            children = sio.get_child_sequences(
-                station_config["network_name"],
-                sequence_name,
-                parent_tag
-            )
+            children = SequenceAPI._child_sequences(sio, station_config, sequence_name, parent_tag, cache)
 
             if children:
 
@@ -87,7 +141,9 @@ class SequenceAPI:
                     station_config,
                     sequence_name,
                     parent_tag,
-                    seq.tag_path
+                    seq.tag_path,
+                    cache,
+                    rng
                 )
 
                 _l.info(
@@ -102,11 +158,7 @@ class SequenceAPI:
                     next_child
                 )
 
-                next_seq = sio.get_sequence(
-                    station_config["network_name"],
-                    sequence_name,
-                    next_child
-                )
+                next_seq = SequenceAPI._load_sequence(sio, station_config, sequence_name, next_child, cache)
                 
                 next_seq.current_index = 0
                 if next_seq.start_index > 0:
@@ -188,9 +240,9 @@ class SequenceAPI:
         _l.debug(f"Rebuilt sequences for {station_config['network_name']}")
 
     @staticmethod
-    def scan_sequences(station_config):
+    def scan_sequences(station_config, rng=random):
         for slot in SequenceAPI._sequence_slots(station_config):
-            SequenceAPI._scan_sequence_slot(station_config, slot)
+            SequenceAPI._scan_sequence_slot(station_config, slot, rng)
 
     @staticmethod
     def _sequence_slots(station_config):
@@ -231,7 +283,7 @@ class SequenceAPI:
                             yield slot
 
     @staticmethod
-    def _scan_sequence_slot(station_config, slot):
+    def _scan_sequence_slot(station_config, slot, rng=random):
         if "sequence" not in slot or "tags" not in slot:
             return
 
@@ -249,14 +301,14 @@ class SequenceAPI:
                         f"{slot['sequence']}{slot_tag_index}"
                     )
 
-                    SequenceAPI._build_sequence(station_config, tag, slot_copy)
+                    SequenceAPI._build_sequence(station_config, tag, slot_copy, rng)
                 else:
-                    SequenceAPI._build_sequence(station_config, tag, slot)
+                    SequenceAPI._build_sequence(station_config, tag, slot, rng)
         else:
-            SequenceAPI._build_sequence(station_config, slot["tags"], slot)
+            SequenceAPI._build_sequence(station_config, slot["tags"], slot, rng)
 
     @staticmethod
-    def _build_sequence(station_config, this_tag, slot):
+    def _build_sequence(station_config, this_tag, slot, rng=random):
         _l = logging.getLogger("SEQUENCE")
         seq_tag = this_tag
         seq_name = slot.get("effective_sequence",slot["sequence"])
@@ -307,7 +359,7 @@ class SequenceAPI:
                     child_tag
                 )
 
-                file_list = MediaProcessor._rfind_media(show_dir)
+                file_list = MediaProcessor._rfind_media(show_dir, scan_workers=station_config.get("scan_workers", 1))
 
                 if not file_list:
                     continue
@@ -322,7 +374,8 @@ class SequenceAPI:
                         seq_end,
                         0,
                         file_list,
-                        False
+                        False,
+                        rng
                     )
 
                     sio.put_sequence(
@@ -388,7 +441,9 @@ class SequenceAPI:
 
             return
         else:
-            file_list = MediaProcessor._rfind_media(f"{station_config['content_dir']}/{real_tag}")
+            file_list = MediaProcessor._rfind_media(
+                f"{station_config['content_dir']}/{real_tag}", scan_workers=station_config.get("scan_workers", 1)
+            )
 
         if not existing:
             seq_start = 0
@@ -398,7 +453,9 @@ class SequenceAPI:
             if "sequence_end" in slot:
                 seq_end = slot["sequence_end"]
 
-            ns = NamedSequence(station_config["network_name"], seq_name, seq_tag, seq_start, seq_end, 0, file_list, False)
+            ns = NamedSequence(
+                station_config["network_name"], seq_name, seq_tag, seq_start, seq_end, 0, file_list, False, rng
+            )
             sio.put_sequence(station_config["network_name"], ns)
         else:
             disk_files = set(str(f) for f in file_list)
@@ -423,15 +480,13 @@ class SequenceAPI:
         station_config,
         sequence_name,
         parent_tag,
-        current_tag_path=None
+        current_tag_path=None,
+        cache=None,
+        rng=random
     ):
         sio = SequenceIO()
 
-        children = sio.get_child_sequences(
-            station_config["network_name"],
-            sequence_name,
-            parent_tag
-        )
+        children = SequenceAPI._child_sequences(sio, station_config, sequence_name, parent_tag, cache)
 
         if not children:
             return None
@@ -467,21 +522,19 @@ class SequenceAPI:
         if not available:
             available = children
 
-        return random.choice(available)
+        return rng.choice(available)
         
     @staticmethod
     def _get_active_child_sequence(
         station_config,
         sequence_name,
-        parent_tag
+        parent_tag,
+        cache=None,
+        rng=random
     ):
         sio = SequenceIO()
 
-        children = sio.get_child_sequences(
-            station_config["network_name"],
-            sequence_name,
-            parent_tag
-        )
+        children = SequenceAPI._child_sequences(sio, station_config, sequence_name, parent_tag, cache)
 
         if not children:
             return parent_tag
@@ -496,7 +549,7 @@ class SequenceAPI:
             not active_child
             or active_child not in children
         ):
-            active_child = random.choice(children)
+            active_child = rng.choice(children)
 
             sio.set_active_sequence(
                 station_config["network_name"],
@@ -138,23 +138,27 @@ class SequenceIO:
             named_sequence_id = row[0]
 
             # Replace entries
-            cursor.execute(
-                "DELETE FROM sequence_entries WHERE named_sequence_id = ?",
-                (named_sequence_id,),
-            )
-
-            for index, entry in enumerate(named_sequence.episodes):
-                cursor.execute(
-                    """
-                    INSERT INTO sequence_entries
-                        (fpath, sequence_index, named_sequence_id)
-                    VALUES (?, ?, ?)
-                    """,
-                    (entry.fpath, index, named_sequence_id),
-                )
+            SequenceIO._replace_entries(cursor, named_sequence_id, [entry.fpath for entry in named_sequence.episodes])
 
             connection.commit()
 
+    @staticmethod
+    def _replace_entries(cursor, named_sequence_id, file_paths) -> bool:
+        """Rewrite a sequence's entries in one batch - returns False and leaves them alone when nothing changed."""
+        cursor.execute(
+            "SELECT fpath FROM sequence_entries WHERE named_sequence_id = ? ORDER BY sequence_index",
+            (named_sequence_id,),
+        )
+        if [row[0] for row in cursor.fetchall()] == file_paths:
+            return False
+
+        cursor.execute("DELETE FROM sequence_entries WHERE named_sequence_id = ?", (named_sequence_id,))
+        cursor.executemany(
+            "INSERT INTO sequence_entries (fpath, sequence_index, named_sequence_id) VALUES (?, ?, ?)",
+            [(fpath, index, named_sequence_id) for index, fpath in enumerate(file_paths)],
+        )
+        return True
+
     def get_sequence(self, station_name: str, sequence_name: str, tag_path: str) -> NamedSequence:
         with self._get_connection() as connection:
             cursor = connection.cursor()
@@ -189,37 +193,77 @@ class SequenceIO:
     def get_all_sequences_for_station(self, station_name: str) -> list[NamedSequence]:
         with self._get_connection() as connection:
             cursor = connection.cursor()
+            # one pass over the station's sequences and their entries, grouped below
             cursor.execute(
-                """SELECT id, sequence_name, tag_path, start_perc, end_perc, current_index, initialized
-                              FROM named_sequence
-                              WHERE station = ?""",
+                """SELECT ns.id, ns.sequence_name, ns.tag_path, ns.start_perc, ns.end_perc, ns.current_index,
+                          ns.initialized, se.fpath
+                              FROM named_sequence ns
+                              LEFT JOIN sequence_entries se ON se.named_sequence_id = ns.id
+                              WHERE ns.station = ?
+                              ORDER BY ns.id, se.sequence_index""",
                 (station_name,),
             )
-            rows = cursor.fetchall()
 
-            if not rows:
-                return []
+            grouped = {}
+            for row in cursor.fetchall():
+                named_sequence_id, fpath = row[0], row[7]
+                if named_sequence_id not in grouped:
+                    grouped[named_sequence_id] = (row[1:7], [])
+                if fpath is not None:
+                    grouped[named_sequence_id][1].append(fpath)
 
             sequences = []
-            for row in rows:
-                named_sequence_id, sequence_name, tag_path, start_perc, end_perc, current_index, initialized = row
-
-                # Now retrieve the sequence entries for this sequence
-                cursor.execute(
-                    """SELECT fpath FROM sequence_entries
-                                  WHERE named_sequence_id = ? ORDER BY sequence_index""",
-                    (named_sequence_id,),
-                )
-                file_paths = [entry_row[0] for entry_row in cursor.fetchall()]
-
+            newly_initialized = []
+            for (sequence_name, tag_path, start_perc, end_perc, current_index, initialized), file_paths in grouped.values():
                 ns = NamedSequence(station_name, sequence_name, tag_path, start_perc, end_perc, current_index, file_paths, bool(initialized))
                 if ns.initialized != bool(initialized):
-                    self.update_initialized(station_name, sequence_name, tag_path, ns.initialized)
+                    newly_initialized.append((int(ns.initialized), station_name, sequence_name, tag_path))
                 sequences.append(ns)
 
+            if newly_initialized:
+                cursor.executemany(
+                    """UPDATE named_sequence
+                                  SET initialized = ?
+                                  WHERE station = ? AND sequence_name = ? AND tag_path = ?""",
+                    newly_initialized,
+                )
+
             return sequences
 
 
+    def get_sequence_state(self, station_name: str) -> dict:
+        """The playback position of every sequence on the station and its active child sequences."""
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT sequence_name, tag_path, current_index FROM named_sequence WHERE station = ?",
+                (station_name,),
+            )
+            indexes = [list(row) for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT sequence_name, parent_tag, active_tag_path FROM sequence_group_state WHERE station = ?",
+                (station_name,),
+            )
+            active = [list(row) for row in cursor.fetchall()]
+            return {"indexes": indexes, "active": active}
+
+    def restore_sequence_state(self, station_name: str, state: dict):
+        """Put the station's sequences back to a state saved by get_sequence_state."""
+        with self._get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """UPDATE named_sequence SET current_index = ?
+                              WHERE station = ? AND sequence_name = ? AND tag_path = ?""",
+                [(index, station_name, name, tag_path) for name, tag_path, index in state.get("indexes", [])],
+            )
+            cursor.execute("DELETE FROM sequence_group_state WHERE station = ?", (station_name,))
+            cursor.executemany(
+                """INSERT INTO sequence_group_state (station, sequence_name, parent_tag, active_tag_path)
+                              VALUES (?, ?, ?, ?)""",
+                [(station_name, name, parent_tag, active) for name, parent_tag, active in state.get("active", [])],
+            )
+            connection.commit()
+
     def delete_sequences_for_station(self, station_name: str):
         with self._get_connection() as connection:
             cursor = connection.cursor()
@@ -355,13 +399,9 @@ class SequenceIO:
                 new_index = 0
                 _l.debug(f"update_sequence_entries: index {fallback_index} out of bounds for {len(sorted_files)} files, resetting to 0")
 
-            cursor.execute("DELETE FROM sequence_entries WHERE named_sequence_id = ?", (named_sequence_id,))
-
-            for idx, fpath in enumerate(sorted_files):
-                cursor.execute(
-                    "INSERT INTO sequence_entries (fpath, sequence_index, named_sequence_id) VALUES (?, ?, ?)",
-                    (fpath, idx, named_sequence_id),
-                )
+            if not SequenceIO._replace_entries(cursor, named_sequence_id, sorted_files):
+                _l.debug("update_sequence_entries: file list unchanged, leaving entries and index alone")
+                return
 
             cursor.execute(
                 "UPDATE named_sequence SET current_index = ? WHERE id = ?",
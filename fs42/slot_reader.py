@@ -9,7 +9,7 @@ from fs42 import timings
 class SlotReader:
 
     @staticmethod
-    def get_tag_from_slot(slot, when: datetime):
+    def get_tag_from_slot(slot, when: datetime, rng=random):
         response = None
         tag_index = None
         if slot and "tags" in slot:
@@ -22,7 +22,7 @@ class SlotReader:
 
             if type(tags) is list:
                 if is_random:
-                    tag_index = random.randrange(len(tags))
+                    tag_index = rng.randrange(len(tags))
                     response = tags[tag_index]
                 else:
                     # first, figure out what our segments are
@@ -37,6 +37,7 @@ from fs42.reception import (
 from fs42.liquid_manager import LiquidManager, PlayPoint, ScheduleNotFound, ScheduleQueryNotInBounds
 
 from fs42.liquid_schedule import LiquidSchedule
+from fs42.live_schedule_agent import ScheduleLocks, _worker_build_schedules
 from fs42.station_manager import StationManager
 from fs42.slot_reader import SlotReader
 
@@ -194,7 +195,11 @@ class StationPlayer:
         self.web_queue = None
         self.scrambler = None
         self.now_playing_process = None
-        self.schedule_lock = None
+        self.schedule_locks = None
+        # a BuildThrottle told about dropped frames so background builds pause
+        self.build_throttle = None
+        # network_name -> (process, queue) for builds started by schedule_panic
+        self._panic_builds = {}
         self._active_afx = None
         self._pending_response = None
 
@@ -797,23 +802,89 @@ class StationPlayer:
                     return response
         return PlayerOutcome(PlayerState.SUCCESS)
 
+    def _report_playback_load(self):
+        if not self.build_throttle or not self.build_throttle.due():
+            return
+        try:
+            dropped = self.mpv.frame_drop_count
+        except Exception:
+            dropped = None
+        self.build_throttle.report(dropped)
+
+    def _emergency_fill(self, network_name):
+        """Cover the next few hours with filler right away and build the real schedule in the background."""
+        station_conf = StationManager().station_by_name(network_name)
+        if station_conf["network_type"] not in ("standard", "loop"):
+            return False
+
+        liquid = LiquidManager()
+        now = datetime.datetime.now().replace(second=0, microsecond=0)
+        try:
+            (_, end) = liquid.get_extents(network_name)
+        except ValueError:
+            end = None
+        # pick up right where the schedule ran out if that was within the last minute
+        start = end if end and now <= end <= datetime.datetime.now() else now
+
+        try:
+            schedule = LiquidSchedule(station_conf, load_blocks=False, lazy_catalog=True)
+            blocks = schedule.make_emergency_blocks(start)
+        except Exception as e:
+            self._l.error(f"Emergency fill failed for {network_name}: {e}")
+            return False
+        if not blocks:
+            return False
+        liquid.add_emergency_blocks(network_name, blocks)
+        self._l.warning(f"Playing filler on {network_name} until {blocks[-1].end_time}")
+
+        if network_name not in self._panic_builds:
+            locks = self.schedule_locks if self.schedule_locks else ScheduleLocks([network_name])
+            done_queue = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=_worker_build_schedules,
+                args=(locks, [station_conf], "day", done_queue),
+                daemon=True,
+            )
+            worker.start()
+            self._panic_builds[network_name] = (worker, done_queue)
+        return True
+
+    def _reap_panic_builds(self):
+        """Swap in the schedules that finished building since schedule_panic filled in for them."""
+        rebuilt = []
+        for network_name, (worker, done_queue) in list(self._panic_builds.items()):
+            if worker.is_alive():
+                continue
+            del self._panic_builds[network_name]
+            if not done_queue.empty():
+                rebuilt.append(network_name)
+            else:
+                self._l.error(f"Background schedule build failed for {network_name}")
+        if rebuilt:
+            self._l.warning(f"Replacing filler with the new schedule for: {', '.join(rebuilt)}")
+            LiquidManager().reload_schedules(rebuilt)
+
     def schedule_panic(self, network_name):
         self._l.critical("*********************Schedule Panic*********************")
+        if self._emergency_fill(network_name):
+            return
         self._l.critical(f"Schedule not found for {network_name} - attempting to generate a one-day extention")
-        if self.schedule_lock:
-            self.schedule_lock.acquire()
+        lock = self.schedule_locks.for_station(network_name) if self.schedule_locks else None
+        if lock:
+            lock.acquire()
         try:
             schedule = LiquidSchedule(StationManager().station_by_name(network_name))
             schedule.add_days(1)
-            self._l.warning(f"Schedule extended for {network_name} - reloading schedules now")
-            LiquidManager().reload_schedules()
+            self._l.warning(f"Schedule extended for {network_name} - reloading its schedule now")
+            LiquidManager().reload_schedules([network_name])
         except Exception as e:
             self._l.error(f"Schedule panic failed for {network_name}: {e}")
         finally:
-            if self.schedule_lock:
-                self.schedule_lock.release()
+            if lock:
+                lock.release()
 
     def play_slot(self, network_name, when):
+        self._reap_panic_builds()
         liquid = LiquidManager()
 
         try:
@@ -899,6 +970,7 @@ class StationPlayer:
                     # this is our main event loop
                     keep_waiting = True
                     while keep_waiting:
+                        self._report_playback_load()
                         if not self.skip_reception_check:
                             self.update_reception()
                         else:
@@ -119,7 +119,7 @@ class CatalogScreen(Screen):
 
             if "catalog_path" in station:
                 try:
-                    (vcount, tcount) = ShowCatalog(station).summary_data()
+                    (vcount, tcount) = ShowCatalog(station, load=False).summary_data()
                     self.dt.add_row(network_name, station["channel_number"], station["network_type"], vcount, tcount)
                 except FileNotFoundError:
                     self.dt.add_row(
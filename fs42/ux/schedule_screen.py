@@ -136,7 +136,7 @@ class ScheduleScreen(Screen):
         for station in StationManager().stations:
             try:
                 if station["network_type"] != "guide" and station["network_type"] != "streaming":
-                    ShowCatalog(station)
+                    ShowCatalog(station, lazy=True)
             except FileNotFoundError:
                 all_found = False
                 break
@@ -54,7 +54,7 @@ class WelcomeScreen(Screen):
             if "catalog_path" in station and station["network_type"] not in StationManager().no_catalog:
                 catalog_exists = False
                 try:
-                    cat = ShowCatalog(station, False)
+                    cat = ShowCatalog(station, False, load=False)
                     text += f"Catalog summary: {cat.summary()}\n\n"
                     catalog_exists = True
                 except FileNotFoundError:
@@ -97,11 +97,26 @@ def build_parser():
         "--break_detect_dir",
         help="Scan for points break insertion point in media files in the provided directory. (VERY experimental)",
     )
+    parser.add_argument(
+        "--fast_break_detect",
+        action="store_true",
+        help="With -b, decode only keyframes to find candidate breaks and refine around them - much faster on long content",
+    )
     parser.add_argument(
         "-t",
         "--chapter_detect_dir",
         help="Scan for chapter markers in media files in the provided directory.",
     )
+    parser.add_argument(
+        "--health_check_dir",
+        help="Decode samples from the start, middle and end of media files in the provided directory and quarantine broken files so they are never scheduled.",
+    )
+    parser.add_argument(
+        "--health_workers",
+        type=int,
+        default=4,
+        help="With --health_check_dir, number of files checked in parallel (default 4)",
+    )
     parser.add_argument(
         "-w",
         "--add_week",
@@ -493,7 +508,7 @@ def main():
 
     if args.break_detect_dir is not None:
         _l.info("Scanning for break detection points in media files...")
-        FluidBuilder().scan_breaks(args.break_detect_dir)
+        FluidBuilder().scan_breaks(args.break_detect_dir, fast=args.fast_break_detect)
         success_messages.append("I scanned for break detection points")
 
     if args.chapter_detect_dir is not None:
@@ -501,6 +516,14 @@ def main():
         FluidBuilder().scan_chapters(args.chapter_detect_dir)
         success_messages.append("I scanned for chapter markers")
 
+    if args.health_check_dir is not None:
+        _l.info("Checking media files for decode errors...")
+        checked, failed = FluidBuilder().scan_health(args.health_check_dir, workers=args.health_workers)
+        if failed:
+            for path in failed:
+                failure_messages.append(f"Quarantined broken file {path}")
+        success_messages.append(f"I checked {len(checked)} media files - {len(failed)} quarantined")
+
     if args.add_day is not None:
         _to_add_to = []
         try:
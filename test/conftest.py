@@ -0,0 +1,9 @@
+import sys
+from unittest.mock import MagicMock
+
+# stub ffmpeg/moviepy before any test imports media_processor (see test_exclusion.py)
+_ffmpeg_stub = MagicMock()
+_ffmpeg_stub.probe = MagicMock()
+sys.modules.setdefault("ffmpeg", _ffmpeg_stub)
+sys.modules.setdefault("moviepy", MagicMock())
+sys.modules.setdefault("moviepy.editor", MagicMock())
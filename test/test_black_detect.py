@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fs42.media_processor import MediaProcessor
+
+
+STDERR = "\n".join([
+    "[blackdetect @ 0x1] black_start:600 black_end:601 black_duration:1",
+    "frame= 100 fps=0.0 q=-0.0 size=N/A",
+    "[blackdetect @ 0x1] black_start:1200.5 black_end:1201.5 black_duration:1",
+    "[blackdetect @ 0x1] black_start:garbage",
+])
+
+
+class TestParseBlackMidpoints:
+
+    def test_midpoints(self):
+        assert MediaProcessor._parse_black_midpoints(STDERR) == [600.5, 1201.0]
+
+    def test_offset_is_added(self):
+        # refine windows are decoded from a seek point so timestamps restart at 0
+        assert MediaProcessor._parse_black_midpoints(STDERR, offset=10) == [610.5, 1211.0]
+
+    def test_no_black(self):
+        assert MediaProcessor._parse_black_midpoints("nothing here") == []
+
+
+class TestFastBlackDetect:
+
+    def test_fast_mode_uses_sampled_midpoints(self):
+        with patch.object(MediaProcessor, "_fast_black_midpoints", return_value=[30.0, 900.0, 1800.0]) as fast:
+            segments = MediaProcessor.black_detect("show.mkv", 2700.0, fast=True)
+
+        fast.assert_called_once()
+        # the break near the start is trimmed, the rest become segment boundaries
+        assert [s["chapter_start"] for s in segments] == [0, 900.0, 1800.0]
+        assert segments[-1]["chapter_end"] == 2700.0
+
+    def test_keyframe_pass_then_refine_windows(self):
+        coarse = "\n".join([
+            "[blackdetect @ 0x1] black_start:599.5 black_end:600.5 black_duration:1",
+            "[blackdetect @ 0x1] black_start:1204.5 black_end:1205.5 black_duration:1",
+        ])
+        # window timestamps restart at 0; the second window also catches a neighbour
+        refine = {
+            594.0: "[blackdetect @ 0x2] black_start:6.2 black_end:6.6 black_duration:0.4",
+            1199.0: "\n".join([
+                "[blackdetect @ 0x2] black_start:0.2 black_end:0.4 black_duration:0.2",
+                "[blackdetect @ 0x2] black_start:5.5 black_end:6.5 black_duration:1",
+            ]),
+        }
+        inputs = []
+
+        def fake_input(fname, **kwargs):
+            inputs.append(kwargs)
+            stream = MagicMock()
+            stream.filter.return_value = stream
+            stream.output.return_value = stream
+            stderr = refine[kwargs["ss"]] if "ss" in kwargs else coarse
+            stream.run.return_value = (b"", stderr.encode("utf-8"))
+            return stream
+
+        fake_ffmpeg = MagicMock()
+        fake_ffmpeg.Error = RuntimeError
+        fake_ffmpeg.input.side_effect = fake_input
+        with patch("fs42.media_processor.ffmpeg", fake_ffmpeg):
+            midpoints = MediaProcessor._fast_black_midpoints("show.mkv", 0.1, 0.95, 0.1)
+
+        assert inputs[0] == {"skip_frame": "nokey"}
+        pad = MediaProcessor.FAST_BLACK_REFINE_WINDOW
+        assert inputs[1:] == [{"ss": 600.0 - pad, "t": pad * 2}, {"ss": 1205.0 - pad, "t": pad * 2}]
+        assert midpoints == [pytest.approx(600.4), pytest.approx(1205.0)]
+
+    def test_failed_refine_window_is_skipped(self):
+        coarse = "[blackdetect @ 0x1] black_start:2 black_end:3 black_duration:1"
+
+        def fake_input(fname, **kwargs):
+            stream = MagicMock()
+            stream.filter.return_value = stream
+            stream.output.return_value = stream
+            if "ss" in kwargs:
+                # candidates near the start clamp the window to 0
+                assert kwargs["ss"] == 0.0
+                stream.run.side_effect = RuntimeError("decode error")
+            else:
+                stream.run.return_value = (b"", coarse.encode("utf-8"))
+            return stream
+
+        fake_ffmpeg = MagicMock()
+        fake_ffmpeg.Error = RuntimeError
+        fake_ffmpeg.input.side_effect = fake_input
+        with patch("fs42.media_processor.ffmpeg", fake_ffmpeg):
+            assert MediaProcessor._fast_black_midpoints("show.mkv", 0.1, 0.95, 0.1) == []
@@ -0,0 +1,33 @@
+from fs42.catalog import ShowCatalog
+from fs42.catalog_entry import CatalogEntry
+
+
+def _catalog(start_bumps):
+    conf = {"network_name": "Bumps", "network_type": "standard", "content_dir": "/content"}
+    catalog = ShowCatalog(conf, load=False)
+    catalog.clip_index["start_bumps"] = [CatalogEntry(p, 10.0, "start_bumps") for p in start_bumps]
+    catalog.clip_index["end_bumps"] = []
+    return catalog
+
+
+class TestBumpIndex:
+
+    def test_direct_reference(self):
+        catalog = _catalog(["/content/bumps/intro/a.mp4", "/content/bumps/intro/b.mp4"])
+        assert catalog.get_start_bump("bumps/intro/b.mp4") == {"path": "/content/bumps/intro/b.mp4", "duration": 10.0}
+
+    def test_folder_reference(self):
+        catalog = _catalog(["/content/bumps/intro/a.mp4", "/content/bumps/intro/b.mp4", "/content/bumps/other/c.mp4"])
+        for _ in range(20):
+            assert catalog.get_start_bump("intro/")["path"] in ("/content/bumps/intro/a.mp4", "/content/bumps/intro/b.mp4")
+
+    def test_missing(self):
+        catalog = _catalog(["/content/bumps/intro/a.mp4"])
+        assert catalog.get_start_bump("outro/") is None
+        assert catalog.get_end_bump("intro/") is None
+
+    def test_index_follows_new_entries(self):
+        catalog = _catalog(["/content/bumps/intro/a.mp4"])
+        assert catalog.get_start_bump("late.mp4") is None
+        catalog.clip_index["start_bumps"].append(CatalogEntry("/content/bumps/late.mp4", 5.0, "start_bumps"))
+        assert catalog.get_start_bump("late.mp4")["path"] == "/content/bumps/late.mp4"
@@ -0,0 +1,190 @@
+from unittest.mock import patch
+
+import pytest
+
+from fs42.catalog_entry import CatalogEntry
+from fs42.catalog_io import CatalogIO
+from fs42.schedule_hint import DayPartHint
+
+
+@pytest.fixture
+def catalog_io(tmp_path):
+    with patch("fs42.catalog_io.StationManager") as manager:
+        manager.return_value.server_conf = {"db_path": str(tmp_path / "fs42.db")}
+        yield CatalogIO()
+
+
+def _entry(path, tag="comedy"):
+    return CatalogEntry(path, 1800.0, tag)
+
+
+class TestPutCatalogEntries:
+
+    def test_round_trip_with_hints(self, catalog_io):
+        hinted = _entry("/content/comedy/a.mp4")
+        hinted.hints = [DayPartHint("morning")]
+        catalog_io.put_catalog_entries("Comedy", [hinted, _entry("/content/comedy/b.mp4"), "not an entry"])
+
+        entries = {e.path: e for e in catalog_io.get_catalog_entries("Comedy")}
+        assert set(entries) == {"/content/comedy/a.mp4", "/content/comedy/b.mp4"}
+        assert [h.part_name for h in entries["/content/comedy/a.mp4"].hints] == ["morning"]
+        assert entries["/content/comedy/b.mp4"].hints == []
+
+    def test_replaces_existing(self, catalog_io):
+        entry = _entry("/content/comedy/a.mp4")
+        catalog_io.put_catalog_entries("Comedy", [entry])
+        entry.count = 7
+        catalog_io.put_catalog_entries("Comedy", [entry])
+        assert [e.count for e in catalog_io.get_catalog_entries("Comedy")] == [7]
+
+
+class TestBatchIncrementCounts:
+
+    def test_repeats_count_once_each(self, catalog_io):
+        a = _entry("/content/comedy/a.mp4")
+        b = _entry("/content/comedy/b.mp4")
+        catalog_io.put_catalog_entries("Comedy", [a, b])
+        catalog_io.put_catalog_entries("Other", [a])
+
+        catalog_io.batch_increment_counts("Comedy", [a, b, a, "not an entry"])
+
+        counts = {e.path: e.count for e in catalog_io.get_catalog_entries("Comedy")}
+        assert counts == {"/content/comedy/a.mp4": 2, "/content/comedy/b.mp4": 1}
+        assert catalog_io.get_catalog_entries("Other")[0].count == 0
+
+    def test_empty(self, catalog_io):
+        catalog_io.batch_increment_counts("Comedy", [])
+
+
+class TestSearchCatalogEntries:
+
+    def _titled(self, path, title, tag="comedy"):
+        entry = _entry(path, tag)
+        entry.title = title
+        return entry
+
+    def _paths(self, results):
+        return [e.path for e in results]
+
+    def test_prefix_match(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [
+            self._titled("/content/comedy/cheers_s01e01.mp4", "Cheers S01E01"),
+            self._titled("/content/comedy/taxi_s01e01.mp4", "Taxi S01E01"),
+        ])
+        assert self._paths(catalog_io.search_catalog_entries("Comedy", "chee")) == [
+            "/content/comedy/cheers_s01e01.mp4"
+        ]
+        assert len(catalog_io.search_catalog_entries("Comedy", "s01e01")) == 2
+
+    def test_title_hits_rank_first(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [
+            self._titled("/content/taxi/episode.mp4", "Episode 1", tag="taxi"),
+            self._titled("/content/comedy/b.mp4", "Taxi Driver"),
+        ])
+        assert self._paths(catalog_io.search_catalog_entries("Comedy", "taxi")) == [
+            "/content/comedy/b.mp4", "/content/taxi/episode.mp4"
+        ]
+
+    def test_station_is_respected(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [self._titled("/content/a.mp4", "Cheers")])
+        catalog_io.put_catalog_entries("Drama", [self._titled("/content/a.mp4", "Cheers")])
+        assert len(catalog_io.search_catalog_entries("Drama", "cheers")) == 1
+
+    def test_index_follows_replace_and_delete(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [self._titled("/content/a.mp4", "Cheers")])
+        catalog_io.put_catalog_entries("Comedy", [self._titled("/content/a.mp4", "Frasier")])
+        assert catalog_io.search_catalog_entries("Comedy", "cheers") == []
+        assert len(catalog_io.search_catalog_entries("Comedy", "frasier")) == 1
+
+        catalog_io.delete_all_entries_for_station("Comedy")
+        assert catalog_io.search_catalog_entries("Comedy", "frasier") == []
+
+    def test_punctuation_falls_back_to_like(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [self._titled("/content/a.mp4", "Cheers")])
+        assert len(catalog_io.search_catalog_entries("Comedy", "/")) == 1
+
+    def test_existing_catalog_is_indexed(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [self._titled("/content/a.mp4", "Cheers")])
+        with catalog_io._get_connection() as connection:
+            connection.execute("DROP TABLE catalog_fts")
+            connection.execute("DROP TRIGGER catalog_fts_insert")
+
+        with patch("fs42.catalog_io.StationManager") as manager:
+            manager.return_value.server_conf = {"db_path": catalog_io.db_path}
+            reopened = CatalogIO()
+        assert len(reopened.search_catalog_entries("Comedy", "cheers")) == 1
+
+
+class TestHintSets:
+
+    def _hinted(self, path, part):
+        entry = _entry(path)
+        entry.hints = [DayPartHint(part)]
+        return entry
+
+    def _hint_set_count(self, catalog_io):
+        with catalog_io._get_connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM hint_sets").fetchone()[0]
+
+    def test_shared_hints_are_stored_and_decoded_once(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [
+            self._hinted("/content/comedy/a.mp4", "morning"),
+            self._hinted("/content/comedy/b.mp4", "morning"),
+            self._hinted("/content/comedy/c.mp4", "evening"),
+        ])
+        assert self._hint_set_count(catalog_io) == 2
+
+        a, b, c = catalog_io.get_catalog_entries("Comedy")
+        assert a.hints is b.hints
+        assert [h.part_name for h in c.hints] == ["evening"]
+
+    def test_unused_sets_are_dropped_with_the_catalog(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [self._hinted("/content/comedy/a.mp4", "morning")])
+        catalog_io.put_catalog_entries("Drama", [self._hinted("/content/drama/a.mp4", "evening")])
+        catalog_io.delete_all_entries_for_station("Comedy")
+        assert self._hint_set_count(catalog_io) == 1
+        assert [h.part_name for h in catalog_io.get_catalog_entries("Drama")[0].hints] == ["evening"]
+
+    def test_replaced_hints_do_not_leave_orphans(self, catalog_io):
+        catalog_io.put_catalog_entries("Comedy", [
+            self._hinted("/content/comedy/a.mp4", "morning"),
+            self._hinted("/content/comedy/b.mp4", "evening"),
+        ])
+        catalog_io.put_catalog_entries("Comedy", [self._hinted("/content/comedy/a.mp4", "late")])
+        assert self._hint_set_count(catalog_io) == 2
+
+        # a set still used by another entry is kept
+        catalog_io.put_catalog_entries("Comedy", [self._hinted("/content/comedy/b.mp4", "late")])
+        assert self._hint_set_count(catalog_io) == 1
+        assert {h.part_name for e in catalog_io.get_catalog_entries("Comedy") for h in e.hints} == {"late"}
+
+    def test_inline_hints_are_migrated(self, tmp_path):
+        import json
+        import sqlite3
+
+        db_path = str(tmp_path / "legacy.db")
+        hints = json.dumps([json.dumps(DayPartHint("morning").toJSON())])
+        connection = sqlite3.connect(db_path)
+        connection.execute("""CREATE TABLE catalog_entries (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, station TEXT NOT NULL, path TEXT NOT NULL,
+                                title TEXT NOT NULL, duration REAL NOT NULL, tag TEXT NOT NULL, count INTEGER DEFAULT 0,
+                                hints TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, realpath TEXT,
+                                content_type TEXT DEFAULT 'feature', media_type TEXT DEFAULT 'video',
+                                UNIQUE(station, tag, path))""")
+        for name in ("a", "b"):
+            connection.execute(
+                "INSERT INTO catalog_entries (station, path, title, duration, tag, hints) VALUES (?, ?, ?, ?, ?, ?)",
+                ("Comedy", f"/content/comedy/{name}.mp4", name, 1800.0, "comedy", hints),
+            )
+        connection.commit()
+        connection.close()
+
+        with patch("fs42.catalog_io.StationManager") as manager:
+            manager.return_value.server_conf = {"db_path": db_path}
+            migrated = CatalogIO()
+
+        assert self._hint_set_count(migrated) == 1
+        entries = migrated.get_catalog_entries("Comedy")
+        assert [h.part_name for h in entries[0].hints] == ["morning"]
+        assert entries[0].hints is entries[1].hints
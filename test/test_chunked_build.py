@@ -0,0 +1,157 @@
+import datetime
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fs42.catalog_entry import CatalogEntry
+from fs42.liquid_blocks import LiquidBlock
+from fs42.liquid_io import LiquidIO
+from fs42.liquid_schedule import BuildPaused, LiquidSchedule
+
+
+START = datetime.datetime(2026, 1, 5)
+HOUR = datetime.timedelta(hours=1)
+
+
+class _PlannedBlock(LiquidBlock):
+    def make_plan(self, catalog):
+        self.plan = []
+        self.planned_lookahead = list(self.lookahead)
+
+
+def _fill(slot_config, tag_str, current_mark, **kwargs):
+    entry = CatalogEntry(f"/content/comedy/{current_mark:%d%H}.mp4", 3600.0, "comedy")
+    return _PlannedBlock(entry, current_mark, current_mark + HOUR), current_mark + HOUR
+
+
+def _sched():
+    sched = LiquidSchedule.__new__(LiquidSchedule)
+    sched.conf = {"network_name": "Chunked", "network_type": "standard", "clip_shows": {}}
+    sched._l = logging.getLogger("test-chunked")
+    sched.catalog = MagicMock()
+    sched._load_blocks = MagicMock()
+    sched._build_exclusion_index = MagicMock(return_value={})
+    sched._fill = MagicMock(side_effect=_fill)
+    return sched
+
+
+class TestChunkedBuild:
+
+    def _build(self, days, throttle=None):
+        sched = _sched()
+        sched.throttle = throttle
+        with patch("fs42.liquid_schedule.SlotReader") as slots, \
+                patch("fs42.liquid_schedule.MarathonAgent") as marathon, \
+                patch("fs42.liquid_schedule.LiquidAPI") as api, \
+                patch("fs42.liquid_schedule.CatalogAPI") as catalog_api, \
+                patch("fs42.liquid_schedule.SequenceAPI") as sequences, \
+                patch("fs42.liquid_schedule.FluidBuilder"):
+            slots.get_slot.return_value = ({"tags": "comedy"}, 0)
+            slots.get_tag_from_slot.return_value = ("comedy", None)
+            marathon.detect_marathon.return_value = False
+            catalog_api.get_summary.return_value = {"entry_count": 72}
+            sequences.get_sequence_state.side_effect = lambda conf: {"calls": sequences.get_sequence_state.call_count}
+            sched._fluid(START, START + datetime.timedelta(days=days), "week")
+        chunks = [(c.args[1], c.args[2]) for c in api.add_block_chunk.call_args_list]
+        return chunks, catalog_api
+
+    def test_days_are_saved_in_chunks(self):
+        chunks, catalog_api = self._build(3)
+
+        assert [len(blocks) for blocks, _ in chunks] == [24, 24, 24]
+        saved = [block for blocks, _ in chunks for block in blocks]
+        assert [b.start_time for b in saved] == [START + HOUR * i for i in range(72)]
+        assert catalog_api.update_play_counts.call_count == 3
+
+    def test_checkpoints(self):
+        chunks, _ = self._build(3)
+
+        first, second, last = (checkpoint for _, checkpoint in chunks)
+        assert first["last_end"] == START + datetime.timedelta(days=1)
+        assert second["last_end"] == START + datetime.timedelta(days=2)
+        assert first["target_end"] == START + datetime.timedelta(days=3)
+        assert first["amount"] == "week"
+        assert first["catalog_count"] == 72
+        # positions are read when the chunk ends, before its lookahead blocks are made
+        assert first["sequence_state"] == {"calls": 1}
+        assert last is None
+
+    def test_lookahead_crosses_chunks(self):
+        chunks, _ = self._build(2)
+        assert chunks[0][0][-1].planned_lookahead == ["comedy", "comedy", "comedy", "comedy"]
+        assert chunks[-1][0][-1].planned_lookahead == ["comedy", None, None, None]
+
+    def test_pauses_only_after_a_saved_chunk(self):
+        throttle = MagicMock()
+        throttle.holding.return_value = True
+        with pytest.raises(BuildPaused):
+            self._build(3, throttle)
+        # checked once the first day is saved, never mid-chunk, and never sleeps inside the build
+        throttle.holding.assert_called_once()
+        throttle.wait.assert_not_called()
+
+    def test_short_build_is_one_chunk(self):
+        chunks, _ = self._build(1)
+        assert len(chunks) == 1 and chunks[0][1] is None
+
+
+class TestResume:
+
+    def _increment(self, checkpoint, current_end=START + datetime.timedelta(days=4)):
+        sched = _sched()
+        sched._blocks = [MagicMock(end_time=current_end)]
+        sched._fluid = MagicMock()
+        with patch("fs42.liquid_schedule.LiquidAPI") as api, \
+                patch("fs42.liquid_schedule.SequenceAPI") as sequences, \
+                patch("fs42.liquid_schedule.CatalogAPI") as catalog_api:
+            api.get_checkpoint.return_value = checkpoint
+            catalog_api.get_summary.return_value = {"entry_count": 120}
+            sched.add_month()
+        return sched._fluid, api, sequences
+
+    def _checkpoint(self, **kwargs):
+        checkpoint = {
+            "amount": "month",
+            "target_end": START + datetime.timedelta(days=31),
+            "last_end": START + datetime.timedelta(days=4),
+            "sequence_state": {"indexes": []},
+            "catalog_count": 120,
+        }
+        checkpoint.update(kwargs)
+        return checkpoint
+
+    def test_resumes_to_the_checkpoint_target(self):
+        fluid, api, sequences = self._increment(self._checkpoint())
+        fluid.assert_called_once_with(START + datetime.timedelta(days=4), START + datetime.timedelta(days=31), "month")
+        sequences.restore_sequence_state.assert_called_once()
+        api.clear_checkpoint.assert_not_called()
+
+    @pytest.mark.parametrize("kwargs", [{"amount": "week"}, {"last_end": START}, {"catalog_count": 90}])
+    def test_mismatched_checkpoint_is_dropped(self, kwargs):
+        fluid, api, sequences = self._increment(self._checkpoint(**kwargs))
+        api.clear_checkpoint.assert_called_once()
+        sequences.restore_sequence_state.assert_not_called()
+        assert fluid.call_args.args[0] == START + datetime.timedelta(days=4)
+        assert fluid.call_args.args[1] != START + datetime.timedelta(days=31)
+
+
+class TestCheckpointStorage:
+
+    def test_round_trip_and_finish(self, tmp_path):
+        with patch("fs42.liquid_io.StationManager") as manager:
+            manager.return_value.server_conf = {"db_path": str(tmp_path / "fs42.db")}
+            liquid_io = LiquidIO()
+            checkpoint = {
+                "amount": "month",
+                "target_end": START + datetime.timedelta(days=31),
+                "last_end": START + datetime.timedelta(days=4),
+                "sequence_state": {"indexes": [["nightly", "cheers", 3]], "active": []},
+                "catalog_count": 120,
+            }
+            liquid_io.put_liquid_chunk("Chunked", [], checkpoint)
+            assert liquid_io.get_build_checkpoint("Chunked") == checkpoint
+            assert liquid_io.get_build_checkpoint("Other") is None
+
+            liquid_io.put_liquid_chunk("Chunked", [], None)
+            assert liquid_io.get_build_checkpoint("Chunked") is None
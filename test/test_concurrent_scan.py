@@ -0,0 +1,52 @@
+import os
+
+from fs42.media_processor import MediaProcessor
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * 10)
+
+
+class TestConcurrentScan:
+
+    def _library(self, tmp_path):
+        _touch(tmp_path / "root.mp4")
+        _touch(tmp_path / "notes.txt")
+        _touch(tmp_path / "._root.mp4")
+        _touch(tmp_path / ".hidden" / "secret.mp4")
+        for season in range(3):
+            for ep in range(4):
+                _touch(tmp_path / "show" / f"season{season}" / f"ep{ep}.MKV")
+        _touch(tmp_path / "music" / "song.mp3")
+        os.symlink(tmp_path / "show" / "season0", tmp_path / "linked")
+        return tmp_path
+
+    def test_matches_sequential_walk(self, tmp_path):
+        lib = str(self._library(tmp_path))
+        walked = MediaProcessor._rfind_media(lib)
+        threaded = MediaProcessor._rfind_media(lib, scan_workers=4)
+        assert sorted(threaded) == sorted(walked)
+        # 12 episodes, 4 more through the symlink, plus the root file
+        assert len(threaded) == 17
+
+    def test_order_is_stable(self, tmp_path):
+        lib = str(self._library(tmp_path))
+        first = MediaProcessor._rfind_media(lib, scan_workers=8)
+        for _ in range(5):
+            assert MediaProcessor._rfind_media(lib, scan_workers=8) == first
+        episodes = [os.path.relpath(p, lib) for p in first if "show" in p]
+        assert episodes == sorted(episodes)
+
+    def test_media_filter(self, tmp_path):
+        lib = str(self._library(tmp_path))
+        assert MediaProcessor._rfind_media(lib, "audio", scan_workers=4) == [os.path.join(lib, "music", "song.mp3")]
+
+    def test_rich_entries(self, tmp_path):
+        lib = str(self._library(tmp_path))
+        walked = {e.path: e.size for e in MediaProcessor.rich_find_media(lib)}
+        threaded = {e.path: e.size for e in MediaProcessor.rich_find_media(lib, scan_workers=4)}
+        assert threaded == walked
+
+    def test_missing_dir(self, tmp_path):
+        assert MediaProcessor._rfind_media(str(tmp_path / "gone"), scan_workers=4) == []
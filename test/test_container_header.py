@@ -0,0 +1,90 @@
+import struct
+
+from fs42.container_header import ContainerHeader
+
+
+def _box(box_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mvhd(timescale, duration, version=0):
+    if version == 0:
+        body = struct.pack(">IIII", 0, 0, timescale, duration)
+    else:
+        body = struct.pack(">QQIQ", 0, 0, timescale, duration)
+    return _box(b"mvhd", bytes([version, 0, 0, 0]) + body + b"\x00" * 80)
+
+
+def _ebml(el_id, payload):
+    id_bytes = el_id.to_bytes((el_id.bit_length() + 7) // 8, "big")
+    # 8 byte size vint: 0x01 marker then 7 bytes of length
+    return id_bytes + b"\x01" + len(payload).to_bytes(7, "big") + payload
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestMp4:
+
+    def test_moov_after_mdat(self, tmp_path):
+        data = _box(b"ftyp", b"isom" + b"\x00" * 8) + _box(b"mdat", b"\x00" * 4096)
+        data += _box(b"moov", _mvhd(1000, 1325500) + _box(b"trak", b"\x00" * 16))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mp4", data)) == 1325.5
+
+    def test_version_1_mvhd(self, tmp_path):
+        data = _box(b"ftyp", b"isom") + _box(b"moov", _mvhd(90000, 90000 * 60, version=1))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mov", data)) == 60.0
+
+    def test_missing_moov_falls_back(self, tmp_path):
+        data = _box(b"ftyp", b"isom") + _box(b"mdat", b"\x00" * 32)
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mp4", data)) is None
+
+    def test_zero_duration_falls_back(self, tmp_path):
+        # fragmented files leave the mvhd duration empty
+        data = _box(b"ftyp", b"isom") + _box(b"moov", _mvhd(1000, 0))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mp4", data)) is None
+
+    def test_truncated_file_falls_back(self, tmp_path):
+        data = _box(b"ftyp", b"isom") + _box(b"moov", _mvhd(1000, 5000))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mp4", data[:-40])) is None
+
+    def test_empty_mvhd_falls_back(self, tmp_path):
+        data = _box(b"ftyp", b"isom") + _box(b"moov", _box(b"mvhd", b""))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mp4", data)) is None
+
+
+class TestMatroska:
+
+    def _mkv(self, info_payload, before_info=b""):
+        header = _ebml(ContainerHeader.EBML_HEADER, _ebml(0x4282, b"matroska"))
+        segment = before_info + _ebml(ContainerHeader.MKV_INFO, info_payload)
+        return header + _ebml(ContainerHeader.MKV_SEGMENT, segment)
+
+    def test_double_duration_with_default_scale(self, tmp_path):
+        data = self._mkv(_ebml(ContainerHeader.MKV_DURATION, struct.pack(">d", 2700500.0)))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mkv", data)) == 2700.5
+
+    def test_float_duration_with_custom_scale(self, tmp_path):
+        info = _ebml(ContainerHeader.MKV_TIMECODE_SCALE, (1000).to_bytes(3, "big"))
+        info += _ebml(ContainerHeader.MKV_DURATION, struct.pack(">f", 5000000.0))
+        data = self._mkv(info, before_info=_ebml(0x114D9B74, b"\x00" * 64))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.webm", data)) == 5.0
+
+    def test_no_duration_falls_back(self, tmp_path):
+        data = self._mkv(_ebml(ContainerHeader.MKV_TIMECODE_SCALE, (1000000).to_bytes(3, "big")))
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mkv", data)) is None
+
+    def test_not_matroska(self, tmp_path):
+        assert ContainerHeader.read_duration(_write(tmp_path, "a.mkv", b"RIFF" + b"\x00" * 64)) is None
+
+
+def test_other_extensions_are_not_read(tmp_path):
+    data = _box(b"ftyp", b"isom") + _box(b"moov", _mvhd(1000, 5000))
+    assert ContainerHeader.read_duration(_write(tmp_path, "a.avi", data)) is None
+
+
+def test_missing_file(tmp_path):
+    assert ContainerHeader.read_duration(str(tmp_path / "nope.mp4")) is None
@@ -0,0 +1,112 @@
+import datetime
+import random
+from unittest.mock import MagicMock, patch
+
+from fs42.catalog_entry import CatalogEntry
+from fs42.liquid_blocks import LiquidLoopBlock, LiquidOffAirBlock
+from fs42.liquid_manager import LiquidManager
+from fs42.liquid_schedule import LiquidSchedule
+
+
+START = datetime.datetime(2024, 3, 1, 20, 7)
+
+
+def _schedule(conf, by_tag, offair=None, quarantined=()):
+    catalog = MagicMock()
+    catalog.config = {}
+    catalog.rng = random.Random(1)
+    catalog.quarantined = set(quarantined)
+    catalog.get_all_by_tag.side_effect = lambda tag: by_tag.get(tag)
+    catalog.get_offair.return_value = offair
+    schedule = LiquidSchedule.__new__(LiquidSchedule)
+    schedule.conf = conf
+    schedule.catalog = catalog
+    return schedule
+
+
+def _standard_conf():
+    return {
+        "network_name": "Panic",
+        "network_type": "standard",
+        "monday": {"20": {"tags": "sitcom"}},
+        "tuesday": {"20": {"tags": ["cartoon", "sitcom"]}},
+    }
+
+
+class TestEmergencyBlocks:
+
+    def test_fills_window_from_station_tags(self):
+        by_tag = {
+            "sitcom": [CatalogEntry(f"/content/sitcom/{i}.mp4", 1320.0, "sitcom") for i in range(8)],
+            "cartoon": [CatalogEntry(f"/content/cartoon/{i}.mp4", 600.0, "cartoon") for i in range(8)],
+            "commercial": [CatalogEntry("/content/commercial/a.mp4", 30.0, "commercial")],
+        }
+        blocks = _schedule(_standard_conf(), by_tag).make_emergency_blocks(START)
+
+        assert len(blocks) == 1
+        block = blocks[0]
+        assert isinstance(block, LiquidLoopBlock)
+        assert block.start_time == START
+        assert block.end_time == START + datetime.timedelta(hours=2)
+        assert sum(entry.duration for entry in block.plan) == 7200
+        assert all("/commercial/" not in entry.path for entry in block.plan)
+
+    def test_skips_quarantined_files(self):
+        good = CatalogEntry("/content/sitcom/good.mp4", 1320.0, "sitcom")
+        bad = CatalogEntry("/content/sitcom/bad.mp4", 1320.0, "sitcom")
+        good.realpath, bad.realpath = good.path, bad.path
+        schedule = _schedule(_standard_conf(), {"sitcom": [good, bad]}, quarantined={bad.realpath})
+        blocks = schedule.make_emergency_blocks(START, hours=1)
+        assert {entry.path for entry in blocks[0].plan} == {good.path}
+
+    def test_falls_back_to_offair(self):
+        offair = CatalogEntry("/content/offair/bars.mp4", 600.0, "off_air")
+        blocks = _schedule(_standard_conf(), {}, offair=offair).make_emergency_blocks(START)
+        assert isinstance(blocks[0], LiquidOffAirBlock)
+        assert len(blocks[0].plan) == 12
+
+    def test_nothing_to_play(self):
+        assert _schedule(_standard_conf(), {}).make_emergency_blocks(START) == []
+
+    def test_loop_station_uses_content(self):
+        conf = {"network_name": "Loop", "network_type": "loop"}
+        content = [CatalogEntry(f"/content/loop/{i}.mp4", 300.0, "content") for i in range(3)]
+        blocks = _schedule(conf, {"content": content}).make_emergency_blocks(START, hours=1)
+        assert {entry.path for entry in blocks[0].plan} == {c.path for c in content}
+
+
+class TestEmergencySchedule:
+
+    def test_reads_only_the_station_tags(self):
+        by_tag = {
+            "sitcom": [CatalogEntry(f"/content/sitcom/{i}.mp4", 1320.0, "sitcom") for i in range(8)],
+            "cartoon": [CatalogEntry(f"/content/cartoon/{i}.mp4", 600.0, "cartoon") for i in range(8)],
+        }
+        conf = dict(_standard_conf(), content_dir="/content")
+        with patch("fs42.catalog.CatalogAPI") as catalog_api, \
+                patch("fs42.catalog.ShowCatalog._load_quarantine"), \
+                patch("fs42.liquid_schedule.LiquidAPI") as liquid_api:
+            catalog_api.get_tags.return_value = ["cartoon", "commercial", "news", "sitcom"]
+            catalog_api.get_by_tag.side_effect = lambda config, tag: by_tag[tag]
+            schedule = LiquidSchedule(conf, load_blocks=False, lazy_catalog=True)
+            blocks = schedule.make_emergency_blocks(START)
+
+        catalog_api.get_entries.assert_not_called()
+        liquid_api.get_blocks.assert_not_called()
+        assert sorted(c.args[1] for c in catalog_api.get_by_tag.call_args_list) == ["cartoon", "sitcom"]
+        assert sum(entry.duration for entry in blocks[0].plan) == 7200
+
+
+class TestAddEmergencyBlocks:
+
+    def test_filler_is_kept_in_order_until_reload(self):
+        manager = object.__new__(LiquidManager)
+        existing = MagicMock(start_time=START - datetime.timedelta(hours=1), end_time=START)
+        filler = MagicMock(start_time=START, end_time=START + datetime.timedelta(hours=2))
+        manager.schedules = {"Panic": [existing]}
+
+        manager.add_emergency_blocks("Panic", [filler])
+        manager.add_emergency_blocks("New", [filler])
+
+        assert manager.schedules["Panic"] == [existing, filler]
+        assert manager.get_extents("New") == (filler.start_time, filler.end_time)
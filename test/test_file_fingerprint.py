@@ -0,0 +1,144 @@
+import sqlite3
+from unittest.mock import patch
+
+from fs42.fluid_statements import FluidStatements
+from fs42.media_processor import MediaProcessor
+from fs42.catalog_entry import CatalogEntry
+
+
+def _processed(path, tag, hints):
+    return CatalogEntry(path, 1234.0, tag)
+
+
+class TestFingerprint:
+
+    def test_head_and_tail_are_sampled(self, tmp_path):
+        size = MediaProcessor.FINGERPRINT_SAMPLE * 3
+        a = tmp_path / "a.mp4"
+        b = tmp_path / "b.mp4"
+        a.write_bytes(b"\x00" * size)
+        b.write_bytes(b"\x00" * (size - 1) + b"\x01")
+        assert MediaProcessor.content_fingerprint(str(a)) != MediaProcessor.content_fingerprint(str(b))
+
+    def test_small_file(self, tmp_path):
+        a = tmp_path / "a.mp4"
+        a.write_bytes(b"tiny")
+        assert MediaProcessor.content_fingerprint(str(a)).startswith("4-")
+
+
+class TestRelink:
+
+    def setup_method(self):
+        self.connection = sqlite3.connect(":memory:")
+        FluidStatements.init_db(self.connection)
+
+    def teardown_method(self):
+        self.connection.close()
+
+    def _cache(self, path):
+        with patch.object(MediaProcessor, "process_one", side_effect=_processed), \
+                patch.object(MediaProcessor, "extract_metadata", return_value={}):
+            FluidStatements.iterate_file_entries(self.connection, MediaProcessor.rich_find_media(str(path.parent)))
+        FluidStatements.add_break_points(self.connection, str(path), [{"chapter_start": 0.0}])
+
+    def test_moved_file_keeps_metadata_without_probe(self, tmp_path):
+        old_dir = tmp_path / "old"
+        old_dir.mkdir()
+        old = old_dir / "show.mp4"
+        old.write_bytes(b"show content" * 1000)
+        self._cache(old)
+
+        new_dir = tmp_path / "renamed"
+        new_dir.mkdir()
+        new = new_dir / "show.mp4"
+        old.rename(new)
+
+        with patch.object(MediaProcessor, "process_one", side_effect=AssertionError("should not probe")), \
+                patch.object(MediaProcessor, "extract_metadata", return_value={}):
+            FluidStatements.iterate_file_entries(self.connection, MediaProcessor.rich_find_media(str(new_dir)))
+
+        cached = FluidStatements.check_file_cache(self.connection, str(new))
+        assert cached.duration == 1234.0
+        assert FluidStatements.check_file_cache(self.connection, str(old)) is None
+        assert FluidStatements.get_break_points(self.connection, str(new)) == [{"chapter_start": 0.0}]
+
+    def test_copy_reuses_metadata(self, tmp_path):
+        a_dir = tmp_path / "a"
+        a_dir.mkdir()
+        original = a_dir / "show.mp4"
+        original.write_bytes(b"show content" * 1000)
+        self._cache(original)
+
+        b_dir = tmp_path / "b"
+        b_dir.mkdir()
+        copy = b_dir / "show.mp4"
+        copy.write_bytes(original.read_bytes())
+
+        with patch.object(MediaProcessor, "process_one", side_effect=AssertionError("should not probe")):
+            FluidStatements.iterate_file_entries(self.connection, MediaProcessor.rich_find_media(str(b_dir)))
+
+        assert FluidStatements.check_file_cache(self.connection, str(copy)).duration == 1234.0
+        assert FluidStatements.check_file_cache(self.connection, str(original)).duration == 1234.0
+        assert FluidStatements.get_break_points(self.connection, str(copy)) == [{"chapter_start": 0.0}]
+
+    def test_unknown_content_is_not_relinked(self, tmp_path):
+        fresh = tmp_path / "new.mp4"
+        fresh.write_bytes(b"never seen")
+        assert FluidStatements.check_file_cache(self.connection, str(fresh)) is None
+
+    def test_renamed_directory_moves_rows(self, tmp_path):
+        old_dir = tmp_path / "Season 1"
+        old_dir.mkdir()
+        old = old_dir / "show.mp4"
+        old.write_bytes(b"show content" * 1000)
+        self._cache(old)
+
+        new_dir = tmp_path / "Season 01"
+        old_dir.rename(new_dir)
+        new = new_dir / "show.mp4"
+
+        with patch.object(MediaProcessor, "process_one", side_effect=AssertionError("should not probe")):
+            FluidStatements.iterate_file_entries(self.connection, MediaProcessor.rich_find_media(str(new_dir)))
+
+        assert FluidStatements.check_file_cache(self.connection, str(new)).duration == 1234.0
+        assert FluidStatements.check_file_cache(self.connection, str(old)) is None
+        assert FluidStatements.get_break_points(self.connection, str(new)) == [{"chapter_start": 0.0}]
+        assert FluidStatements.get_break_points(self.connection, str(old)) == {}
+
+    def test_stale_copies_are_pruned(self, tmp_path):
+        share = tmp_path / "share"
+        share.mkdir()
+        first = share / "show.mp4"
+        first.write_bytes(b"show content" * 1000)
+        second = share / "show (1).mp4"
+        second.write_bytes(first.read_bytes())
+        self._cache(first)
+        self._cache(second)
+
+        # the share moves to a new mount point and only one copy comes with it
+        local = tmp_path / "mnt" / "local"
+        local.mkdir(parents=True)
+        moved = local / "show.mp4"
+        first.rename(moved)
+        second.unlink()
+        share.rmdir()
+
+        with patch.object(MediaProcessor, "process_one", side_effect=AssertionError("should not probe")):
+            FluidStatements.iterate_file_entries(self.connection, MediaProcessor.rich_find_media(str(local)))
+
+        assert FluidStatements.check_file_cache(self.connection, str(moved)).duration == 1234.0
+        assert FluidStatements.check_file_cache(self.connection, str(first)) is None
+        assert FluidStatements.check_file_cache(self.connection, str(second)) is None
+        assert FluidStatements.get_break_points(self.connection, str(second)) == {}
+
+    def test_cache_lookup_does_not_relink(self, tmp_path):
+        a_dir = tmp_path / "a"
+        a_dir.mkdir()
+        original = a_dir / "show.mp4"
+        original.write_bytes(b"show content" * 1000)
+        self._cache(original)
+        copy = tmp_path / "copy.mp4"
+        copy.write_bytes(original.read_bytes())
+
+        with patch.object(MediaProcessor, "content_fingerprint", side_effect=AssertionError("should not hash")):
+            assert FluidStatements.check_file_cache(self.connection, str(copy)) is None
@@ -0,0 +1,58 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from fs42.fluid_builder import FluidBuilder
+from fs42.fluid_statements import FluidStatements
+
+
+BREAKS = [{"chapter_start": 0, "chapter_end": 600}]
+CHAPTERS = [{"chapter_start": 0, "chapter_end": 300}]
+
+
+@pytest.fixture
+def fluid(tmp_path):
+    with patch("fs42.fluid_builder.StationManager") as manager:
+        manager.return_value.server_conf = {"db_path": str(tmp_path / "fs42.db")}
+        builder = FluidBuilder()
+    connection = sqlite3.connect(builder.db_path)
+    FluidStatements.add_break_points(connection, "/content/a.mp4", BREAKS)
+    FluidStatements.add_break_points(connection, "/content/b.mp4", BREAKS)
+    FluidStatements.add_chapter_points(connection, "/content/a.mp4", CHAPTERS)
+    FluidStatements.add_chapter_points(connection, "/content/c.mp4", [])
+    connection.close()
+    return builder
+
+
+class TestPointsForPaths:
+
+    def test_matches_single_lookups(self, fluid, monkeypatch):
+        monkeypatch.setattr(FluidStatements, "POINTS_CHUNK", 2)
+        paths = ["/content/a.mp4", "/content/b.mp4", "/content/c.mp4", "/content/d.mp4"]
+        connection = sqlite3.connect(fluid.db_path)
+        try:
+            breaks = FluidStatements.get_break_points_for(connection, paths)
+            chapters = FluidStatements.get_chapter_points_for(connection, paths)
+            for path in paths:
+                assert breaks.get(path, {}) == FluidStatements.get_break_points(connection, path)
+                assert chapters.get(path, {}) == FluidStatements.get_chapter_points(connection, path)
+        finally:
+            connection.close()
+        assert set(breaks) == {"/content/a.mp4", "/content/b.mp4"}
+
+
+class TestPrefetchPoints:
+
+    def test_prefetched_paths_stay_in_memory(self, fluid):
+        fluid.prefetch_points(["/content/a.mp4", "/content/b.mp4", "/content/d.mp4"])
+
+        with patch("fs42.fluid_builder.sqlite3.connect", side_effect=AssertionError("hit the db")):
+            assert fluid.get_chapters("/content/a.mp4") == CHAPTERS
+            assert fluid.get_chapters("/content/b.mp4") == {}
+            assert fluid.get_breaks("/content/b.mp4") == BREAKS
+            assert fluid.get_breaks("/content/d.mp4") == {}
+
+    def test_other_paths_still_read_the_db(self, fluid):
+        fluid.prefetch_points([])
+        assert fluid.get_breaks("/content/a.mp4") == BREAKS
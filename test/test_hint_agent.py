@@ -0,0 +1,78 @@
+import datetime
+import random
+
+from fs42.catalog_entry import CatalogEntry
+from fs42.hint_agent import HintAgent, MetaHintTrie
+
+
+def _slow_meta_hint(path, meta_hints):
+    # the per hint scan the trie replaces
+    meta = None
+    for meta_hint in meta_hints:
+        for tag in meta_hint["tags"]:
+            if HintAgent._is_under(tag, path):
+                meta = (meta or []) + [meta_hint]
+    return meta
+
+
+META_HINTS = [
+    {"tags": ["nick/bump"], "day_part": "morning"},
+    {"tags": ["nick/bump/face", "nick/bump/face_winter/"], "exclusive": True},
+    {"tags": ["nick"], "date_range": "December 1 - December 31"},
+    {"tags": ["/abs/nick"]},
+]
+
+
+class TestMetaHintTrie:
+
+    def test_matches_is_under(self):
+        trie = MetaHintTrie(META_HINTS)
+        paths = [
+            "nick/bump/face/a.mp4",
+            "nick/bump/face_winter/b.mp4",
+            "nick/bump/other.mp4",
+            "nick/show.mp4",
+            "nickelodeon/bump/a.mp4",
+            "other/nick/bump/a.mp4",
+            "/abs/nick/bump/a.mp4",
+            "nick//bump/./face/c.mp4",
+        ]
+        for path in paths:
+            assert trie.match(path) == _slow_meta_hint(path, META_HINTS), path
+
+    def test_random_paths_match_is_under(self):
+        rng = random.Random(42)
+        parts = ["nick", "bump", "face", "face_winter", "x"]
+        trie = MetaHintTrie(META_HINTS)
+        for _ in range(500):
+            path = "/".join(rng.choice(parts) for _ in range(rng.randint(1, 5))) + "/f.mp4"
+            assert trie.match(path) == _slow_meta_hint(path, META_HINTS), path
+
+    def test_config_order_is_kept(self):
+        hints = MetaHintTrie(META_HINTS).match("nick/bump/face/a.mp4")
+        assert hints == [META_HINTS[0], META_HINTS[1], META_HINTS[2]]
+
+    def test_single_string_tag(self):
+        hint = {"tags": "nick/bump", "day_part": "morning"}
+        assert MetaHintTrie([hint]).match("nick/bump/a.mp4") == [hint]
+        assert MetaHintTrie([hint]).match("nick/a.mp4") is None
+
+
+class TestFilterCandidates:
+
+    def test_exclusive_hint_wins(self):
+        meta_hints = [{"tags": ["nick/bump"], "exclusive": True}]
+        candidates = [CatalogEntry(p, 30.0, "bump") for p in ("nick/bump/face/a.mp4", "other/b.mp4")]
+        filtered = HintAgent.filter_candidate_entries(datetime.datetime(2025, 6, 1, 9), candidates, meta_hints)
+        assert [c.path for c in filtered] == ["nick/bump/face/a.mp4"]
+
+    def test_out_of_range_hint_is_dropped(self):
+        meta_hints = [{"tags": ["nick"], "date_range": "December 1 - December 31"}]
+        candidates = [CatalogEntry(p, 30.0, "bump") for p in ("nick/a.mp4", "other/b.mp4")]
+        filtered = HintAgent.filter_candidate_entries(datetime.datetime(2025, 6, 1, 9), candidates, meta_hints)
+        assert [c.path for c in filtered] == ["other/b.mp4"]
+
+    def test_compiled_once_per_config(self):
+        meta_hints = [{"tags": ["a"]}]
+        assert HintAgent.compile_meta_hints(meta_hints) is HintAgent.compile_meta_hints(meta_hints)
+        assert HintAgent.compile_meta_hints(list(meta_hints)) is not HintAgent.compile_meta_hints(meta_hints)
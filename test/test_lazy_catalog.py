@@ -0,0 +1,104 @@
+import datetime
+from unittest.mock import patch
+
+import pytest
+
+from fs42.catalog import LazyClipIndex, ShowCatalog
+from fs42.catalog_entry import CatalogEntry
+from fs42.catalog_io import CatalogIO
+
+
+CATALOG = {
+    "comedy": ["/content/comedy/a.mp4", "/content/comedy/b.mp4"],
+    "drama": ["/content/drama/a.mp4"],
+    "news": ["/content/news/a.mp4"],
+}
+
+
+class _Loader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tag):
+        self.calls.append(tag)
+        return [CatalogEntry(path, 1800.0, tag) for path in CATALOG[tag]]
+
+
+class TestLazyClipIndex:
+
+    def test_loads_on_first_access(self):
+        loader = _Loader()
+        index = LazyClipIndex(loader, CATALOG.keys(), max_tags=2)
+        assert "comedy" in index and "sports" not in index
+        assert loader.calls == []
+
+        assert len(index["comedy"]) == 2
+        index["comedy"]
+        assert loader.calls == ["comedy"]
+
+    def test_unknown_tag(self):
+        index = LazyClipIndex(_Loader(), CATALOG.keys(), max_tags=2)
+        with pytest.raises(KeyError):
+            index["sports"]
+        assert index.get("sports") is None
+
+    def test_least_recently_used_is_evicted(self):
+        index = LazyClipIndex(_Loader(), CATALOG.keys(), max_tags=2)
+        index["comedy"]
+        index["drama"]
+        index["comedy"]
+        index["news"]
+        assert index.resident_tags() == ["comedy", "news"]
+        assert len(index) == 3
+
+    def test_counts_survive_eviction(self):
+        loader = _Loader()
+        index = LazyClipIndex(loader, CATALOG.keys(), max_tags=1)
+        index["comedy"][0].count = 3
+        index["drama"]
+        assert [e.count for e in index["comedy"]] == [3, 0]
+        assert loader.calls == ["comedy", "drama", "comedy"]
+
+    def test_assigned_tags_are_known(self):
+        index = LazyClipIndex(_Loader(), [], max_tags=2)
+        index["fresh"] = []
+        assert "fresh" in index
+        assert list(index) == ["fresh"]
+
+
+class TestLazyShowCatalog:
+
+    def test_station_option_enables_lazy_mode(self):
+        loader = _Loader()
+        conf = {"network_name": "Lazy", "network_type": "standard", "content_dir": "/content", "catalog_max_tags": 2}
+        with patch("fs42.catalog.CatalogAPI") as api, patch.object(ShowCatalog, "_load_quarantine"):
+            api.get_tags.return_value = list(CATALOG)
+            api.get_by_tag.side_effect = lambda config, tag: loader(tag)
+            catalog = ShowCatalog(conf)
+
+            assert isinstance(catalog.clip_index, LazyClipIndex)
+            candidate = catalog.find_candidate("drama", 3600, datetime.datetime.now())
+
+        api.get_entries.assert_not_called()
+        assert candidate.path == "/content/drama/a.mp4"
+        assert loader.calls == ["drama"]
+
+    def test_default_is_eager(self):
+        conf = {"network_name": "Eager", "network_type": "standard", "content_dir": "/content"}
+        with patch("fs42.catalog.CatalogAPI") as api, patch.object(ShowCatalog, "_load_quarantine"):
+            api.get_entries.return_value = [CatalogEntry("/content/comedy/a.mp4", 1800.0, "comedy")]
+            catalog = ShowCatalog(conf)
+
+        assert isinstance(catalog.clip_index, dict)
+        api.get_tags.assert_not_called()
+
+    def test_summary_does_not_load_entries(self, tmp_path):
+        conf = {"network_name": "Summary", "network_type": "standard", "content_dir": "/content"}
+        with patch("fs42.catalog_io.StationManager") as manager:
+            manager.return_value.server_conf = {"db_path": str(tmp_path / "fs42.db")}
+            entries = [CatalogEntry(path, 1800.0, tag) for tag, paths in CATALOG.items() for path in paths]
+            CatalogIO().put_catalog_entries("Summary", entries)
+
+            with patch.object(CatalogIO, "get_catalog_entries", side_effect=AssertionError("should not load")), \
+                    patch.object(CatalogIO, "get_by_tag", side_effect=AssertionError("should not load")):
+                assert ShowCatalog(conf, load=False).summary() == "4 videos under 3 tags"
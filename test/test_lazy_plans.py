@@ -0,0 +1,135 @@
+import datetime
+import random
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fs42.catalog_entry import CatalogEntry
+from fs42.liquid_blocks import LiquidLoopBlock, LiquidOffAirBlock, _ParametricBlock
+from fs42.liquid_io import LiquidIO
+
+
+START = datetime.datetime(2026, 2, 1)
+DAY = datetime.timedelta(days=1)
+
+
+def _entry(dbid, path, duration, tag="content"):
+    entry = CatalogEntry(path, duration, tag)
+    entry.dbid = dbid
+    return entry
+
+
+def _catalog(lazy):
+    catalog = MagicMock()
+    catalog.config = {"lazy_plans": lazy}
+    catalog.rng = random.Random(7)
+    return catalog
+
+
+def _paths(plan):
+    return [(entry.path, entry.duration) for entry in plan]
+
+
+class TestLazyBlocks:
+
+    def test_loop_plan_is_worked_out_on_read(self):
+        content = [_entry(i, f"/content/loop/{i}.mp4", 700.0) for i in range(5)]
+        block = LiquidLoopBlock(content, START, START + DAY, "Loop", shuffle=True)
+        block.make_plan(_catalog(True))
+
+        assert block.lazy_plan and block._plan is None
+        assert block.content is not content
+        plan = block.plan
+        assert _paths(plan) == _paths(block.plan)
+        assert sum(entry.duration for entry in plan) == DAY.total_seconds()
+
+    def test_unshuffled_loop_matches_eager_plan(self):
+        content = [_entry(i, f"/content/loop/{i}.mp4", 700.0) for i in range(5)]
+        lazy = LiquidLoopBlock(content, START, START + DAY, "Loop")
+        eager = LiquidLoopBlock(content, START, START + DAY, "Loop")
+        lazy.make_plan(_catalog(True))
+        eager.make_plan(_catalog(False))
+        assert not eager.lazy_plan
+        assert _paths(lazy.plan) == _paths(eager.plan)
+
+    def test_offair_plan_is_worked_out_on_read(self):
+        offair = _entry(1, "/content/offair/bars.mp4", 1200.0, "off_air")
+        sign_off = _entry(2, "/content/offair/anthem.mp4", 180.0, "sign_off")
+        block = LiquidOffAirBlock(offair, START, START + datetime.timedelta(hours=1), "Offair", sign_off=sign_off)
+        block.make_plan(_catalog(True))
+
+        assert block.plan_params() == {"sign_off": 2}
+        assert [entry.path for entry in block.plan] == [sign_off.path] + [offair.path] * 3
+
+    def test_parametric_blocks_must_compute_their_plan(self):
+        class Unplanned(_ParametricBlock):
+            pass
+
+        with pytest.raises(TypeError):
+            Unplanned(_entry(1, "/content/a.mp4", 60.0), START, START + DAY, "Unplanned")
+
+
+class TestLazyStorage:
+
+    def test_round_trip(self, tmp_path):
+        content = [_entry(i, f"/content/loop/{i}.mp4", 700.0) for i in range(1, 6)]
+        offair = _entry(10, "/content/offair/bars.mp4", 1200.0, "off_air")
+        sign_off = _entry(11, "/content/offair/anthem.mp4", 180.0, "sign_off")
+        by_id = {entry.dbid: entry for entry in content + [offair, sign_off]}
+
+        loop = LiquidLoopBlock(content, START, START + DAY, "Loop", shuffle=True)
+        night = LiquidOffAirBlock(offair, START + DAY, START + DAY + datetime.timedelta(hours=1), "Offair",
+                                  sign_off=sign_off)
+        eager = LiquidOffAirBlock(offair, START + DAY * 2, START + DAY * 2 + datetime.timedelta(hours=1), "Offair")
+        loop.make_plan(_catalog(True))
+        night.make_plan(_catalog(True))
+        eager.make_plan(_catalog(False))
+
+        db_path = str(tmp_path / "fs42.db")
+        with patch("fs42.liquid_io.StationManager") as manager, patch("fs42.liquid_io.CatalogAPI") as catalog_api:
+            manager.return_value.server_conf = {"db_path": db_path, "normalize_titles": False}
+            catalog_api.get_entries_by_ids.side_effect = lambda ids: {i: by_id[i] for i in ids}
+            liquid_io = LiquidIO()
+            liquid_io.put_liquid_blocks("Lazy", [loop, night, eager])
+            loaded = liquid_io.get_liquid_blocks("Lazy")
+
+        with sqlite3.connect(db_path) as connection:
+            stored = connection.execute("SELECT plan_json, plan_params FROM liquid_blocks ORDER BY start_time").fetchall()
+        assert stored[0] == ("[]", '{"shuffle": true}')
+        assert stored[1] == ("[]", '{"sign_off": 11}')
+        assert stored[2][0] != "[]" and stored[2][1] is None
+
+        assert [type(block) for block in loaded] == [LiquidLoopBlock, LiquidOffAirBlock, LiquidOffAirBlock]
+        assert loaded[0].lazy_plan and loaded[0].shuffle
+        assert _paths(loaded[0].plan) == _paths(loop.plan)
+        assert loaded[1].sign_off is sign_off
+        assert _paths(loaded[1].plan) == _paths(night.plan)
+        assert not loaded[2].lazy_plan
+        assert _paths(loaded[2].plan) == _paths(eager.plan)
+
+    def test_adds_column_to_existing_table(self, tmp_path):
+        db_path = str(tmp_path / "fs42.db")
+        with sqlite3.connect(db_path) as connection:
+            connection.execute("""CREATE TABLE liquid_blocks (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                station TEXT NOT NULL,
+                                liquid_type TEXT NOT NULL,
+                                start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                end_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                break_strategy TEXT NOT NULL,
+                                title TEXT NOT NULL,
+                                sequence_key TEXT,
+                                break_info TEXT,
+                                content_json TEXT NOT NULL,
+                                plan_json TEXT NOT NULL
+                            )""")
+
+        with patch("fs42.liquid_io.StationManager") as manager:
+            manager.return_value.server_conf = {"db_path": db_path}
+            LiquidIO()
+
+        with sqlite3.connect(db_path) as connection:
+            columns = [column[1] for column in connection.execute("PRAGMA table_info(liquid_blocks)")]
+        assert columns[-1] == "plan_params"
+
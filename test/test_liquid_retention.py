@@ -0,0 +1,80 @@
+import datetime
+import json
+import sqlite3
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from fs42.catalog_entry import CatalogEntry
+from fs42.liquid_blocks import LiquidOffAirBlock
+from fs42.liquid_io import LiquidIO
+
+
+START = datetime.datetime(2026, 1, 1)
+HOUR = datetime.timedelta(hours=1)
+
+
+@pytest.fixture
+def liquid_io(tmp_path):
+    with patch("fs42.liquid_io.StationManager") as manager:
+        manager.return_value.server_conf = {"db_path": str(tmp_path / "fs42_fluid.db")}
+        liquid_io = LiquidIO()
+        offair = CatalogEntry("/content/offair/bars.mp4", 3600.0, "off_air")
+        offair.dbid = 1
+        blocks = []
+        for hour in range(10):
+            block = LiquidOffAirBlock(offair, START + HOUR * hour, START + HOUR * (hour + 1), f"Offair {hour}")
+            block.make_plan(None)
+            blocks.append(block)
+        liquid_io.put_liquid_blocks("Retained", blocks)
+        yield liquid_io
+
+
+def _remaining(liquid_io):
+    with sqlite3.connect(liquid_io.db_path) as connection:
+        return [row[0] for row in connection.execute("SELECT title FROM liquid_blocks ORDER BY start_time")]
+
+
+class TestPruneLiquidBlocks:
+
+    def test_prunes_in_batches(self, liquid_io):
+        with patch.object(liquid_io, "_get_connection", wraps=liquid_io._get_connection) as connections:
+            pruned = liquid_io.prune_liquid_blocks(START + HOUR * 8, batch_size=3)
+
+        assert pruned == 7
+        # batches of 3, 3 and 1
+        assert connections.call_count == 3
+        assert _remaining(liquid_io) == ["Offair 7", "Offair 8", "Offair 9"]
+
+    def test_nothing_to_prune(self, liquid_io):
+        assert liquid_io.prune_liquid_blocks(START) == 0
+        assert len(_remaining(liquid_io)) == 10
+
+    def test_archives_compressed_rows(self, liquid_io):
+        archive_path = liquid_io.archive_path()
+        assert archive_path.endswith("fs42_fluid_archive.db")
+
+        liquid_io.prune_liquid_blocks(START + HOUR * 3, archive_path)
+        with sqlite3.connect(archive_path) as connection:
+            rows = connection.execute(
+                "SELECT station, title, block FROM liquid_blocks_archive ORDER BY start_time"
+            ).fetchall()
+
+        assert [(row[0], row[1]) for row in rows] == [("Retained", "Offair 0"), ("Retained", "Offair 1")]
+        archived = json.loads(zlib.decompress(rows[0][2]))
+        assert archived["liquid_type"] == "LiquidOffAirBlock"
+        assert json.loads(archived["plan_json"])[0]["path"] == "/content/offair/bars.mp4"
+
+
+class TestCompact:
+
+    def test_switches_to_incremental_then_stays(self, liquid_io):
+        liquid_io.prune_liquid_blocks(START + HOUR * 6)
+        liquid_io.compact()
+        with sqlite3.connect(liquid_io.db_path) as connection:
+            assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+        liquid_io.prune_liquid_blocks(START + HOUR * 9)
+        liquid_io.compact()
+        assert _remaining(liquid_io) == ["Offair 8", "Offair 9"]
@@ -0,0 +1,238 @@
+import datetime
+import queue
+from unittest.mock import MagicMock, patch
+
+from fs42.live_schedule_agent import (
+    BuildThrottle,
+    LiveScheduleAgent,
+    ScheduleLocks,
+    _worker_build_schedules,
+)
+from fs42.liquid_manager import LiquidManager
+
+
+AGENT_CONF = {"amount_to_add": "week", "trigger_add_at": "day"}
+
+
+class TestScheduleLocks:
+
+    def test_each_station_has_its_own_lock(self):
+        locks = ScheduleLocks(["NBC", "CBS"])
+        assert locks.for_station("NBC") is not locks.for_station("CBS")
+        assert locks.for_station("NBC") is locks.for_station("NBC")
+
+        with locks.for_station("NBC"):
+            assert locks.for_station("CBS").acquire(block=False)
+            locks.for_station("CBS").release()
+
+    def test_unknown_station_uses_fallback(self):
+        locks = ScheduleLocks(["NBC"])
+        assert locks.for_station("New") is locks.for_station("Newer")
+
+
+class TestWorker:
+
+    def test_reports_only_finished_stations(self):
+        def build(conf):
+            schedule = MagicMock()
+            if conf["network_name"] == "Broken":
+                schedule.add_amount.side_effect = RuntimeError("no content")
+            return schedule
+
+        done = queue.Queue()
+        stations = [{"network_name": "NBC"}, {"network_name": "Broken"}, {"network_name": "CBS"}]
+        with patch("fs42.liquid_schedule.LiquidSchedule", side_effect=build):
+            _worker_build_schedules(ScheduleLocks(["NBC", "CBS"]), stations, "week", done, low_priority=False)
+
+        assert [done.get_nowait() for _ in range(done.qsize())] == ["NBC", "CBS"]
+
+
+class TestTargetedReload:
+
+    def _finished_agent(self, names):
+        agent = LiveScheduleAgent(AGENT_CONF, ScheduleLocks([]))
+        agent._worker = MagicMock()
+        agent._worker.is_alive.return_value = False
+        agent._worker.exitcode = 0
+        agent._done_queue = queue.Queue()
+        for name in names:
+            agent._done_queue.put(name)
+        return agent
+
+    def test_reloads_only_rebuilt_stations(self):
+        agent = self._finished_agent(["NBC"])
+        with patch("fs42.liquid_manager.LiquidManager.reload_schedules") as reload, \
+                patch("fs42.liquid_manager.LiquidManager.__init__", return_value=None):
+            assert agent.tick() is True
+        reload.assert_called_once_with(["NBC"])
+        assert agent._worker is None
+
+    def test_no_reload_when_nothing_was_built(self):
+        agent = self._finished_agent([])
+        with patch("fs42.liquid_manager.LiquidManager.reload_schedules") as reload, \
+                patch("fs42.liquid_manager.LiquidManager.__init__", return_value=None):
+            assert agent.tick() is False
+        reload.assert_not_called()
+
+    def test_reload_schedules_by_name(self):
+        stations = [
+            {"network_name": "NBC", "network_type": "standard"},
+            {"network_name": "CBS", "network_type": "standard"},
+        ]
+        manager = object.__new__(LiquidManager)
+        with patch("fs42.liquid_manager.StationManager") as sm, patch("fs42.liquid_manager.LiquidAPI") as api:
+            sm.return_value.stations = stations
+            api.get_blocks.side_effect = lambda station: [f"{station['network_name']}-1"]
+            manager.reload_schedules()
+
+            api.get_blocks.side_effect = lambda station: [f"{station['network_name']}-2"]
+            manager.reload_schedules(["CBS"])
+
+        assert manager.schedules == {"NBC": ["NBC-1"], "CBS": ["CBS-2"]}
+
+
+class TestBuildWindow:
+
+    def _agent(self, window):
+        conf = dict(AGENT_CONF, build_window=window)
+        return LiveScheduleAgent(conf, ScheduleLocks([]))
+
+    def test_window_hours(self):
+        agent = self._agent({"start_hour": 2, "end_hour": 5})
+        assert agent._in_build_window(datetime.datetime(2024, 3, 1, 3, 30))
+        assert not agent._in_build_window(datetime.datetime(2024, 3, 1, 5, 0))
+        assert agent._next_window_start(datetime.datetime(2024, 3, 1, 20, 0)) == datetime.datetime(2024, 3, 2, 2, 0)
+
+    def test_window_wraps_midnight(self):
+        agent = self._agent({"start_hour": 23, "end_hour": 4})
+        assert agent._in_build_window(datetime.datetime(2024, 3, 1, 23, 10))
+        assert agent._in_build_window(datetime.datetime(2024, 3, 1, 1, 0))
+        assert not agent._in_build_window(datetime.datetime(2024, 3, 1, 12, 0))
+
+    def test_holds_only_stations_that_can_wait(self):
+        agent = self._agent({"start_hour": 2, "end_hour": 5})
+        now = datetime.datetime(2024, 3, 1, 20, 0)
+        ends = {"Plenty": datetime.datetime(2024, 3, 2, 12, 0), "Soon": datetime.datetime(2024, 3, 1, 23, 0)}
+        stations = [{"network_name": name} for name in ends]
+        with patch("fs42.liquid_manager.LiquidManager.__init__", return_value=None), \
+                patch("fs42.liquid_manager.LiquidManager.get_extents", side_effect=lambda name: (None, ends[name])):
+            holding = agent._hold_for_window(stations, now)
+            assert [station["network_name"] for station in holding] == ["Plenty"]
+            assert agent._hold_for_window(stations, datetime.datetime(2024, 3, 1, 3, 0)) == []
+
+    def test_no_window_never_holds(self):
+        agent = LiveScheduleAgent(AGENT_CONF, ScheduleLocks([]))
+        assert agent._hold_for_window([{"network_name": "Any"}], datetime.datetime(2024, 3, 1, 20, 0)) == []
+
+
+class TestBuildThrottle:
+
+    def test_pauses_while_frames_drop(self):
+        throttle = BuildThrottle()
+        throttle.report(10)
+        assert not throttle.is_paused()
+        throttle.report(14)
+        assert throttle.is_paused()
+        throttle.report(14)
+        assert not throttle.is_paused()
+
+    def test_pauses_on_load(self):
+        throttle = BuildThrottle(pause_load=0.5)
+        with patch("fs42.live_schedule_agent.os.getloadavg", return_value=(4.0, 1.0, 1.0)), \
+                patch("fs42.live_schedule_agent.os.cpu_count", return_value=4):
+            throttle.report()
+        assert throttle.is_paused()
+
+        with patch("fs42.live_schedule_agent.os.getloadavg", return_value=(1.0, 1.0, 1.0)), \
+                patch("fs42.live_schedule_agent.os.cpu_count", return_value=4):
+            throttle.report()
+        assert not throttle.is_paused()
+
+    def test_checks_are_spaced_out(self):
+        throttle = BuildThrottle()
+        assert throttle.due()
+        assert not throttle.due()
+
+    def test_wait_returns_once_resumed(self):
+        throttle = BuildThrottle()
+        throttle.report(1)
+        throttle.report(2)
+
+        def resume(_seconds):
+            throttle.report(2)
+
+        with patch("fs42.live_schedule_agent.time.sleep", side_effect=resume) as sleep:
+            throttle.wait()
+        sleep.assert_called_once()
+
+    def test_stale_reports_resume(self):
+        throttle = BuildThrottle()
+        throttle.report(1)
+        throttle.report(2)
+        assert throttle.holding()
+
+        later = throttle._last_report.value + BuildThrottle.STALE_AFTER + 1
+        with patch("fs42.live_schedule_agent.time.time", return_value=later):
+            assert not throttle.holding()
+        assert not throttle.is_paused()
+
+    def test_total_pause_is_capped(self):
+        throttle = BuildThrottle()
+        throttle.report(1)
+        throttle.report(2)
+        reported = throttle._last_report.value
+        with patch.object(BuildThrottle, "MAX_PAUSE", 3), \
+                patch("fs42.live_schedule_agent.time.time", return_value=reported), \
+                patch("fs42.live_schedule_agent.time.sleep") as sleep:
+            throttle.wait()
+            assert sleep.call_count == 3
+            # still paused, but this worker has used up its pause
+            assert throttle.is_paused() and not throttle.holding()
+
+    def test_worker_waits_outside_the_lock(self):
+        from fs42.liquid_schedule import BuildPaused
+
+        locks = ScheduleLocks(["NBC"])
+        throttle = MagicMock()
+
+        def wait():
+            assert locks.for_station("NBC").acquire(block=False)
+            locks.for_station("NBC").release()
+
+        throttle.wait.side_effect = wait
+        builds = [MagicMock(), MagicMock()]
+        builds[0].add_amount.side_effect = BuildPaused("busy")
+        done = queue.Queue()
+        with patch("fs42.liquid_schedule.LiquidSchedule", side_effect=builds):
+            _worker_build_schedules(locks, [{"network_name": "NBC"}], "week", done, throttle, low_priority=False)
+
+        assert throttle.wait.call_count == 2
+        builds[1].add_amount.assert_called_once_with("week")
+        assert done.get_nowait() == "NBC"
+
+
+class TestRetention:
+
+    def test_prunes_once_a_day_inside_the_window(self):
+        conf = dict(AGENT_CONF, keep_history_days=14, archive_pruned=True, build_window={"start_hour": 2, "end_hour": 5})
+        agent = LiveScheduleAgent(conf, ScheduleLocks([]))
+        night = datetime.datetime(2024, 3, 1, 3, 0)
+
+        assert agent._retention_due(datetime.datetime(2024, 3, 1, 20, 0)) is None
+        assert agent._retention_due(night) == {"keep_days": 14, "archive": True}
+
+        agent._last_prune = night
+        assert agent._retention_due(night + datetime.timedelta(hours=1)) is None
+        assert agent._retention_due(night + datetime.timedelta(days=1)) is not None
+
+    def test_off_by_default(self):
+        agent = LiveScheduleAgent(AGENT_CONF, ScheduleLocks([]))
+        assert agent._retention_due(datetime.datetime(2024, 3, 1, 3, 0)) is None
+
+    def test_worker_prunes_after_builds(self):
+        with patch("fs42.liquid_api.LiquidAPI.prune_blocks", return_value=3) as prune:
+            _worker_build_schedules(
+                ScheduleLocks([]), [], "week", queue.Queue(), low_priority=False,
+                retention={"keep_days": 7, "archive": False},
+            )
+        prune.assert_called_once_with(7, False)
@@ -0,0 +1,108 @@
+import datetime
+import os
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fs42.catalog_entry import CatalogEntry, MatchingContentNotFound
+from fs42.fluid_builder import FluidBuilder
+from fs42.fluid_statements import FluidStatements
+from fs42.media_processor import MediaProcessor
+
+
+def _builder(db_path):
+    builder = FluidBuilder.__new__(FluidBuilder)
+    builder.db_path = str(db_path)
+    builder._l = MagicMock()
+    connection = sqlite3.connect(builder.db_path)
+    FluidStatements.init_db(connection)
+    connection.close()
+    return builder
+
+
+class TestHealthPositions:
+
+    def test_head_middle_tail(self):
+        assert MediaProcessor.health_positions(100.0) == [0.0, 50.0, 96.0]
+
+    def test_unknown_duration_checks_head(self):
+        assert MediaProcessor.health_positions(None) == [0.0]
+        assert MediaProcessor.health_positions(3.0) == [0.0]
+
+
+class TestScanHealth:
+
+    def _library(self, tmp_path):
+        lib = tmp_path / "lib"
+        lib.mkdir()
+        for name in ("good.mp4", "broken.mp4"):
+            (lib / name).write_bytes(b"x" * 10)
+        return lib
+
+    def _check(self, fname, duration):
+        return "decode failed at 0.0s: invalid data" if "broken" in fname else None
+
+    def test_failures_are_quarantined(self, tmp_path):
+        lib = self._library(tmp_path)
+        builder = _builder(tmp_path / "fs42.db")
+
+        with patch.object(MediaProcessor, "check_health", side_effect=self._check):
+            checked, failed = builder.scan_health(str(lib), workers=2)
+
+        assert len(checked) == 2
+        assert failed == [os.path.realpath(lib / "broken.mp4")]
+        assert builder.get_quarantined() == {os.path.realpath(lib / "broken.mp4")}
+
+    def test_unchanged_files_are_skipped(self, tmp_path):
+        lib = self._library(tmp_path)
+        builder = _builder(tmp_path / "fs42.db")
+
+        with patch.object(MediaProcessor, "check_health", side_effect=self._check):
+            builder.scan_health(str(lib))
+        with patch.object(MediaProcessor, "check_health", side_effect=AssertionError("should not recheck")):
+            checked, failed = builder.scan_health(str(lib))
+        assert checked == [] and failed == []
+
+    def test_replaced_file_is_released(self, tmp_path):
+        lib = self._library(tmp_path)
+        builder = _builder(tmp_path / "fs42.db")
+
+        with patch.object(MediaProcessor, "check_health", side_effect=self._check):
+            builder.scan_health(str(lib))
+
+        broken = lib / "broken.mp4"
+        later = datetime.datetime.now().timestamp() + 60
+        os.utime(broken, (later, later))
+        with patch.object(MediaProcessor, "check_health", return_value=None):
+            checked, failed = builder.scan_health(str(lib))
+
+        assert checked == [os.path.realpath(broken)]
+        assert builder.get_quarantined() == set()
+
+
+class TestFindCandidateQuarantine:
+
+    def _catalog(self, paths):
+        from fs42.catalog import ShowCatalog
+        conf = {"network_name": "Health", "network_type": "standard", "content_dir": "/content"}
+        cat = ShowCatalog(conf, load=False)
+        entries = []
+        for path in paths:
+            entry = CatalogEntry(path, 1800, "comedy")
+            entry.realpath = path
+            entries.append(entry)
+        cat.clip_index = {"comedy": entries}
+        return cat
+
+    def test_quarantined_file_is_skipped(self):
+        cat = self._catalog(["/content/comedy/a.mp4", "/content/comedy/b.mp4"])
+        cat.quarantined = {"/content/comedy/a.mp4"}
+        for _ in range(5):
+            assert cat.find_candidate("comedy", 3600, datetime.datetime.now()).path == "/content/comedy/b.mp4"
+
+    def test_all_quarantined_raises(self):
+        cat = self._catalog(["/content/comedy/a.mp4"])
+        cat.quarantined = {"/content/comedy/a.mp4"}
+        with pytest.raises(MatchingContentNotFound):
+            cat.find_candidate("comedy", 3600, datetime.datetime.now())
@@ -0,0 +1,84 @@
+import random
+from pathlib import Path
+
+from fs42.liquid_schedule import LiquidSchedule
+from fs42.path_query import PathMatcher, PathQuery
+
+
+def _slow_from_base(full_path, base_dir, patterns):
+    # the per pattern scan match_any_from_base used to do
+    path_from_base = PathQuery.get_dir_from_base(full_path, base_dir)
+    for pattern in patterns:
+        if PathQuery.path_starts_with(path_from_base, pattern):
+            return pattern
+    return None
+
+
+def _slow_relative(full_path, relative_paths):
+    for relative_path in relative_paths:
+        if PathQuery.path_ends_with_relative(full_path, relative_path):
+            return relative_path
+    return None
+
+
+PARTS = ["catalog", "nbc", "comedy", "cheers", "season1", "x"]
+PATTERNS = ["comedy/cheers", "comedy", "cheers/season1/", "comedy//cheers/season1", "season1", "", "x/x"]
+
+
+def _random_path(rng):
+    return "/".join(rng.choice(PARTS) for _ in range(rng.randint(0, 5))) + "/ep.mp4"
+
+
+class TestPathMatcher:
+
+    def test_match_from_base_agrees(self):
+        rng = random.Random(7)
+        for _ in range(1000):
+            patterns = rng.sample(PATTERNS, rng.randint(0, len(PATTERNS)))
+            path = "catalog/nbc/" + _random_path(rng)
+            assert PathMatcher(patterns).match_from_base(path, "catalog/nbc") == \
+                _slow_from_base(path, "catalog/nbc", patterns), (path, patterns)
+
+    def test_match_relative_end_agrees(self):
+        rng = random.Random(11)
+        for _ in range(1000):
+            patterns = rng.sample(PATTERNS, rng.randint(0, len(PATTERNS)))
+            path = _random_path(rng).lstrip("/")
+            assert PathMatcher(patterns).match_relative_end(path) == _slow_relative(path, patterns), (path, patterns)
+
+    def test_list_order_wins(self):
+        matcher = PathMatcher(["comedy", "comedy/cheers"])
+        assert matcher.match_from_base("catalog/nbc/comedy/cheers/a.mp4", "catalog/nbc") == "comedy"
+
+    def test_outside_base(self):
+        assert PathMatcher(["comedy"]).match_from_base("elsewhere/comedy/a.mp4", "catalog/nbc") is None
+
+
+class TestPathQuery:
+
+    def test_matchers_are_reused(self):
+        clip_shows = {"comedy": {}, "drama": {}}
+        assert PathQuery.compile(clip_shows.keys()) is PathQuery.compile(clip_shows.keys())
+
+    def test_match_any_from_base(self):
+        clip_shows = {"comedy/cheers": {}}
+        path = str(Path("catalog/nbc/comedy/cheers/s1/a.mp4"))
+        assert PathQuery.match_any_from_base(path, "catalog/nbc", clip_shows.keys()) == "comedy/cheers"
+        assert PathQuery.match_any_from_base(path, "catalog/abc", clip_shows.keys()) is None
+
+
+class TestScheduleMatchers:
+
+    def test_compiled_once_per_schedule(self):
+        schedule = LiquidSchedule.__new__(LiquidSchedule)
+        schedule.conf = {"clip_shows": {"comedy/cheers": {}}, "tag_overrides": {"drama": {}}}
+        clip_shows = schedule._conf_matcher("clip_shows")
+        assert schedule._conf_matcher("clip_shows") is clip_shows
+        assert schedule._conf_matcher("tag_overrides") is not clip_shows
+        assert clip_shows.match_from_base("catalog/nbc/comedy/cheers/a.mp4", "catalog/nbc") == "comedy/cheers"
+        assert LiquidSchedule._matchers is None
+
+    def test_compiled_matcher_is_passed_through(self):
+        matcher = PathMatcher(["comedy"])
+        assert PathQuery.compile(matcher) is matcher
+        assert PathQuery.match_any_from_base("catalog/nbc/comedy/a.mp4", "catalog/nbc", matcher) == "comedy"
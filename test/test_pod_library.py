@@ -0,0 +1,104 @@
+import datetime
+
+from fs42.catalog import ShowCatalog
+from fs42.catalog_entry import CatalogEntry
+from fs42.pod_library import PodLibrary
+from fs42.schedule_hint import DayofWeekHint, MonthHint
+
+
+META_HINTS = [
+    {"tags": ["commercials/xmas"], "date_range": "December 1 - December 24", "exclusive": True},
+    {"tags": ["commercials/summer"], "date_range": "June 1 - August 31"},
+]
+
+
+def _catalog(meta_hints=None):
+    conf = {
+        "network_name": "Pods", "network_type": "standard", "content_dir": "/content",
+        "commercial_free": False, "commercial_dir": "commercials", "bump_dir": "bumps",
+    }
+    if meta_hints:
+        conf["meta_hints"] = meta_hints
+    catalog = ShowCatalog(conf, load=False)
+
+    entries = []
+    for folder, hints in (("plain", []), ("xmas", []), ("summer", []), ("june", [MonthHint("June")]),
+                          ("monday", [DayofWeekHint("monday")])):
+        for i, duration in enumerate((15, 30, 45, 200)):
+            entry = CatalogEntry(f"commercials/{folder}/{i}.mp4", duration, "commercials")
+            entry.hints = hints
+            entries.append(entry)
+    catalog.clip_index["commercials"] = entries
+    return catalog
+
+
+WHENS = [
+    datetime.datetime(2025, 12, 8, 20),
+    datetime.datetime(2025, 12, 28, 20),
+    datetime.datetime(2025, 6, 2, 9),
+    datetime.datetime(2025, 6, 3, 9),
+    datetime.datetime(2025, 3, 3, 9),
+]
+
+
+class TestPodEligibility:
+
+    def test_matches_find_candidate(self):
+        for meta_hints in (None, META_HINTS):
+            catalog = _catalog(meta_hints)
+            catalog.quarantined = {"commercials/plain/0.mp4"}
+            library = PodLibrary(catalog)
+            for when in WHENS:
+                groups = library._tag_groups("commercials")
+                pool = groups.eligible(groups.mask(when), 120, catalog.quarantined)
+                expected = catalog._fit_candidates("commercials", 120, when)
+                assert sorted(e.path for e in pool) == sorted(e.path for e in expected), (meta_hints, when)
+
+
+class TestPodRotation:
+
+    def test_pods_rotate_then_rebuild(self):
+        catalog = _catalog()
+        library = PodLibrary(catalog)
+        when = datetime.datetime(2025, 3, 3, 9)
+
+        pods = [library.take("commercials", 120, 90, when) for _ in range(PodLibrary.PODS_PER_BUCKET)]
+        assert all(sum(e.duration for e in pod) > 90 - 12 for pod in pods)
+        assert len(library._buckets) == 1
+
+        again = [library.take("commercials", 120, 92, when) for _ in range(PodLibrary.PODS_PER_BUCKET)]
+        assert [[e.path for e in pod] for pod in again] == [[e.path for e in pod] for pod in pods]
+        bucket = next(iter(library._buckets.values()))
+        assert not bucket
+
+        library.take("commercials", 120, 90, when)
+        rebuilt = next(iter(library._buckets.values()))
+        assert rebuilt is not bucket and len(rebuilt) == PodLibrary.PODS_PER_BUCKET
+
+    def test_counts_follow_airings(self):
+        catalog = _catalog()
+        library = PodLibrary(catalog)
+        pod = library.take("commercials", 120, 60, datetime.datetime(2025, 3, 3, 9))
+        assert sum(e.count for e in catalog.clip_index["commercials"]) == len(pod)
+
+    def test_nothing_to_air(self):
+        catalog = _catalog()
+        assert PodLibrary(catalog).take("missing", 120, 60, WHENS[0]) is None
+        assert PodLibrary(catalog).take("commercials", 10, 60, WHENS[0]) is None
+
+    def test_reel_block_uses_library(self):
+        catalog = _catalog()
+        catalog.pod_library = PodLibrary(catalog)
+        block = catalog.make_reel_block(datetime.datetime(2025, 3, 3, 9), bumpers=False, target_duration=120)
+        assert block.comms
+        assert len(catalog.pod_library._buckets) == 1
+
+    def test_reel_blocks_never_overrun(self):
+        catalog = _catalog()
+        catalog.pod_library = PodLibrary(catalog)
+        when = datetime.datetime(2025, 3, 3, 9)
+        for target in (61, 77, 93, 119, 120) * 6:
+            block = catalog.make_reel_block(when, bumpers=False, target_duration=target)
+            assert block.comms
+            assert sum(e.duration for e in block.comms) <= target
+        assert len(catalog.pod_library._buckets) == 5
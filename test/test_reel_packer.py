@@ -0,0 +1,126 @@
+import datetime
+import random
+from unittest.mock import MagicMock, patch
+
+from fs42.catalog import ShowCatalog
+from fs42.catalog_entry import CatalogEntry
+from fs42.reel_packer import ReelPacker
+
+
+def _clips(*durations, count=0):
+    clips = []
+    for i, duration in enumerate(durations):
+        entry = CatalogEntry(f"/content/commercials/{i}.mp4", duration, "commercials")
+        entry.count = count
+        clips.append(entry)
+    return clips
+
+
+def _total(entries):
+    return sum(e.duration for e in entries)
+
+
+class TestReelPacker:
+
+    def test_fills_exactly_when_possible(self):
+        packed = ReelPacker.pack(_clips(30, 30, 45, 25, 15), 69)
+        assert _total(packed) == 60
+        assert _total(ReelPacker.pack(_clips(30, 30, 45, 25, 15), 70)) == 70
+
+    def test_never_overruns(self):
+        clips = _clips(10.2, 10.2, 10.2, 9.9, 29.6)
+        for target in (20, 30.4, 40, 50.1):
+            assert _total(ReelPacker.pack(clips, target)) <= target
+
+    def test_prefers_less_played_clips(self):
+        popular = _clips(60, count=5)
+        fresh = _clips(30, 30)
+        packed = ReelPacker.pack(popular + fresh, 60)
+        assert sorted(e.path for e in packed) == sorted(e.path for e in fresh)
+
+    def test_play_count_override(self):
+        clips = _clips(60, 30, 30)
+        packed = ReelPacker.pack(clips, 60, play_count=lambda e: 5 if e is clips[0] else 0)
+        assert clips[0] not in packed and _total(packed) == 60
+
+    def test_each_clip_used_once(self):
+        packed = ReelPacker.pack(_clips(30), 120)
+        assert len(packed) == 1
+
+    def test_nothing_fits(self):
+        assert ReelPacker.pack(_clips(30, 45), 20) == []
+
+    def test_out_of_steps(self):
+        assert ReelPacker.pack(_clips(30, 45), 90, max_steps=1) is None
+        assert ReelPacker.pack(_clips(30, 45), 90, max_steps=3) is not None
+
+    def test_seeded_packs_repeat(self):
+        clips = _clips(*[15 + i % 7 * 5 for i in range(40)])
+        first = ReelPacker.pack(clips, 120, rng=random.Random(3))
+        second = ReelPacker.pack(clips, 120, rng=random.Random(3))
+        assert [e.path for e in first] == [e.path for e in second]
+
+
+class TestPackedFill:
+
+    def _catalog(self, durations):
+        conf = {
+            "network_name": "Packed", "network_type": "standard", "content_dir": "/content",
+            "commercial_free": False, "commercial_dir": "commercials", "bump_dir": "bumps",
+            "break_duration": 120,
+        }
+        catalog = ShowCatalog(conf, load=False)
+        catalog.clip_index["commercials"] = _clips(*durations)
+        return catalog
+
+    def test_fill_uses_packer(self):
+        catalog = self._catalog([50, 40, 35, 25])
+        # a 75 second tail: greedy picks at random, the packer finds 50 + 25 or 40 + 35
+        with patch("fs42.catalog.SlotReader") as slots, \
+                patch.object(ShowCatalog, "make_reel_block") as reel_block:
+            slots.get_break_info.return_value = {"break_strategy": "end"}
+            reel_block.return_value = MagicMock(duration=0)
+            blocks = catalog.make_reel_fill(datetime.datetime(2026, 1, 5, 20), 75, use_bumpers=False)
+
+        fill = blocks[-1].comms
+        assert _total(fill) == 75
+        assert all(e.count == 1 for e in fill)
+
+    def test_falls_back_to_greedy(self):
+        catalog = self._catalog([30, 30])
+        with patch("fs42.catalog.SlotReader") as slots, \
+                patch.object(ShowCatalog, "make_reel_block") as reel_block, \
+                patch.object(ReelPacker, "pack", return_value=None):
+            slots.get_break_info.return_value = {"break_strategy": "end"}
+            reel_block.return_value = MagicMock(duration=0)
+            blocks = catalog.make_reel_fill(datetime.datetime(2026, 1, 5, 20), 61, use_bumpers=False)
+        assert _total(blocks[-1].comms) == 60
+
+    def test_each_break_is_packed(self):
+        catalog = self._catalog([50, 40, 35, 25, 50, 40, 35, 25])
+        when = datetime.datetime(2026, 1, 5, 20)
+        with patch("fs42.catalog.SlotReader") as slots:
+            slots.get_break_info.return_value = {"break_strategy": "standard"}
+            blocks = catalog.make_reel_fill(when, 151, use_bumpers=False, strict_count=2)
+
+        # two 75 second breaks packed exactly, one second left over for the tail
+        assert [_total(block.comms) for block in blocks[:2]] == [75, 75]
+        assert all(e.count == 1 for block in blocks[:2] for e in block.comms)
+
+    def test_break_falls_back_to_greedy(self):
+        catalog = self._catalog([30, 30, 30])
+        with patch.object(ReelPacker, "pack", return_value=None):
+            block = catalog.make_reel_block(datetime.datetime(2026, 1, 5, 20), bumpers=False, target_duration=61)
+        # greedy takes one clip at a time until less than a tenth of the target is left
+        assert _total(block.comms) == 60
+        assert all(e.count == 1 for e in block.comms)
+
+    def test_bump_breaks_keep_coming_up_next(self):
+        catalog = self._catalog([])
+        catalog.config["commercial_free"] = True
+        catalog.clip_index["bumps"] = _clips(20)
+        catalog.clip_index["next/--Cheers"] = _clips(20, 20, 20)
+        with patch.object(ReelPacker, "pack", side_effect=AssertionError("should not pack")):
+            block = catalog.make_reel_block(datetime.datetime(2026, 1, 5, 20), bumpers=False, target_duration=60,
+                                            lookahead=["Frasier", "Cheers"])
+        assert _total(block.comms) == 60
@@ -0,0 +1,102 @@
+import datetime
+import random
+from unittest.mock import MagicMock
+
+from fs42.catalog import ShowCatalog
+from fs42.catalog_entry import CatalogEntry
+from fs42.liquid_blocks import LiquidLoopBlock, LiquidOffAirBlock
+from fs42.liquid_schedule import LiquidSchedule
+from fs42.slot_reader import SlotReader
+
+
+START = datetime.datetime(2024, 3, 1, 0, 0)
+
+
+def _schedule(conf):
+    schedule = LiquidSchedule.__new__(LiquidSchedule)
+    schedule.conf = conf
+    return schedule
+
+
+def _picks(rng, count=20):
+    catalog = ShowCatalog.__new__(ShowCatalog)
+    catalog.rng = rng
+    entries = [CatalogEntry(f"/content/show/{i}.mp4", 1800.0, "show") for i in range(10)]
+    slot = {"tags": ["a", "b", "c", "d"], "random_tags": True}
+    return [
+        (catalog._lowest_count(entries).path, SlotReader.get_tag_from_slot(slot, START, rng)[0])
+        for _ in range(count)
+    ]
+
+
+class TestScheduleSeed:
+
+    def test_unseeded_build_uses_module_random(self):
+        conf = {"network_name": "Plain"}
+        assert _schedule(conf)._build_rng(START) is random
+
+    def test_same_seed_and_start_repeat(self):
+        conf = {"network_name": "Seeded", "schedule_seed": 42}
+        first = _picks(_schedule(conf)._build_rng(START))
+        second = _picks(_schedule(conf)._build_rng(START))
+        assert first == second
+
+    def test_start_and_station_change_the_picks(self):
+        conf = {"network_name": "Seeded", "schedule_seed": 42}
+        base = _picks(_schedule(conf)._build_rng(START))
+        later = _picks(_schedule(conf)._build_rng(START + datetime.timedelta(days=1)))
+        other = _picks(_schedule({"network_name": "Other", "schedule_seed": 42})._build_rng(START))
+        assert base != later
+        assert base != other
+
+
+class TestPlanMemoization:
+
+    def test_offair_plans_are_shared(self):
+        offair = CatalogEntry("/content/offair/bars.mp4", 1200.0, "offair")
+        cache = {}
+        plans = []
+        for hour in range(3):
+            start = START + datetime.timedelta(hours=hour)
+            block = LiquidOffAirBlock(offair, start, start + datetime.timedelta(hours=1), "Offair")
+            block.plan_cache = cache
+            block.make_plan(None)
+            plans.append(block.plan)
+
+        assert len(cache) == 1
+        assert [e.duration for e in plans[0]] == [1200.0, 1200.0, 1200.0]
+        assert plans[0] == plans[2] and plans[0] is not plans[2]
+
+    def test_sign_off_gets_its_own_plan(self):
+        offair = CatalogEntry("/content/offair/bars.mp4", 1200.0, "offair")
+        sign_off = CatalogEntry("/content/offair/anthem.mp4", 180.0, "sign_off")
+        cache = {}
+        end = START + datetime.timedelta(hours=1)
+        plain = LiquidOffAirBlock(offair, START, end, "Offair")
+        signed = LiquidOffAirBlock(offair, START, end, "Offair", sign_off=sign_off)
+        for block in (plain, signed):
+            block.plan_cache = cache
+            block.make_plan(None)
+
+        assert len(cache) == 2
+        assert signed.plan[0].path == sign_off.path
+        assert plain.plan[0].path == offair.path
+
+    def test_loop_plans_are_shared_unless_shuffled(self):
+        content = [CatalogEntry(f"/content/loop/{i}.mp4", 600.0, "content") for i in range(4)]
+        catalog = MagicMock()
+        catalog.config = {}
+        cache = {}
+        for day in range(2):
+            start = START + datetime.timedelta(days=day)
+            block = LiquidLoopBlock(content, start, start + datetime.timedelta(days=1), "Loop")
+            block.plan_cache = cache
+            block.make_plan(catalog)
+            assert len(block.plan) == 144
+        assert len(cache) == 1
+
+        shuffled = LiquidLoopBlock(content, START, START + datetime.timedelta(days=1), "Loop", shuffle=True)
+        shuffled.plan_cache = cache
+        shuffled.make_plan(catalog)
+        assert len(cache) == 1
+        catalog.rng.shuffle.assert_called()
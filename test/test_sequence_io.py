@@ -0,0 +1,150 @@
+import random
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fs42.sequence import NamedSequence
+from fs42.sequence_api import SequenceAPI, SequenceCache
+from fs42.sequence_io import SequenceIO
+
+
+STATION = {"network_name": "Seq"}
+
+
+@pytest.fixture
+def sequence_io(tmp_path):
+    with patch("fs42.sequence_io.StationManager") as manager:
+        manager.return_value.server_conf = {"db_path": str(tmp_path / "fs42.db")}
+        yield SequenceIO()
+
+
+def _files(show, count):
+    return [f"/content/{show}/e{i}.mp4" for i in range(count)]
+
+
+class TestGetAllSequences:
+
+    def test_matches_single_lookups(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 2, _files("cheers", 4), True))
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "taxi", 0, 1, 0, [], True))
+        sequence_io.put_sequence("Other", NamedSequence("Other", "nightly", "mash", 0, 1, 0, _files("mash", 2), True))
+
+        loaded = sequence_io.get_all_sequences_for_station("Seq")
+        assert [s.tag_path for s in loaded] == ["cheers", "taxi"]
+        for seq in loaded:
+            single = sequence_io.get_sequence("Seq", seq.sequence_name, seq.tag_path)
+            assert [e.fpath for e in seq.episodes] == [e.fpath for e in single.episodes]
+            assert seq.current_index == single.current_index
+
+    def test_initialization_is_saved(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0.5, 1, 0, _files("cheers", 4), True))
+        with sequence_io._get_connection() as connection:
+            connection.execute("UPDATE named_sequence SET initialized = 0")
+
+        assert sequence_io.get_all_sequences_for_station("Seq")[0].current_index == 2
+        with sequence_io._get_connection() as connection:
+            assert connection.execute("SELECT initialized FROM named_sequence").fetchone()[0] == 1
+
+    def test_empty(self, sequence_io):
+        assert sequence_io.get_all_sequences_for_station("Seq") == []
+
+
+class TestSequenceCache:
+
+    def test_children(self):
+        cache = SequenceCache([
+            NamedSequence("Seq", "random", f"shows/{tag}", 0, 1, 0, _files(tag, 1), True)
+            for tag in ("cheers", "taxi/s1")
+        ])
+        assert cache.children("random", "shows") == ["shows/cheers", "shows/taxi/s1"]
+        assert cache.children("random", "shows/taxi") == ["shows/taxi/s1"]
+        assert cache.children("other", "shows") == []
+
+    def test_build_reads_each_sequence_once(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 0, _files("cheers", 3), True))
+
+        with patch("fs42.sequence_io.StationManager") as manager:
+            manager.return_value.server_conf = {"db_path": sequence_io.db_path}
+            cache = SequenceAPI.load_sequence_cache(STATION)
+            with patch.object(SequenceIO, "get_sequence") as get_sequence:
+                played = [SequenceAPI.get_next_in_sequence(STATION, "nightly", "cheers", cache=cache).fpath
+                          for _ in range(4)]
+            get_sequence.assert_not_called()
+
+            # the position was written through as the build went
+            assert SequenceAPI.get_sequence(STATION, "nightly", "cheers").current_index == 1
+        assert played == _files("cheers", 3) + ["/content/cheers/e0.mp4"]
+
+
+class TestEntryWrites:
+
+    def _entry_ids(self, sequence_io):
+        with sequence_io._get_connection() as connection:
+            return [row[0] for row in connection.execute("SELECT id FROM sequence_entries ORDER BY sequence_index")]
+
+    def test_unchanged_entries_are_not_rewritten(self, sequence_io):
+        seq = NamedSequence("Seq", "nightly", "cheers", 0, 1, 0, _files("cheers", 3), True)
+        sequence_io.put_sequence("Seq", seq)
+        ids = self._entry_ids(sequence_io)
+
+        seq.current_index = 2
+        sequence_io.put_sequence("Seq", seq)
+        assert self._entry_ids(sequence_io) == ids
+        assert sequence_io.get_sequence("Seq", "nightly", "cheers").current_index == 2
+
+    def test_put_replaces_changed_entries(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 0, _files("cheers", 3), True))
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 0, _files("cheers", 5), True))
+        episodes = sequence_io.get_sequence("Seq", "nightly", "cheers").episodes
+        assert [e.fpath for e in episodes] == sorted(_files("cheers", 5))
+
+    def test_update_with_same_files_keeps_index(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 2, _files("cheers", 3), True))
+        sequence_io.update_sequence_entries("Seq", "nightly", "cheers", _files("cheers", 3)[::-1], None, 5)
+        assert sequence_io.get_sequence("Seq", "nightly", "cheers").current_index == 2
+
+    def test_update_follows_current_file(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 1, _files("cheers", 3), True))
+        files = ["/content/cheers/a.mp4"] + _files("cheers", 3)
+        sequence_io.update_sequence_entries("Seq", "nightly", "cheers", files, "/content/cheers/e1.mp4", 1)
+        seq = sequence_io.get_sequence("Seq", "nightly", "cheers")
+        assert seq.current_index == 2
+        assert seq.episodes[2].fpath == "/content/cheers/e1.mp4"
+
+
+class TestSequenceState:
+
+    def test_restore(self, sequence_io):
+        sequence_io.put_sequence("Seq", NamedSequence("Seq", "nightly", "cheers", 0, 1, 1, _files("cheers", 3), True))
+        sequence_io.set_active_sequence("Seq", "random", "shows", "shows/cheers")
+        state = sequence_io.get_sequence_state("Seq")
+
+        sequence_io.update_current_index("Seq", "nightly", "cheers", 3)
+        sequence_io.set_active_sequence("Seq", "random", "shows", "shows/taxi")
+        sequence_io.set_active_sequence("Seq", "random", "other", "other/mash")
+
+        sequence_io.restore_sequence_state("Seq", state)
+        assert sequence_io.get_sequence("Seq", "nightly", "cheers").current_index == 1
+        assert sequence_io.get_all_active_sequences("Seq") == ["shows/cheers"]
+
+
+class TestRandomStart:
+
+    def test_start_comes_from_the_given_rng(self):
+        def start(rng):
+            return NamedSequence("Seq", "nightly", "cheers", -1, 1, 0, _files("cheers", 40), False, rng).current_index
+
+        assert start(random.Random(9)) == start(random.Random(9))
+        assert len({start(random.Random(seed)) for seed in range(10)}) > 1
+
+    def test_scan_passes_rng_to_new_sequences(self, sequence_io):
+        station = dict(STATION, content_dir="/content", clip_shows={},
+                       monday={"20": {"tags": "cheers", "sequence": "nightly", "sequence_start": -1}})
+        rng = MagicMock()
+        rng.randrange.return_value = 3
+        with patch("fs42.sequence_api.SequenceIO", return_value=sequence_io), \
+                patch("fs42.sequence_api.MediaProcessor._rfind_media", return_value=_files("cheers", 5)):
+            SequenceAPI.scan_sequences(station, rng)
+
+        rng.randrange.assert_called_once_with(0, 5)
+        assert sequence_io.get_sequence("Seq", "nightly", "cheers").current_index == 3
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from fs42.catalog import ShowCatalog
+from fs42.catalog_entry import CatalogEntry
+from fs42.media_processor import MediaProcessor
+
+
+def _catalog(name, content_dir="/content"):
+    conf = {"network_name": name, "network_type": "standard", "content_dir": content_dir}
+    return ShowCatalog(conf, load=False)
+
+
+def _processed(file_list, tag, hints=[], fluid=None, content_type="feature"):
+    return [CatalogEntry(f, 1800.0, tag, content_type=content_type) for f in file_list]
+
+
+class TestSharedScan:
+
+    def setup_method(self):
+        ShowCatalog.clear_fluid_cache()
+
+    def teardown_method(self):
+        ShowCatalog.clear_fluid_cache()
+
+    def _scan(self, catalog, tag, files=("/content/comedy/a.mp4",), **kwargs):
+        with patch.object(MediaProcessor, "_find_media", return_value=list(files)) as find, \
+                patch.object(MediaProcessor, "_process_media", side_effect=_processed), \
+                patch.object(MediaProcessor, "_process_subs", return_value=[]):
+            catalog._scan_directory(tag, **kwargs)
+        return find
+
+    def test_sibling_reuses_scan(self):
+        first = _catalog("Comedy1")
+        second = _catalog("Comedy2")
+
+        assert self._scan(first, "comedy").call_count == 1
+        first.clip_index["comedy"][0].count = 5
+
+        assert self._scan(second, "comedy").call_count == 0
+        entry = second.clip_index["comedy"][0]
+        assert entry.path == "/content/comedy/a.mp4"
+        assert entry.count == 0
+        assert entry is not first.clip_index["comedy"][0]
+
+    def test_different_content_dir_is_scanned(self):
+        self._scan(_catalog("Comedy1"), "comedy")
+        assert self._scan(_catalog("Drama", content_dir="/drama"), "comedy").call_count == 1
+
+    def test_content_type_is_part_of_the_key(self):
+        self._scan(_catalog("Comedy1"), "comedy")
+        assert self._scan(_catalog("Comedy2"), "comedy", content_type="commercial").call_count == 1
+
+    def test_clear(self):
+        self._scan(_catalog("Comedy1"), "comedy")
+        ShowCatalog.clear_fluid_cache()
+        assert self._scan(_catalog("Comedy2"), "comedy").call_count == 1
+
+    def test_same_folder_by_another_path_is_shared(self, tmp_path):
+        (tmp_path / "content" / "comedy").mkdir(parents=True)
+        (tmp_path / "alias").symlink_to(tmp_path / "content")
+        self._scan(_catalog("Comedy1", content_dir=str(tmp_path / "content")), "comedy",
+                   files=[f"{tmp_path}/content/comedy/a.mp4"])
+        alias = _catalog("Comedy2", content_dir=f"{tmp_path}/alias/")
+        assert self._scan(alias, "comedy").call_count == 0
+        # paths are rebased onto the alias so clip_shows and entry_by_fpath still match
+        assert alias.clip_index["comedy"][0].path == f"{tmp_path}/alias//comedy/a.mp4"
+
+    def test_chapter_scan_is_part_of_the_key(self):
+        skipping = _catalog("Comedy1")
+        skipping.skip_chapter_scan = True
+        self._scan(skipping, "comedy")
+        assert self._scan(_catalog("Comedy2"), "comedy").call_count == 1